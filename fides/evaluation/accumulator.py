@@ -0,0 +1,214 @@
+from math import sqrt, exp
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from fides.model.aliases import PeerId
+from fides.model.recommendation_history import RecommendationHistoryRecord
+from fides.model.service_history import ServiceHistoryRecord
+from fides.utils.time import Time
+
+HistoryRecord = Union[ServiceHistoryRecord, RecommendationHistoryRecord]
+"""Any record from the service or recommendation history."""
+
+
+class BeliefAccumulator:
+    """
+    Running sums over a history that allow computing competence and integrity belief in O(1).
+
+    Records can be added and removed in any order as long as the accumulator
+    reflects the same set of records as the history it represents.
+
+    Competence belief is weighted mean of the satisfactions, integrity belief is computed from
+    the mean and the sum of squared differences of satisfactions maintained by Welford's algorithm:
+
+    sum((s_k * w_mean * f_mean - cb) ** 2) = a ** 2 * M2 + n * (a * s_mean - cb) ** 2, where a = w_mean * f_mean
+
+    Fading factor of the record is f_k = exp(-decay_rate * (t_ref - t_k)) where t_ref is the time of the newest
+    record. When the time advances by dt, all faded sums are multiplied by exp(-decay_rate * dt),
+    so the fading does not require any iteration over the history.
+    """
+
+    MINIMAL_FADED_SUM = 1e-200
+    """When faded sums drop below this value, they are too imprecise and the accumulator should be rebuilt."""
+
+    def __init__(self, decay_rate: float = 0):
+        """
+        :param decay_rate: rate of the exponential fading, 0 means that nothing is forgotten
+        """
+        self.__decay_rate = decay_rate
+        self.count: int = 0
+        """Number of records in the accumulator."""
+        self.__reset()
+
+    def __reset(self):
+        self.count = 0
+        self.__reference_time: Time = 0
+        self.__weight_sum: float = 0
+        self.__fading_sum: float = 0
+        self.__weighted_fading_sum: float = 0
+        self.__weighted_satisfaction_sum: float = 0
+        self.__satisfaction_mean: float = 0
+        self.__satisfaction_m2: float = 0
+
+    @staticmethod
+    def from_history(history: Sequence[HistoryRecord], decay_rate: float = 0) -> 'BeliefAccumulator':
+        """Creates accumulator that contains all records from the history."""
+        accumulator = BeliefAccumulator(decay_rate)
+        if history:
+            accumulator.__reference_time = history[-1].timestamp
+        for record in history:
+            accumulator.add(record)
+        return accumulator
+
+    @property
+    def is_degenerate(self) -> bool:
+        """True if the faded sums are so small that the accumulator should be rebuilt from the history."""
+        return self.count > 0 and self.__fading_sum < self.MINIMAL_FADED_SUM
+
+    def advance_time(self, to_time: Time):
+        """Moves reference time forward and rescales faded sums, O(1)."""
+        if self.count == 0 or self.__decay_rate == 0:
+            self.__reference_time = max(self.__reference_time, to_time)
+            return
+        if to_time <= self.__reference_time:
+            return
+
+        decay = exp(-self.__decay_rate * (to_time - self.__reference_time))
+        self.__fading_sum *= decay
+        self.__weighted_fading_sum *= decay
+        self.__weighted_satisfaction_sum *= decay
+        self.__reference_time = to_time
+
+    def add(self, record: HistoryRecord):
+        """Adds record to the accumulator, moves reference time if the record is newer."""
+        self.advance_time(record.timestamp)
+        fading = self.__fading(record)
+
+        self.count += 1
+        self.__weight_sum += record.weight
+        self.__fading_sum += fading
+        self.__weighted_fading_sum += record.weight * fading
+        self.__weighted_satisfaction_sum += record.satisfaction * record.weight * fading
+
+        delta = record.satisfaction - self.__satisfaction_mean
+        self.__satisfaction_mean += delta / self.count
+        self.__satisfaction_m2 += delta * (record.satisfaction - self.__satisfaction_mean)
+
+    def remove(self, record: HistoryRecord):
+        """Removes record that was previously added."""
+        if self.count <= 1:
+            # nothing would be left, so we can avoid accumulating rounding errors
+            self.__reset()
+            return
+
+        fading = self.__fading(record)
+        self.__weight_sum -= record.weight
+        self.__fading_sum -= fading
+        self.__weighted_fading_sum -= record.weight * fading
+        self.__weighted_satisfaction_sum -= record.satisfaction * record.weight * fading
+
+        previous_mean = self.__satisfaction_mean
+        self.__satisfaction_mean = (self.count * previous_mean - record.satisfaction) / (self.count - 1)
+        self.__satisfaction_m2 -= (record.satisfaction - previous_mean) * (record.satisfaction - self.__satisfaction_mean)
+        self.__satisfaction_m2 = max(self.__satisfaction_m2, 0)
+        self.count -= 1
+
+    def __fading(self, record: HistoryRecord) -> float:
+        if self.__decay_rate == 0:
+            return 1
+        return exp(-self.__decay_rate * (self.__reference_time - record.timestamp))
+
+    @property
+    def competence_belief(self) -> float:
+        """Weighted mean of the satisfactions, in model's notation cb_ij or rcb_ik."""
+        normalisation = self.__weighted_fading_sum
+        return self.__weighted_satisfaction_sum / normalisation if normalisation > 0 else 0
+
+    @property
+    def integrity_belief(self) -> float:
+        """Deviation from the competence belief, in model's notation ib_ij or rib_ik."""
+        if self.count == 0:
+            return 0
+        weight_mean = self.__weight_sum / self.count
+        fading_mean = self.__fading_sum / self.count
+        a = weight_mean * fading_mean
+
+        sat = a ** 2 * self.__satisfaction_m2 + self.count * (a * self.__satisfaction_mean - self.competence_belief) ** 2
+        return sqrt(max(sat, 0) / self.count)
+
+
+class PeerBeliefAccumulators:
+    """
+    Belief accumulators for multiple peers that are kept in sync with the peers' histories.
+
+    If the accumulator for the peer does not match its history (for example the history was loaded
+    from the database or the peer was not evaluated), it is rebuilt from the history.
+    """
+
+    def __init__(self, rebuild_after_updates: int = 10_000):
+        """
+        :param rebuild_after_updates: after how many incremental updates is the accumulator for the peer
+        rebuilt from the history, this prevents accumulation of rounding errors
+        """
+        self.__rebuild_after_updates = rebuild_after_updates
+        self.__accumulators: Dict[PeerId, Tuple[BeliefAccumulator, Optional[HistoryRecord], int]] = {}
+
+    def update(self,
+               peer_id: PeerId,
+               new_history: Sequence[HistoryRecord],
+               appended: List[HistoryRecord],
+               evicted: List[HistoryRecord],
+               decay_rate: float = 0) -> BeliefAccumulator:
+        """
+        Updates accumulator of the peer with the changes of its history.
+
+        :param peer_id: peer that owns the history
+        :param new_history: history with updated records, can be the same (modified) object as the old history
+        :param appended: records that were appended to the old history to create new_history
+        :param evicted: records that were evicted from the old history to create new_history
+        :param decay_rate: rate of the exponential fading used for the history
+        :return: accumulator reflecting new_history
+        """
+        accumulator = self.__accumulator_for(peer_id, new_history, appended, evicted)
+        if accumulator is not None:
+            accumulator, _, updates = accumulator
+            for record in evicted:
+                accumulator.remove(record)
+            for record in appended:
+                accumulator.add(record)
+            updates += 1
+
+        if accumulator is None or accumulator.is_degenerate:
+            accumulator = BeliefAccumulator.from_history(new_history, decay_rate)
+            updates = 0
+
+        self.__accumulators[peer_id] = (accumulator, new_history[-1] if new_history else None, updates)
+        return accumulator
+
+    def forget(self, peer_id: PeerId):
+        """Drops accumulator for given peer."""
+        self.__accumulators.pop(peer_id, None)
+
+    def __accumulator_for(self,
+                          peer_id: PeerId,
+                          new_history: Sequence[HistoryRecord],
+                          appended: List[HistoryRecord],
+                          evicted: List[HistoryRecord]
+                          ) -> Optional[Tuple[BeliefAccumulator, Optional[HistoryRecord], int]]:
+        """Returns accumulator for the peer if it reflects the old history and does not need to be rebuilt."""
+        rec = self.__accumulators.get(peer_id)
+        # when more records were appended than the history holds, some of them were evicted right away
+        if rec is None or not new_history or len(appended) > len(new_history):
+            return None
+
+        accumulator, last_record, updates = rec
+        # the history might have been modified in place, so we reconstruct how the old history looked like
+        old_history_size = len(new_history) - len(appended) + len(evicted)
+        if len(new_history) > len(appended):
+            old_last_record = new_history[-len(appended) - 1]
+        else:
+            old_last_record = evicted[-1] if evicted else None
+
+        reflects_history = accumulator.count == old_history_size and last_record == old_last_record
+        if not reflects_history or updates >= self.__rebuild_after_updates:
+            return None
+        return rec
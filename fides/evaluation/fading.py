@@ -0,0 +1,26 @@
+from math import exp
+from typing import List, Sequence
+
+from fides.evaluation.accumulator import HistoryRecord
+from fides.model.configuration import FadingConfiguration
+
+
+def compute_time_fading_factor(fading: FadingConfiguration,
+                               history: Sequence[HistoryRecord]) -> List[float]:
+    """
+    Computes time based fading factor for each record in the history.
+
+    The factor is relative to the newest record in the history, f_k = exp(-decay_rate * (t_newest - t_k)),
+    thus the newest record has always factor 1. When no fading is configured, all factors are 1.
+
+    :param fading: fading configuration
+    :param history: ordered history, first record is the oldest one
+    :return: ordered list of fading factors, index of fading factor matches record in the history
+    """
+    decay_rate = fading.decay_rate
+    if decay_rate == 0 or not history:
+        # Do not forget anything
+        return [1] * len(history)
+
+    newest = history[-1].timestamp
+    return [exp(-decay_rate * (newest - record.timestamp)) for record in history]
@@ -0,0 +1,60 @@
+from typing import List
+
+from fides.evaluation.accumulator import PeerBeliefAccumulators
+from fides.evaluation.recommendation.peer_update import build_recommendation_trust_data
+from fides.model.aliases import PeerId
+from fides.model.configuration import TrustModelConfiguration
+from fides.model.peer_trust_data import PeerTrustData
+from fides.model.recommendation_history import RecommendationHistory, RecommendationHistoryRecord
+
+
+class IncrementalRecommendationTrustEvaluator:
+    """
+    Computes recommendation trust incrementally - keeps running sums of recommendation history for each
+    recommender and updates them in O(1) when a record is appended to or evicted from the history.
+
+    Produces the same recommendation_trust as
+    fides.evaluation.recommendation.peer_update.update_recommendation_data_for_peer, up to the TOLERANCE
+    caused by floating point rounding.
+    """
+
+    TOLERANCE = 1e-9
+    """Maximal absolute difference from the full recomputation of the recommendation trust."""
+
+    def __init__(self, rebuild_after_updates: int = 10_000):
+        """
+        :param rebuild_after_updates: after how many incremental updates are the sums for the recommender
+        rebuilt from the history, this prevents accumulation of rounding errors
+        """
+        self.__accumulators = PeerBeliefAccumulators(rebuild_after_updates)
+
+    def update_recommendation_data_for_peer(
+            self,
+            configuration: TrustModelConfiguration,
+            peer: PeerTrustData,
+            new_history: RecommendationHistory,
+            appended: List[RecommendationHistoryRecord],
+            evicted: List[RecommendationHistoryRecord]
+    ) -> PeerTrustData:
+        """
+        Computes and updates recommendation trust - rt_ik - for recommender k.
+
+        :param configuration: current trust model configuration
+        :param peer: recommender k, to be updated
+        :param new_history: history with updated records, can be the same (modified) object
+        as peer.recommendation_history
+        :param appended: records that were appended to the old history to create new_history
+        :param evicted: records that were evicted from the old history to create new_history
+        :return: new object peer trust data with updated recommendation_trust and recommendation_history
+        """
+        accumulator = self.__accumulators.update(peer.peer_id, new_history, appended, evicted,
+                                                 configuration.recommendations.fading.decay_rate)
+        return build_recommendation_trust_data(configuration=configuration,
+                                               peer=peer,
+                                               new_history=new_history,
+                                               competence_belief=accumulator.competence_belief,
+                                               integrity_belief=accumulator.integrity_belief)
+
+    def forget(self, peer_id: PeerId):
+        """Drops running sums for given recommender."""
+        self.__accumulators.forget(peer_id)
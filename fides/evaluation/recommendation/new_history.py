@@ -1,7 +1,8 @@
 from fides.model.configuration import TrustModelConfiguration
 from fides.model.peer_trust_data import PeerTrustData
 from fides.model.recommendation import Recommendation
-from fides.model.recommendation_history import RecommendationHistoryRecord, RecommendationHistory
+from fides.model.recommendation_history import RecommendationHistoryRecord, RecommendationHistory, \
+    RecommendationHistoryBuffer
 from fides.utils.time import now
 
 
@@ -17,6 +18,9 @@ def create_recommendation_history_for_peer(
     """
     Creates new recommendation_history for given peer and its recommendations.
 
+    The record is appended to a copy of the peer's recommendation history,
+    when the history is full, the oldest record is evicted. The given peer is not modified.
+
     :param configuration: configuration for current trust model
     :param peer: peer "k" which provided recommendation r
     :param recommendation: recommendation provided by peer k
@@ -26,18 +30,41 @@ def create_recommendation_history_for_peer(
     :param eib_ij: estimation about integrity belief
     :return:
     """
+    updated_history = copy_recommendation_history(configuration, peer)
+    updated_history.append(create_recommendation_record(
+        configuration=configuration, recommendation=recommendation,
+        history_factor=history_factor, er_ij=er_ij, ecb_ij=ecb_ij, eib_ij=eib_ij
+    ))
+    return updated_history
+
+
+def create_recommendation_record(
+        configuration: TrustModelConfiguration,
+        recommendation: Recommendation,
+        history_factor: float,
+        er_ij: float,
+        ecb_ij: float,
+        eib_ij: float
+) -> RecommendationHistoryRecord:
+    """
+    Creates recommendation history record for the recommendation, parameters are the same as for
+    create_recommendation_history_for_peer.
+    """
     rs_ik = __compute_recommendation_satisfaction_parameter(recommendation, er_ij, ecb_ij, eib_ij)
     rw_ik = __compute_weight_of_recommendation(configuration, recommendation, history_factor)
+    return RecommendationHistoryRecord(satisfaction=rs_ik, weight=rw_ik, timestamp=now())
 
-    updated_history = peer.recommendation_history + [RecommendationHistoryRecord(satisfaction=rs_ik,
-                                                                                 weight=rw_ik,
-                                                                                 timestamp=now())]
-    # fix history len if we reached max size
-    if len(updated_history) > configuration.recommendations.history_max_size:
-        last_idx = len(updated_history)
-        updated_history = updated_history[last_idx - configuration.recommendations.history_max_size: last_idx]
 
-    return updated_history
+def copy_recommendation_history(configuration: TrustModelConfiguration,
+                                peer: PeerTrustData) -> RecommendationHistoryBuffer:
+    """Returns copy of the peer's recommendation history as a ring buffer that can be modified."""
+    history = peer.recommendation_history
+    capacity = configuration.recommendations.history_max_size
+    if isinstance(history, RecommendationHistoryBuffer) and history.capacity == capacity:
+        # the buffer is shared with the peer, that must stay unchanged
+        return history.copy()
+    # restrict history to max length, buffer keeps only the latest records
+    return RecommendationHistoryBuffer(capacity=capacity, records=history)
 
 
 def __compute_recommendation_satisfaction_parameter(
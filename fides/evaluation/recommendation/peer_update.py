@@ -3,6 +3,7 @@ from math import sqrt
 from typing import List
 
 from fides.evaluation.discount_factor import compute_discount_factor
+from fides.evaluation.fading import compute_time_fading_factor
 from fides.model.configuration import TrustModelConfiguration
 from fides.model.peer_trust_data import PeerTrustData
 from fides.model.recommendation_history import RecommendationHistory
@@ -26,9 +27,36 @@ def update_recommendation_data_for_peer(
     :param new_history: history to be used as base for recommendation computation
     :return: new object peer trust data with updated recommendation_trust and recommendation_history
     """
-    fading_factor = __compute_fading_factor(configuration, new_history)
-    competence_belief = __compute_competence_belief(new_history, fading_factor)
-    integrity_belief = __compute_integrity_belief(new_history, fading_factor, competence_belief)
+    # materialize records only once as the history might be a ring buffer
+    records = list(new_history)
+    fading_factor = __compute_fading_factor(configuration, records)
+    competence_belief = __compute_competence_belief(records, fading_factor)
+    integrity_belief = __compute_integrity_belief(records, fading_factor, competence_belief)
+
+    return build_recommendation_trust_data(configuration=configuration,
+                                           peer=peer,
+                                           new_history=new_history,
+                                           competence_belief=competence_belief,
+                                           integrity_belief=integrity_belief)
+
+
+def build_recommendation_trust_data(
+        configuration: TrustModelConfiguration,
+        peer: PeerTrustData,
+        new_history: RecommendationHistory,
+        competence_belief: float,
+        integrity_belief: float
+) -> PeerTrustData:
+    """
+    Computes recommendation trust rt_ik from already known beliefs and returns updated PeerTrustData.
+
+    :param configuration: current trust model configuration
+    :param peer: peer to be updated, its recommendation_history is older than new_history
+    :param new_history: history with updated records
+    :param competence_belief: recommendation competence belief rcb_ik computed from new_history
+    :param integrity_belief: recommendation integrity belief rib_ik computed from new_history
+    :return: new object peer trust data with updated recommendation_trust and recommendation_history
+    """
     integrity_discount = compute_discount_factor()
 
     history_factor = len(new_history) / configuration.recommendations.history_max_size
@@ -59,15 +87,13 @@ def __compute_fading_factor(configuration: TrustModelConfiguration,
     :param recommendation_history: history for which should be fading factor generated
     :return: ordered list of fading factors, index of fading factor matches record in RecommendationHistory
     """
-    # TODO: [?] this might be time based in the future
     # f^k_ij = k / sh_ij
     # where 1 <= k <= sh_ij
     # Linear forgetting
     # history_size = len(recommendation_history)
     # return [i / history_size for i, _ in enumerate(recommendation_history, start=1)]
 
-    # Do not forget anything
-    return [1] * len(recommendation_history)
+    return compute_time_fading_factor(configuration.recommendations.fading, recommendation_history)
 
 
 def __compute_competence_belief(recommendation_history: RecommendationHistory, fading_factor: List[float]) -> float:
@@ -1,20 +1,25 @@
 import dataclasses
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from fides.evaluation.discount_factor import compute_discount_factor
-from fides.evaluation.recommendation.new_history import create_recommendation_history_for_peer
+from fides.evaluation.recommendation.incremental import IncrementalRecommendationTrustEvaluator
+from fides.evaluation.recommendation.new_history import copy_recommendation_history, create_recommendation_record
 from fides.evaluation.recommendation.peer_update import update_recommendation_data_for_peer
 from fides.model.aliases import PeerId
 from fides.model.configuration import TrustModelConfiguration
 from fides.model.peer_trust_data import TrustMatrix, PeerTrustData
 from fides.model.recommendation import Recommendation
+from fides.model.recommendation_history import RecommendationHistoryRecord
 
 
 def process_new_recommendations(
         configuration: TrustModelConfiguration,
         subject: PeerTrustData,
         matrix: TrustMatrix,
-        recommendations: Dict[PeerId, Recommendation]
+        recommendations: Dict[PeerId, Recommendation],
+        evaluator: Optional[IncrementalRecommendationTrustEvaluator] = None
 ) -> TrustMatrix:
     """
     Evaluates received recommendation, computing recommendations and recommendation
@@ -31,110 +36,162 @@ def process_new_recommendations(
     part of the T_i set
     :param recommendations: responses received from the network when
     asking for recommendations, peer ids here are in model's notation "k"s
+    :param evaluator: evaluator that updates recommendation trust incrementally,
+    if None, recommendation trust is computed from whole history
     :return: new matrix that contains only peers that were updated - it should contain
     """
-    # verify that peers with responses are in trust matrix
-    for peer in recommendations.keys():
-        assert matrix[peer] is not None, f"Peer {peer} is not present in peer matrix."
+    return process_new_recommendations_for_subjects(
+        configuration=configuration,
+        subjects={subject.peer_id: subject},
+        matrix=matrix,
+        recommendations={subject.peer_id: recommendations},
+        evaluator=evaluator
+    )
 
-    er_ij = __estimate_recommendation(matrix, recommendations)
-    ecb_ij, eib_ij = __estimate_competence_integrity_belief(matrix, recommendations)
 
-    history_sizes = [r.service_history_size for r in recommendations.values()]
-    history_mean = int(sum(history_sizes) / len(history_sizes))
+def process_new_recommendations_for_subjects(
+        configuration: TrustModelConfiguration,
+        subjects: TrustMatrix,
+        matrix: TrustMatrix,
+        recommendations: Dict[PeerId, Dict[PeerId, Recommendation]],
+        evaluator: Optional[IncrementalRecommendationTrustEvaluator] = None
+) -> TrustMatrix:
+    """
+    Evaluates recommendations received about multiple subjects at once.
 
-    integrity_discount = compute_discount_factor()
-    history_factor = history_mean / configuration.service_history_max_size
-    # ecb_ij -0.5 * eib_ij (where -0.5 is integrity discount)
-    own_experience = history_factor * (ecb_ij + integrity_discount * eib_ij)
-    reputation_experience = (1 - history_factor) * er_ij
+    Estimates for all subjects are computed in a single vectorized pass from the recommendation
+    trust of the recommenders in :param matrix, recommendation trust of each recommender
+    is then updated only once with all its new recommendation history records.
 
-    # r_ij
-    reputation = own_experience + reputation_experience
-    # now update final trust for the subject with new reputation
-    # we also trust the subject same with service as well as with recommendations
-    # we also set service_trust if it is not set, because for the first interaction it is equal to reputation
-    updated_subject_trust = dataclasses \
-        .replace(subject,
-                 service_trust=max(subject.service_trust, reputation),
-                 reputation=reputation,
-                 recommendation_trust=reputation,
-                 initial_reputation_provided_by_count=len(recommendations)
-                 )
-    peers_updated_matrix = {updated_subject_trust.peer_id: updated_subject_trust}
-
-    # now we need to reflect performed reputation query and update how much we trust other peers
-    for peer_id, recommendation in recommendations.items():
-        peer = matrix[peer_id]
-        # build new history
-        new_history = create_recommendation_history_for_peer(
-            configuration=configuration, peer=peer, recommendation=recommendation,
-            history_factor=history_factor, er_ij=er_ij, ecb_ij=ecb_ij, eib_ij=eib_ij
-        )
-        # and update peer and its recommendation data
-        updated_peer = update_recommendation_data_for_peer(configuration=configuration,
-                                                           peer=peer,
-                                                           new_history=new_history)
-        peers_updated_matrix[updated_peer.peer_id] = updated_peer
+    :param configuration: configuration of the current trust model
+    :param subjects: subjects of recommendations, in model's notation "j"s
+    :param matrix: trust matrix with peers that provided recommendations, in model's notation "k"s
+    :param recommendations: responses received from the network, subject id -> recommender id -> recommendation
+    :param evaluator: evaluator that updates recommendation trust incrementally,
+    if None, recommendation trust is computed from whole history
+    :return: new matrix that contains only peers that were updated - subjects and recommenders
+    """
+    # subjects without any recommendation can not be evaluated
+    recommendations = {subject: r for subject, r in recommendations.items() if r}
+    subject_ids = list(recommendations.keys())
+    recommender_ids = list(dict.fromkeys(peer for r in recommendations.values() for peer in r.keys()))
+    # verify that peers with responses are in trust matrix
+    for peer in recommender_ids:
+        assert matrix[peer] is not None, f"Peer {peer} is not present in peer matrix."
+    if not subject_ids:
+        return {}
+
+    estimates = __estimate_for_subjects(configuration, matrix, subject_ids, recommender_ids, recommendations)
+
+    # now we need to reflect performed reputation queries and update how much we trust other peers
+    # history of each recommender is copied once and all new records are appended to the copy
+    histories = {peer_id: copy_recommendation_history(configuration, matrix[peer_id]) for peer_id in recommender_ids}
+    appended: Dict[PeerId, List[RecommendationHistoryRecord]] = {peer_id: [] for peer_id in recommender_ids}
+    evicted: Dict[PeerId, List[RecommendationHistoryRecord]] = {peer_id: [] for peer_id in recommender_ids}
+    for subject_id, (history_factor, er_ij, ecb_ij, eib_ij, _) in zip(subject_ids, estimates):
+        for peer_id, recommendation in recommendations[subject_id].items():
+            record = create_recommendation_record(
+                configuration=configuration, recommendation=recommendation,
+                history_factor=history_factor, er_ij=er_ij, ecb_ij=ecb_ij, eib_ij=eib_ij
+            )
+            evicted_record = histories[peer_id].append(record)
+            appended[peer_id].append(record)
+            if evicted_record:
+                evicted[peer_id].append(evicted_record)
+    recommenders = {peer_id: dataclasses.replace(matrix[peer_id], recommendation_history=histories[peer_id])
+                    for peer_id in recommender_ids}
+
+    # and update recommenders and their recommendation data, once per recommender
+    peers_updated_matrix: TrustMatrix = {}
+    for peer_id, peer in recommenders.items():
+        if evaluator is not None:
+            updated_peer = evaluator.update_recommendation_data_for_peer(
+                configuration=configuration,
+                peer=peer,
+                new_history=peer.recommendation_history,
+                appended=appended[peer_id],
+                evicted=evicted[peer_id]
+            )
+        else:
+            updated_peer = update_recommendation_data_for_peer(configuration=configuration,
+                                                               peer=peer,
+                                                               new_history=peer.recommendation_history)
+        peers_updated_matrix[peer_id] = updated_peer
+
+    for subject_id, (_, _, _, _, reputation) in zip(subject_ids, estimates):
+        # subject might have been a recommender as well
+        subject = peers_updated_matrix.get(subject_id, subjects[subject_id])
+        # now update final trust for the subject with new reputation
+        # we also trust the subject same with service as well as with recommendations
+        # we also set service_trust if it is not set, because for the first interaction it is equal to reputation
+        peers_updated_matrix[subject_id] = dataclasses \
+            .replace(subject,
+                     service_trust=max(subject.service_trust, reputation),
+                     reputation=reputation,
+                     recommendation_trust=reputation,
+                     initial_reputation_provided_by_count=len(recommendations[subject_id])
+                     )
 
     return peers_updated_matrix
 
 
-def __estimate_recommendation(
+def __estimate_for_subjects(
+        configuration: TrustModelConfiguration,
         matrix: TrustMatrix,
-        recommendations: Dict[PeerId, Recommendation]
-) -> float:
+        subject_ids: List[PeerId],
+        recommender_ids: List[PeerId],
+        recommendations: Dict[PeerId, Dict[PeerId, Recommendation]]
+) -> List[Tuple[float, float, float, float, float]]:
     """
-    Computes estimation about recommendation.
+    Computes estimates for all subjects in a single vectorized pass.
 
-    In model's notation er_ij.
-
-    :param matrix: trust matrix with peers that provided recommendations
-    :param recommendations: responses from the peers
-    :return: estimation about recommendation er_ij
+    :return: list with [history_factor, er_ij, ecb_ij, eib_ij, r_ij] for each subject, index matches subject_ids
     """
-    normalisation = sum([
-        matrix[peer].recommendation_trust * response.initial_reputation_provided_by_count
-        for peer, response
-        in recommendations.items()]
-    )
-
-    recommendations = sum(
-        [matrix[peer].recommendation_trust * response.initial_reputation_provided_by_count * response.recommendation
-         for peer, response
-         in recommendations.items()])
-
-    return recommendations / normalisation if normalisation > 0 else 0
+    recommender_idx = {peer_id: idx for idx, peer_id in enumerate(recommender_ids)}
+    shape = (len(subject_ids), len(recommender_ids))
+    responded = np.zeros(shape, dtype=bool)
+    provided_by_count = np.zeros(shape)
+    recommendation = np.zeros(shape)
+    service_history_size = np.zeros(shape)
+    competence_belief = np.zeros(shape)
+    integrity_belief = np.zeros(shape)
+    for s, subject_id in enumerate(subject_ids):
+        for peer_id, response in recommendations[subject_id].items():
+            k = recommender_idx[peer_id]
+            responded[s, k] = True
+            provided_by_count[s, k] = response.initial_reputation_provided_by_count
+            recommendation[s, k] = response.recommendation
+            service_history_size[s, k] = response.service_history_size
+            competence_belief[s, k] = response.competence_belief
+            integrity_belief[s, k] = response.integrity_belief
+
+    # rt_ik
+    recommendation_trust = np.array([matrix[peer_id].recommendation_trust for peer_id in recommender_ids])
+
+    # er_ij = sum(rt_ik * ipc_kj * r_kj) / sum(rt_ik * ipc_kj)
+    trust_provided_by = recommendation_trust * provided_by_count
+    er_ij = __divide(np.sum(trust_provided_by * recommendation, axis=1), np.sum(trust_provided_by, axis=1))
+
+    # ecb_ij = sum(rt_ik * sh_kj * cb_kj) / sum(rt_ik * sh_kj), eib_ij analogically
+    trust_history_size = recommendation_trust * service_history_size
+    normalisation = np.sum(trust_history_size, axis=1)
+    ecb_ij = __divide(np.sum(trust_history_size * competence_belief, axis=1), normalisation)
+    eib_ij = __divide(np.sum(trust_history_size * integrity_belief, axis=1), normalisation)
+
+    history_mean = np.floor(np.sum(service_history_size, axis=1) / np.sum(responded, axis=1))
+    history_factor = history_mean / configuration.service_history_max_size
 
+    integrity_discount = compute_discount_factor()
+    # ecb_ij -0.5 * eib_ij (where -0.5 is integrity discount)
+    own_experience = history_factor * (ecb_ij + integrity_discount * eib_ij)
+    reputation_experience = (1 - history_factor) * er_ij
+    # r_ij
+    reputation = own_experience + reputation_experience
 
-def __estimate_competence_integrity_belief(
-        matrix: TrustMatrix,
-        recommendations: Dict[PeerId, Recommendation]
-) -> [float, float]:
-    """
-    Estimates about competence and integrity beliefs.
+    return [tuple(float(v) for v in estimate)
+            for estimate in zip(history_factor, er_ij, ecb_ij, eib_ij, reputation)]
 
-    In model's notation ecb_ij and eib_ij.
 
-    :param matrix: trust matrix with peers that provided recommendations
-    :param recommendations: responses from the peers
-    :return: tuple with [competence, integrity] beliefs -> [ecb_ij, eib_ij]
-    """
-    normalisation = 0
-    competence = 0
-    integrity = 0
-
-    # as we would need to iterate three times, it's just better to make for cycle
-    for peer, response in recommendations.items():
-        trust_history_size = matrix[peer].recommendation_trust * response.service_history_size
-        # rt_ik * sh_kj
-        normalisation += trust_history_size
-        # rt_ik * sh_kj * cb_kj
-        competence += trust_history_size * response.competence_belief
-        # rt_ik * sh_kj * ib_kj
-        integrity += trust_history_size * response.integrity_belief
-
-    competence_belief = competence / normalisation if normalisation > 0 else 0
-    integrity_belief = integrity / normalisation if normalisation > 0 else 0
-
-    return [competence_belief, integrity_belief]
+def __divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise division that returns 0 where the denominator is not positive."""
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
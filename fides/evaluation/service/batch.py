@@ -0,0 +1,79 @@
+from array import array
+from typing import List, Tuple
+
+import numpy as np
+
+from fides.model.configuration import TrustModelConfiguration
+from fides.model.history_buffer import HistoryBuffer
+from fides.model.service_history import ServiceHistory
+
+
+def compute_beliefs_batch(
+        configuration: TrustModelConfiguration,
+        histories: List[ServiceHistory]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes competence belief cb_ij and integrity belief ib_ij for multiple peers at once.
+
+    Histories are stacked into (peers x history) matrices and the beliefs are computed
+    in a single NumPy pass, the results are the same as the ones from
+    fides.evaluation.service.peer_update.update_service_data_for_peer up to the floating point rounding.
+
+    :param configuration: configuration of the current trust model
+    :param histories: non-empty service histories of the peers
+    :return: tuple with arrays [competence beliefs, integrity beliefs], index matches index in histories
+    """
+    satisfaction, weight, timestamp, mask = __stack_histories(histories)
+    fading = __compute_fading_factor(configuration, timestamp, mask)
+
+    # cb_ij = sum(s * w * f) / sum(w * f)
+    normalisation = np.sum(weight * fading, axis=1)
+    belief = np.sum(satisfaction * weight * fading, axis=1)
+    competence_belief = belief / normalisation
+
+    # ib_ij = sqrt(sum((s * mean(w) * mean(f) - cb) ** 2) / sh_ij)
+    history_size = np.sum(mask, axis=1)
+    weight_mean = np.sum(weight, axis=1) / history_size
+    fading_mean = np.sum(fading, axis=1) / history_size
+    deviation = satisfaction * (weight_mean * fading_mean)[:, None] - competence_belief[:, None]
+    sat = np.sum(np.where(mask, deviation ** 2, 0), axis=1)
+    integrity_belief = np.sqrt(sat / history_size)
+
+    return competence_belief, integrity_belief
+
+
+def __compute_fading_factor(configuration: TrustModelConfiguration,
+                            timestamp: np.ndarray,
+                            mask: np.ndarray) -> np.ndarray:
+    """Computes fading factors matrix, see fides.evaluation.fading.compute_time_fading_factor."""
+    decay_rate = configuration.service_fading.decay_rate
+    if decay_rate == 0:
+        # Do not forget anything
+        return mask.astype(float)
+    # timestamp of the newest record for each peer
+    newest = timestamp[np.arange(len(timestamp)), np.sum(mask, axis=1) - 1]
+    return np.where(mask, np.exp(-decay_rate * (newest[:, None] - timestamp)), 0)
+
+
+def __stack_histories(histories: List[ServiceHistory]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Stacks histories to (peers x history) matrices of satisfaction, weight, timestamp and mask of valid records."""
+    max_size = max(len(h) for h in histories)
+    satisfaction = np.zeros((len(histories), max_size))
+    weight = np.zeros((len(histories), max_size))
+    timestamp = np.zeros((len(histories), max_size))
+    mask = np.zeros((len(histories), max_size), dtype=bool)
+
+    for idx, history in enumerate(histories):
+        size = len(history)
+        if isinstance(history, HistoryBuffer):
+            s, w, t = history.columns()
+        else:
+            s = array('d', (r.satisfaction for r in history))
+            w = array('d', (r.weight for r in history))
+            t = array('d', (r.timestamp for r in history))
+        satisfaction[idx, :size] = np.frombuffer(s)
+        weight[idx, :size] = np.frombuffer(w)
+        timestamp[idx, :size] = np.frombuffer(t)
+        mask[idx, :size] = True
+
+    return satisfaction, weight, timestamp, mask
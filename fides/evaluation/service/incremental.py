@@ -0,0 +1,63 @@
+from typing import List
+
+from fides.evaluation.accumulator import PeerBeliefAccumulators
+from fides.evaluation.service.peer_update import build_service_trust_data
+from fides.model.aliases import PeerId
+from fides.model.configuration import TrustModelConfiguration
+from fides.model.peer_trust_data import PeerTrustData
+from fides.model.service_history import ServiceHistory, ServiceHistoryRecord
+
+
+class IncrementalServiceTrustEvaluator:
+    """
+    Computes service trust incrementally - keeps running sums of service history for each peer
+    and updates them in O(1) when a record is appended to or evicted from the history.
+
+    Produces the same service_trust, competence_belief and integrity_belief as
+    fides.evaluation.service.peer_update.update_service_data_for_peer, up to the TOLERANCE
+    caused by floating point rounding.
+
+    If the sums for the peer do not match its history (for example the history was loaded from the database
+    or the peer has fixed trust and was not evaluated), they are rebuilt from the history.
+    """
+
+    TOLERANCE = 1e-9
+    """Maximal absolute difference from the full recomputation of the beliefs."""
+
+    def __init__(self, rebuild_after_updates: int = 10_000):
+        """
+        :param rebuild_after_updates: after how many incremental updates are the sums for the peer
+        rebuilt from the history, this prevents accumulation of rounding errors
+        """
+        self.__accumulators = PeerBeliefAccumulators(rebuild_after_updates)
+
+    def update_service_data_for_peer(
+            self,
+            configuration: TrustModelConfiguration,
+            peer: PeerTrustData,
+            new_history: ServiceHistory,
+            appended: List[ServiceHistoryRecord],
+            evicted: List[ServiceHistoryRecord]
+    ) -> PeerTrustData:
+        """
+        Computes and updates PeerTrustData.service_trust - st_ij - for peer j.
+
+        :param configuration: configuration of the current trust model
+        :param peer: trust data for peer j, to be updated
+        :param new_history: history with updated records, can be the same (modified) object as peer.service_history
+        :param appended: records that were appended to the old history to create new_history
+        :param evicted: records that were evicted from the old history to create new_history
+        :return: new peer trust data object with fresh service_trust, competence_belief, integrity_belief
+         and service_history
+        """
+        accumulator = self.__accumulators.update(peer.peer_id, new_history, appended, evicted,
+                                                 configuration.service_fading.decay_rate)
+        return build_service_trust_data(configuration=configuration,
+                                        peer=peer,
+                                        new_history=new_history,
+                                        competence_belief=accumulator.competence_belief,
+                                        integrity_belief=accumulator.integrity_belief)
+
+    def forget(self, peer_id: PeerId):
+        """Drops running sums for given peer."""
+        self.__accumulators.forget(peer_id)
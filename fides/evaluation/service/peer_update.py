@@ -3,6 +3,7 @@ from math import sqrt
 from typing import List
 
 from fides.evaluation.discount_factor import compute_discount_factor
+from fides.evaluation.fading import compute_time_fading_factor
 from fides.model.configuration import TrustModelConfiguration
 from fides.model.peer_trust_data import PeerTrustData
 from fides.model.service_history import ServiceHistory
@@ -30,9 +31,37 @@ def update_service_data_for_peer(
      and service_history
     """
 
-    fading_factor = __compute_fading_factor(configuration, new_history)
-    competence_belief = __compute_competence_belief(new_history, fading_factor)
-    integrity_belief = __compute_integrity_belief(new_history, fading_factor, competence_belief)
+    # materialize records only once as the history might be a ring buffer
+    records = list(new_history)
+    fading_factor = __compute_fading_factor(configuration, records)
+    competence_belief = __compute_competence_belief(records, fading_factor)
+    integrity_belief = __compute_integrity_belief(records, fading_factor, competence_belief)
+
+    return build_service_trust_data(configuration=configuration,
+                                    peer=peer,
+                                    new_history=new_history,
+                                    competence_belief=competence_belief,
+                                    integrity_belief=integrity_belief)
+
+
+def build_service_trust_data(
+        configuration: TrustModelConfiguration,
+        peer: PeerTrustData,
+        new_history: ServiceHistory,
+        competence_belief: float,
+        integrity_belief: float
+) -> PeerTrustData:
+    """
+    Computes service trust st_ij from already known beliefs and returns updated PeerTrustData.
+
+    :param configuration: configuration of the current trust model
+    :param peer: trust data for peer j with old history, to be updated
+    :param new_history: history with updated records
+    :param competence_belief: competence belief cb_ij computed from new_history
+    :param integrity_belief: integrity belief ib_ij computed from new_history
+    :return: new peer trust data object with fresh service_trust, competence_belief, integrity_belief
+     and service_history
+    """
     integrity_discount = compute_discount_factor()
 
     history_factor = len(new_history) / configuration.service_history_max_size
@@ -67,7 +96,6 @@ def __compute_fading_factor(configuration: TrustModelConfiguration, service_hist
     :param service_history: history for which should be fading factor generated
     :return: ordered list of fading factors, index of fading factor matches record in ServiceHistory
     """
-    # TODO: [?] this might be time based in the future
     # f^k_ij = k / sh_ij
     # where 1 <= k <= sh_ij
 
@@ -75,8 +103,7 @@ def __compute_fading_factor(configuration: TrustModelConfiguration, service_hist
     # history_size = len(service_history)
     # return [i / history_size for i, _ in enumerate(service_history, start=1)]
 
-    # Do not forget anything
-    return [1] * len(service_history)
+    return compute_time_fading_factor(configuration.service_fading, service_history)
 
 
 def __compute_competence_belief(service_history: ServiceHistory, fading_factor: List[float]) -> float:
@@ -1,10 +1,14 @@
 import dataclasses
+from typing import Dict, List, Optional, Tuple
 
+from fides.evaluation.service.batch import compute_beliefs_batch
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
 from fides.evaluation.service.interaction import Satisfaction, Weight
-from fides.evaluation.service.peer_update import update_service_data_for_peer
+from fides.evaluation.service.peer_update import update_service_data_for_peer, build_service_trust_data
+from fides.model.aliases import PeerId
 from fides.model.configuration import TrustModelConfiguration
-from fides.model.peer_trust_data import PeerTrustData
-from fides.model.service_history import ServiceHistoryRecord
+from fides.model.peer_trust_data import PeerTrustData, TrustMatrix
+from fides.model.service_history import ServiceHistoryRecord, ServiceHistoryBuffer
 from fides.utils.logger import Logger
 from fides.utils.time import now
 
@@ -15,26 +19,113 @@ def process_service_interaction(
         configuration: TrustModelConfiguration,
         peer: PeerTrustData,
         satisfaction: Satisfaction,
-        weight: Weight
+        weight: Weight,
+        evaluator: Optional[IncrementalServiceTrustEvaluator] = None
 ) -> PeerTrustData:
-    """Processes given interaction and updates trust data."""
-    new_history = peer.service_history + [ServiceHistoryRecord(
+    """Processes given interaction and updates trust data.
+
+    The interaction is appended to a copy of the peer's service history, when the history
+    is full, the oldest record is evicted. The given peer is not modified.
+
+    :param evaluator: evaluator that updates service trust incrementally,
+    if None, service trust is computed from whole history
+    """
+    record = ServiceHistoryRecord(
         satisfaction=satisfaction,
         weight=weight.value,
         timestamp=now()
-    )]
-    # now restrict new history to max length
-    if len(new_history) > configuration.service_history_max_size:
-        last = len(new_history)
-        new_history = new_history[last - configuration.service_history_max_size: last]
+    )
+    new_history = __service_history_buffer(configuration, peer)
+    evicted = new_history.append(record)
+    evicted = [evicted] if evicted else []
 
     # we don't update service trust for fixed trust peers
     if peer.has_fixed_trust:
         logger.debug(f"Peer {peer.peer_id} has fixed trust.")
         return dataclasses.replace(peer, service_history=new_history)
+    elif evaluator is not None:
+        return evaluator.update_service_data_for_peer(
+            configuration=configuration,
+            peer=peer,
+            new_history=new_history,
+            appended=[record],
+            evicted=evicted
+        )
     else:
         return update_service_data_for_peer(
             configuration=configuration,
             peer=peer,
             new_history=new_history
         )
+
+
+def process_service_interactions(
+        configuration: TrustModelConfiguration,
+        data: Dict[PeerId, Tuple[PeerTrustData, Satisfaction, Weight]],
+        evaluator: Optional[IncrementalServiceTrustEvaluator] = None
+) -> TrustMatrix:
+    """Processes interactions with multiple peers at once and returns updated trust matrix.
+
+    Produces the same trust data as calling process_service_interaction for every peer,
+    but when the service trust is computed from the whole history, all peers are evaluated
+    in a single vectorized pass.
+    """
+    if evaluator is not None:
+        return {peer_id: process_service_interaction(configuration, peer, satisfaction, weight, evaluator)
+                for peer_id, (peer, satisfaction, weight) in data.items()}
+
+    trust_matrix = append_service_interactions(configuration, data)
+    trust_matrix.update(evaluate_service_trust(configuration, list(trust_matrix.values())))
+    return trust_matrix
+
+
+def append_service_interactions(
+        configuration: TrustModelConfiguration,
+        data: Dict[PeerId, Tuple[PeerTrustData, Satisfaction, Weight]]
+) -> TrustMatrix:
+    """Appends interactions to the peers' service histories without updating their service trust.
+
+    Service trust can be computed later by evaluate_service_trust.
+    """
+    trust_matrix: TrustMatrix = {}
+    for peer_id, (peer, satisfaction, weight) in data.items():
+        new_history = __service_history_buffer(configuration, peer)
+        new_history.append_values(satisfaction, weight.value, now())
+        trust_matrix[peer_id] = dataclasses.replace(peer, service_history=new_history)
+    return trust_matrix
+
+
+def evaluate_service_trust(configuration: TrustModelConfiguration, peers: List[PeerTrustData]) -> TrustMatrix:
+    """Computes service trust of the peers from their service histories in a single vectorized pass.
+
+    Peers with fixed trust or without any service history are returned unchanged.
+    """
+    trust_matrix: TrustMatrix = {}
+    evaluated = []
+    for peer in peers:
+        # we don't update service trust for fixed trust peers
+        if peer.has_fixed_trust or not peer.service_history:
+            trust_matrix[peer.peer_id] = peer
+        else:
+            evaluated.append(peer)
+
+    if evaluated:
+        competence_beliefs, integrity_beliefs = compute_beliefs_batch(configuration,
+                                                                      [p.service_history for p in evaluated])
+        for peer, cb, ib in zip(evaluated, competence_beliefs, integrity_beliefs):
+            trust_matrix[peer.peer_id] = build_service_trust_data(configuration=configuration,
+                                                                  peer=peer,
+                                                                  new_history=peer.service_history,
+                                                                  competence_belief=float(cb),
+                                                                  integrity_belief=float(ib))
+    return trust_matrix
+
+
+def __service_history_buffer(configuration: TrustModelConfiguration, peer: PeerTrustData) -> ServiceHistoryBuffer:
+    """Returns copy of the peer's service history as a ring buffer that can be modified."""
+    history = peer.service_history
+    if isinstance(history, ServiceHistoryBuffer) and history.capacity == configuration.service_history_max_size:
+        # the buffer is shared with the peer, that must stay unchanged
+        return history.copy()
+    # restrict history to max length, buffer keeps only the latest records
+    return ServiceHistoryBuffer(capacity=configuration.service_history_max_size, records=history)
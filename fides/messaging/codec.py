@@ -0,0 +1,119 @@
+"""
+Wire formats of the messages exchanged with the network layer.
+
+Version of the NetworkMessage identifies the format in which it was encoded, so both sides can decode whatever
+they receive. JSON messages have version 1, MessagePack messages version 2. Structure of the message is
+the same in all formats.
+"""
+
+import json
+from dataclasses import is_dataclass
+from typing import Dict, Union
+
+from fides.messaging.model import NetworkMessage
+
+SerializedMessage = Union[str, bytes]
+"""Message as it is sent through the queue, text for JSON, bytes for the binary formats."""
+
+
+class MessageCodec:
+    """Encodes and decodes NetworkMessage to the wire format."""
+
+    name: str
+    """Name of the codec used in the configuration."""
+
+    version: int
+    """Version of the messages encoded by this codec."""
+
+    def encode(self, message: NetworkMessage) -> SerializedMessage:
+        """Encodes message, message.version must be the version of this codec."""
+        raise NotImplementedError()
+
+    def decode(self, data: SerializedMessage) -> dict:
+        """Decodes data to dictionary, that is converted to NetworkMessage by fides.messaging.decoders."""
+        raise NotImplementedError()
+
+
+class JsonCodec(MessageCodec):
+    """Standard library JSON, copies the message to dictionaries before the encoding."""
+
+    name = 'json'
+    version = 1
+
+    def encode(self, message: NetworkMessage) -> SerializedMessage:
+        # dataclasses are serialized as they are visited, so the message is not deep copied by asdict
+        return json.dumps(message, default=_dataclass_fields)
+
+    def decode(self, data: SerializedMessage) -> dict:
+        return json.loads(data)
+
+
+class FastJsonCodec(JsonCodec):
+    """JSON encoded by orjson, that serializes dataclasses natively, the output is compatible with JsonCodec.
+
+    Falls back to the standard library when orjson is not installed.
+    """
+
+    name = 'fastJson'
+
+    def __init__(self):
+        try:
+            import orjson
+            self.__orjson = orjson
+        except ImportError:
+            self.__orjson = None
+
+    def encode(self, message: NetworkMessage) -> SerializedMessage:
+        if self.__orjson is None:
+            return super().encode(message)
+        # queues work with text for JSON
+        return self.__orjson.dumps(message).decode('utf-8')
+
+    def decode(self, data: SerializedMessage) -> dict:
+        if self.__orjson is None:
+            return super().decode(data)
+        return self.__orjson.loads(data)
+
+
+class MsgPackCodec(MessageCodec):
+    """Binary MessagePack encoding, requires msgpack package."""
+
+    name = 'msgpack'
+    version = 2
+
+    def __init__(self):
+        import msgpack
+        self.__msgpack = msgpack
+
+    def encode(self, message: NetworkMessage) -> SerializedMessage:
+        return self.__msgpack.packb(message, default=_dataclass_fields)
+
+    def decode(self, data: SerializedMessage) -> dict:
+        return self.__msgpack.unpackb(data)
+
+
+CODECS: Dict[str, type] = {codec.name: codec for codec in [JsonCodec, FastJsonCodec, MsgPackCodec]}
+"""Codecs by their name in the configuration."""
+
+SUPPORTED_VERSIONS = frozenset(codec.version for codec in CODECS.values())
+"""Versions of the messages that can be decoded."""
+
+
+def create_codec(name: str) -> MessageCodec:
+    """Creates codec with given name, see CODECS for the options."""
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f'Unknown message codec {name}, options: {list(CODECS)}.')
+    return codec()
+
+
+def is_json(data: SerializedMessage) -> bool:
+    """Returns True if the data are JSON message, otherwise they are encoded by a binary codec."""
+    # JSON message is an object, MessagePack map starts with byte >= 0x80
+    return isinstance(data, str) or data[:1] == b'{'
+
+
+def _dataclass_fields(obj):
+    if is_dataclass(obj):
+        return obj.__dict__
+    raise TypeError(f'Object of type {type(obj).__name__} is not serializable.')
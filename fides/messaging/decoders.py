@@ -0,0 +1,167 @@
+"""
+Decoders of the messages coming from the network layer.
+
+Decoders are compiled once for each data class, type hints of the data class are resolved during
+the compilation, so decoding a message only checks the values and creates the instances.
+Validation is compatible with dacite.from_dict - missing values raise MissingValueError,
+values of a wrong type raise WrongTypeError, ints are accepted for floats and unknown keys are ignored.
+"""
+
+from dataclasses import MISSING, fields, is_dataclass
+from typing import Any, Callable, Dict, List, Type, TypeVar, Union, get_args, get_origin, get_type_hints
+
+from dacite.exceptions import MissingValueError, WrongTypeError
+
+from fides.messaging.model import NetworkMessage
+from fides.model.alert import Alert
+from fides.model.peer import PeerInfo
+from fides.model.recommendation import Recommendation
+from fides.model.threat_intelligence import ThreatIntelligence
+
+T = TypeVar('T')
+
+Decoder = Callable[[Any], T]
+"""Function that creates instance of the data class from the parsed JSON."""
+
+# converts value to the type, the second argument is path of the field for the error messages
+__Converter = Callable[[Any, str], Any]
+
+__compiled: Dict[type, Callable[[Any, str], Any]] = {}
+
+
+def compile_decoder(data_class: Type[T]) -> Decoder[T]:
+    """Returns decoder for given data class, the decoder is compiled only once for each class."""
+    decode = __compile_data_class(data_class)
+    return lambda data: decode(data, '')
+
+
+def __compile_data_class(data_class: type) -> __Converter:
+    decode = __compiled.get(data_class)
+    if decode is not None:
+        return decode
+
+    # placeholder, so recursive data classes reference the final decoder
+    def decode_lazy(value, path):
+        return __compiled[data_class](value, path)
+
+    __compiled[data_class] = decode_lazy
+    hints = get_type_hints(data_class)
+    compiled_fields = []
+    for field in fields(data_class):
+        if not field.init:
+            continue
+        field_type = hints[field.name]
+        if field.default is not MISSING:
+            default = (lambda value: lambda: value)(field.default)
+        elif field.default_factory is not MISSING:
+            default = field.default_factory
+        elif __is_optional(field_type):
+            default = __none
+        else:
+            default = None
+        compiled_fields.append((field.name, __compile_type(field_type), default))
+
+    def decode(value, path):
+        if not isinstance(value, dict):
+            raise WrongTypeError(field_type=data_class, value=value, field_path=path or None)
+        kwargs = {}
+        for name, convert, default in compiled_fields:
+            field_path = f'{path}.{name}' if path else name
+            if name in value:
+                kwargs[name] = convert(value[name], field_path)
+            elif default is not None:
+                kwargs[name] = default()
+            else:
+                raise MissingValueError(field_path=field_path)
+        return data_class(**kwargs)
+
+    __compiled[data_class] = decode
+    return decode
+
+
+def __compile_type(field_type) -> __Converter:
+    if field_type is Any:
+        return __identity
+    if is_dataclass(field_type):
+        return __compile_data_class(field_type)
+
+    origin, args = get_origin(field_type), get_args(field_type)
+    if origin is Union:
+        return __compile_union(field_type, args)
+    if origin in (list, List):
+        return __compile_list(field_type, __compile_type(args[0]) if args else __identity)
+    if origin in (dict, Dict):
+        return __compile_instance_check(field_type, dict)
+    if field_type is float:
+        return __compile_float()
+    if field_type is int:
+        return __compile_instance_check(field_type, int)
+    if isinstance(field_type, type):
+        return __compile_instance_check(field_type, field_type)
+    raise TypeError(f'Unsupported type {field_type} for the compiled decoder.')
+
+
+def __compile_instance_check(field_type, expected_type: type) -> __Converter:
+    def convert(value, path):
+        if not isinstance(value, expected_type):
+            raise WrongTypeError(field_type=field_type, value=value, field_path=path)
+        return value
+
+    return convert
+
+
+def __compile_float() -> __Converter:
+    def convert(value, path):
+        # json does not distinguish 1 and 1.0, bool is an int as well, but it is not accepted
+        if value.__class__ is not float and (value.__class__ is bool or not isinstance(value, (int, float))):
+            raise WrongTypeError(field_type=float, value=value, field_path=path)
+        return value
+
+    return convert
+
+
+def __compile_list(field_type, convert_item: __Converter) -> __Converter:
+    def convert(value, path):
+        if not isinstance(value, list):
+            raise WrongTypeError(field_type=field_type, value=value, field_path=path)
+        if convert_item is __identity:
+            return list(value)
+        return [convert_item(item, path) for item in value]
+
+    return convert
+
+
+def __compile_union(field_type, args: tuple) -> __Converter:
+    non_none = [a for a in args if a is not type(None)]
+    if len(non_none) != 1:
+        raise TypeError(f'Only Optional unions are supported by the compiled decoder, got {field_type}.')
+    convert_value = __compile_type(non_none[0])
+
+    def convert(value, path):
+        if value is None:
+            return None
+        try:
+            return convert_value(value, path)
+        except WrongTypeError:
+            raise WrongTypeError(field_type=field_type, value=value, field_path=path)
+
+    return convert
+
+
+def __is_optional(field_type) -> bool:
+    return get_origin(field_type) is Union and type(None) in get_args(field_type)
+
+
+def __identity(value, _path):
+    return value
+
+
+def __none():
+    return None
+
+
+decode_network_message: Decoder[NetworkMessage] = compile_decoder(NetworkMessage)
+decode_peer_info: Decoder[PeerInfo] = compile_decoder(PeerInfo)
+decode_recommendation: Decoder[Recommendation] = compile_decoder(Recommendation)
+decode_threat_intelligence: Decoder[ThreatIntelligence] = compile_decoder(ThreatIntelligence)
+decode_alert: Decoder[Alert] = compile_decoder(Alert)
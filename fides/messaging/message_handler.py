@@ -1,13 +1,12 @@
 from typing import Dict, List, Callable, Optional, Union
 
-from dacite import from_dict
-
+from fides.messaging.codec import SUPPORTED_VERSIONS
+from fides.messaging.decoders import decode_peer_info, decode_recommendation, decode_alert, \
+    decode_threat_intelligence
 from fides.messaging.model import NetworkMessage, PeerInfo, \
     PeerIntelligenceResponse, PeerRecommendationResponse
 from fides.model.alert import Alert
 from fides.model.aliases import PeerId, Target
-from fides.model.recommendation import Recommendation
-from fides.model.threat_intelligence import ThreatIntelligence
 from fides.utils.logger import Logger
 
 logger = Logger(__name__)
@@ -20,7 +19,8 @@ class MessageHandler:
     The entrypoint is on_message.
     """
 
-    version = 1
+    versions = SUPPORTED_VERSIONS
+    """Supported versions of the messages, the structure is the same, the version identifies the wire format."""
 
     def __init__(self,
                  on_peer_list_update: Callable[[List[PeerInfo]], None],
@@ -30,7 +30,8 @@ class MessageHandler:
                  on_intelligence_request: Callable[[str, PeerInfo, Target], None],
                  on_intelligence_response: Callable[[List[PeerIntelligenceResponse]], None],
                  on_unknown: Optional[Callable[[NetworkMessage], None]] = None,
-                 on_error: Optional[Callable[[Union[str, NetworkMessage], Exception], None]] = None
+                 on_error: Optional[Callable[[Union[str, NetworkMessage], Exception], None]] = None,
+                 on_batch_recommendation_request: Optional[Callable[[str, PeerInfo, List[PeerId]], None]] = None
                  ):
         self.__on_peer_list_update_callback = on_peer_list_update
         self.__on_recommendation_request_callback = on_recommendation_request
@@ -40,6 +41,7 @@ class MessageHandler:
         self.__on_intelligence_response_callback = on_intelligence_response
         self.__on_unknown_callback = on_unknown
         self.__on_error = on_error
+        self.__on_batch_recommendation_request_callback = on_batch_recommendation_request
 
     def on_message(self, message: NetworkMessage):
         """
@@ -48,14 +50,15 @@ class MessageHandler:
         :param message: message from the queue
         :return: value from the underlining function from the constructor
         """
-        if message.version != self.version:
-            logger.warn(f'Unknown message version! This handler supports {self.version}.', message)
+        if message.version not in self.versions:
+            logger.warn(f'Unknown message version! This handler supports {sorted(self.versions)}.', message)
             return self.__on_unknown_message(message)
 
         execution_map = {
             'nl2tl_peers_list': self.__on_nl2tl_peer_list,
             'nl2tl_recommendation_request': self.__on_nl2tl_recommendation_request,
             'nl2tl_recommendation_response': self.__on_nl2tl_recommendation_response,
+            'nl2tl_batch_recommendation_request': self.__on_nl2tl_batch_recommendation_request,
             'nl2tl_alert': self.__on_nl2tl_alert,
             'nl2tl_intelligence_request': self.__on_nl2tl_intelligence_request,
             'nl2tl_intelligence_response': self.__on_nl2tl_intelligence_response
@@ -68,7 +71,7 @@ class MessageHandler:
             # noinspection PyArgumentList
             return func(message.data)
         except Exception as ex:
-            logger.error(f"Error when executing handler for message: {message.type}.", ex)
+            logger.error(f"Error when executing handler for message: {message.type}, Exception: {ex}.")
             if self.__on_error:
                 return self.__on_error(message, ex)
 
@@ -93,7 +96,7 @@ class MessageHandler:
     def __on_nl2tl_peer_list(self, data: Dict):
         logger.debug('nl2tl_peer_list message')
 
-        peers = [from_dict(data_class=PeerInfo, data=peer) for peer in data['peers']]
+        peers = [decode_peer_info(peer) for peer in data['peers']]
         return self.__on_peer_list_update(peers)
 
     def __on_peer_list_update(self, peers: List[PeerInfo]):
@@ -103,20 +106,34 @@ class MessageHandler:
         logger.debug('nl2tl_recommendation_request message')
 
         request_id = data['request_id']
-        sender = from_dict(data_class=PeerInfo, data=data['sender'])
+        sender = decode_peer_info(data['sender'])
         subject = data['payload']
         return self.__on_recommendation_request(request_id, sender, subject)
 
     def __on_recommendation_request(self, request_id: str, sender: PeerInfo, subject: PeerId):
         return self.__on_recommendation_request_callback(request_id, sender, subject)
 
+    def __on_nl2tl_batch_recommendation_request(self, data: Dict):
+        logger.debug('nl2tl_batch_recommendation_request message')
+
+        request_id = data['request_id']
+        sender = decode_peer_info(data['sender'])
+        subjects = data['payload']
+        return self.__on_batch_recommendation_request(request_id, sender, subjects)
+
+    def __on_batch_recommendation_request(self, request_id: str, sender: PeerInfo, subjects: List[PeerId]):
+        if self.__on_batch_recommendation_request_callback is None:
+            logger.warn('Batch recommendation request received, but there is no handler for it!')
+            return
+        return self.__on_batch_recommendation_request_callback(request_id, sender, subjects)
+
     def __on_nl2tl_recommendation_response(self, data: List[Dict]):
         logger.debug('nl2tl_recommendation_response message')
 
         responses = [PeerRecommendationResponse(
-            sender=from_dict(data_class=PeerInfo, data=single['sender']),
+            sender=decode_peer_info(single['sender']),
             subject=single['payload']['subject'],
-            recommendation=from_dict(data_class=Recommendation, data=single['payload']['recommendation'])
+            recommendation=decode_recommendation(single['payload']['recommendation'])
         ) for single in data]
         return self.__on_recommendation_response(responses)
 
@@ -126,8 +143,8 @@ class MessageHandler:
     def __on_nl2tl_alert(self, data: Dict):
         logger.debug('nl2tl_alert message')
 
-        sender = from_dict(data_class=PeerInfo, data=data['sender'])
-        alert = from_dict(data_class=Alert, data=data['payload'])
+        sender = decode_peer_info(data['sender'])
+        alert = decode_alert(data['payload'])
         return self.__on_alert(sender, alert)
 
     def __on_alert(self, sender: PeerInfo, alert: Alert):
@@ -137,7 +154,7 @@ class MessageHandler:
         logger.debug('nl2tl_intelligence_request message')
 
         request_id = data['request_id']
-        sender = from_dict(data_class=PeerInfo, data=data['sender'])
+        sender = decode_peer_info(data['sender'])
         target = data['payload']
         return self.__on_intelligence_request(request_id, sender, target)
 
@@ -148,8 +165,8 @@ class MessageHandler:
         logger.debug('nl2tl_intelligence_response message')
 
         responses = [PeerIntelligenceResponse(
-            sender=from_dict(data_class=PeerInfo, data=single['sender']),
-            intelligence=from_dict(data_class=ThreatIntelligence, data=single['payload']['intelligence']),
+            sender=decode_peer_info(single['sender']),
+            intelligence=decode_threat_intelligence(single['payload']['intelligence']),
             target=single['payload']['target']
         ) for single in data]
         return self.__on_intelligence_response(responses)
@@ -1,12 +1,11 @@
-import json
-from dataclasses import asdict
-from typing import Dict, List
-
-from dacite import from_dict
+from typing import Dict, List, Optional
 
+from fides.messaging.codec import MessageCodec, JsonCodec, SerializedMessage, is_json
+from fides.messaging.decoders import decode_network_message
 from fides.messaging.message_handler import MessageHandler
 from fides.messaging.model import NetworkMessage
 from fides.messaging.queue import Queue
+from fides.messaging.reliability_publisher import ReliabilityPublisher
 from fides.model.alert import Alert
 from fides.model.aliases import PeerId, Target
 from fides.model.recommendation import Recommendation
@@ -22,11 +21,37 @@ class NetworkBridge:
 
     In order to connect bridge to the queue and start receiving messages,
     execute "listen" method.
+
+    Messages are sent as JSON until the network layer sends a message encoded by the preferred codec,
+    which shows that it supports the codec, then all messages are sent encoded by the preferred codec.
+    Received messages are decoded by the codec that matches their version.
     """
-    version = 1
 
-    def __init__(self, queue: Queue):
+    def __init__(self,
+                 queue: Queue,
+                 codec: Optional[MessageCodec] = None,
+                 reliability_window_seconds: float = 0,
+                 reliability_epsilon: float = 0):
+        """
+        :param queue: queue connected to the network layer
+        :param codec: preferred codec, if None, JSON is used
+        :param reliability_window_seconds: peers reliability is sent at most once per window,
+        if it is not 0, flush_peers_reliability_if_due must be called periodically
+        :param reliability_epsilon: smaller changes of the peers reliability are not sent
+        """
         self.__queue = queue
+        self.__reliability = ReliabilityPublisher(self.__send_peers_reliability,
+                                                  reliability_window_seconds, reliability_epsilon)
+        self.__preferred_codec = codec if codec is not None else JsonCodec()
+        # codec for the JSON messages, preferred one if it is a JSON codec as well
+        self.__json_codec = self.__preferred_codec if self.__preferred_codec.version == JsonCodec.version \
+            else JsonCodec()
+        self.__send_codec: MessageCodec = self.__json_codec
+
+    @property
+    def version(self) -> int:
+        """Version of the sent messages, identifies the codec that is used."""
+        return self.__send_codec.version
 
     def listen(self, handler: MessageHandler, block: bool = False):
         """Starts messages processing
@@ -34,11 +59,15 @@ class NetworkBridge:
         If :param: block = False, this method won't block this thread.
         """
 
-        def message_received(message: str):
+        def message_received(message: SerializedMessage):
             try:
                 logger.debug(f'New message received! Trying to parse.')
-                parsed = json.loads(message)
-                network_message = from_dict(data_class=NetworkMessage, data=parsed)
+                codec = self.__json_codec if is_json(message) else self.__preferred_codec
+                network_message = decode_network_message(codec.decode(message))
+                if network_message.version != codec.version:
+                    raise ValueError(f'Message version {network_message.version} does not match '
+                                     f'its encoding {codec.name}.')
+                self.__negotiate(network_message.version)
                 logger.debug('Message parsed. Executing handler.')
                 handler.on_message(network_message)
             except Exception as e:
@@ -112,8 +141,50 @@ class NetworkBridge:
         )
         return self.__send(envelope)
 
+    def send_batch_recommendation_request(self, recipients: List[PeerId], peers: List[PeerId]):
+        """Request recommendations from recipients on multiple peers at once."""
+        envelope = NetworkMessage(
+            type='tl2nl_batch_recommendation_request',
+            version=self.version,
+            data={
+                'receiver_ids': recipients,
+                'payload': peers
+            }
+        )
+        return self.__send(envelope)
+
+    def send_batch_recommendation_response(self, request_id: str,
+                                           recipient: PeerId,
+                                           recommendations: Dict[PeerId, Recommendation]):
+        """Responds to given batch request_id to recipient with recommendations on all requested subjects."""
+        envelope = NetworkMessage(
+            type='tl2nl_batch_recommendation_response',
+            version=self.version,
+            data={
+                'request_id': request_id,
+                'recipient_id': recipient,
+                'payload': [{'subject': subject, 'recommendation': recommendation}
+                            for subject, recommendation in recommendations.items()]
+            }
+        )
+        return self.__send(envelope)
+
     def send_peers_reliability(self, reliability: Dict[PeerId, float]):
-        """Sends peer reliability, this message is only for network layer and is not dispatched to the network."""
+        """Sends peer reliability, this message is only for network layer and is not dispatched to the network.
+
+        Updates are merged and sent at most once per reliability window.
+        """
+        self.__reliability.update(reliability)
+
+    def flush_peers_reliability_if_due(self):
+        """Sends merged peers reliability if the reliability window passed."""
+        self.__reliability.flush_if_due()
+
+    def flush_peers_reliability(self):
+        """Sends merged peers reliability immediately."""
+        self.__reliability.flush()
+
+    def __send_peers_reliability(self, reliability: Dict[PeerId, float]):
         data = [{'peer_id': key, 'reliability': value} for key, value in reliability.items()]
         envelope = NetworkMessage(
             type='tl2nl_peers_reliability',
@@ -122,10 +193,17 @@ class NetworkBridge:
         )
         return self.__send(envelope)
 
+    def __negotiate(self, version: int):
+        if version == self.__preferred_codec.version and self.__send_codec is not self.__preferred_codec:
+            logger.info(f'Network layer supports {self.__preferred_codec.name} codec, using it for sending.')
+            self.__send_codec = self.__preferred_codec
+
     def __send(self, envelope: NetworkMessage):
-        logger.debug('Sending', envelope)
+        # envelope is not logged as a parameter, because that would serialize it once more
+        logger.debug(f'Sending {envelope.type} message.')
         try:
-            j = json.dumps(asdict(envelope))
-            return self.__queue.send(j)
+            codec = self.__send_codec
+            envelope.version = codec.version
+            return self.__queue.send(codec.encode(envelope))
         except Exception as ex:
             logger.error(f'Exception during sending an envelope: {ex}.', envelope)
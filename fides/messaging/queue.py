@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Callable, Union
 
 
 class Queue:
@@ -8,11 +8,11 @@ class Queue:
     Central point used for communication with the network layer and another peers.
     """
 
-    def send(self, serialized_data: str, **argv):
-        """Sends serialized data to the queue."""
+    def send(self, serialized_data: Union[str, bytes], **argv):
+        """Sends serialized data to the queue, data are text for JSON and bytes for the binary codecs."""
         raise NotImplemented('This is interface. Use implementation.')
 
-    def listen(self, on_message: Callable[[str], None], **argv):
+    def listen(self, on_message: Callable[[Union[str, bytes]], None], **argv):
         """Starts listening, executes :param: on_message when new message arrives.
 
         Depending on the implementation, this method might be blocking.
@@ -0,0 +1,68 @@
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from fides.model.aliases import PeerId
+from fides.utils.time import Time, now
+
+
+class ReliabilityPublisher:
+    """Merges updates of the peers reliability and publishes them at most once per window.
+
+    Updates received during the window are accumulated, the latest value of each peer wins.
+    The first update after a quiet window is published immediately, the following ones when the window passes
+    and flush_if_due is called, or when flush is called. Changes smaller than epsilon compared to the last
+    published value of the peer are not published at all.
+    """
+
+    def __init__(self,
+                 publish: Callable[[Dict[PeerId, float]], None],
+                 window_seconds: float = 0,
+                 epsilon: float = 0):
+        """
+        :param publish: sends merged reliability of the peers
+        :param window_seconds: minimal time between two publications, 0 publishes every update
+        :param epsilon: minimal change of the reliability that is published
+        """
+        self.__publish = publish
+        self.__window_seconds = window_seconds
+        self.__epsilon = epsilon
+        self.__published: Dict[PeerId, float] = {}
+        self.__pending: Dict[PeerId, float] = {}
+        self.__published_at: Optional[Time] = None
+        self.__lock = Lock()
+
+    @property
+    def pending_peers(self) -> Dict[PeerId, float]:
+        """Reliability that was not published yet."""
+        return dict(self.__pending)
+
+    def update(self, reliability: Dict[PeerId, float]):
+        """Records new reliability of the peers and publishes them if the window passed."""
+        with self.__lock:
+            for peer_id, value in reliability.items():
+                published = self.__published.get(peer_id)
+                if published is not None and abs(value - published) < self.__epsilon:
+                    # the peer could have moved away and back during the window
+                    self.__pending.pop(peer_id, None)
+                else:
+                    self.__pending[peer_id] = value
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        """Publishes pending reliability if the window passed since the last publication."""
+        with self.__lock:
+            if self.__pending and (self.__published_at is None
+                                   or now() - self.__published_at >= self.__window_seconds):
+                self.__flush()
+
+    def flush(self):
+        """Publishes pending reliability regardless of the window."""
+        with self.__lock:
+            if self.__pending:
+                self.__flush()
+
+    def __flush(self):
+        pending, self.__pending = self.__pending, {}
+        self.__published.update(pending)
+        self.__published_at = now()
+        self.__publish(pending)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import List, Union
+from math import log
+from typing import List, Union, Optional
 
 from fides.evaluation.ti_aggregation import TIAggregationStrategy, TIAggregation
 from fides.evaluation.ti_evaluation import TIEvaluation, EvaluationStrategy
@@ -54,6 +55,39 @@ class TrustedEntity:
     """What level of data should be shared with this entity."""
 
 
+@dataclass(frozen=True)
+class FadingConfiguration:
+    """Forgetting of the older records in the service or recommendation history."""
+
+    strategy: str = 'none'
+    """How older records are forgotten.
+
+    'none' does not forget anything, 'exponential' uses time based exponential decay.
+    """
+
+    half_life_seconds: Optional[float] = None
+    """After how many seconds has the record half of its original importance, used by 'exponential' strategy."""
+
+    @property
+    def decay_rate(self) -> float:
+        """Rate of the exponential decay, the fading factor is f_k = exp(-decay_rate * (t_newest - t_k))."""
+        if self.strategy == 'exponential':
+            return log(2) / self.half_life_seconds
+        return 0
+
+
+@dataclass(frozen=True)
+class TrustCacheConfiguration:
+    max_size: int = 10000
+    """Maximal number of peers held in the cache."""
+
+    flush_interval_seconds: float = 1
+    """Maximal time for which a written peer is not stored to the database."""
+
+    flush_batch_size: int = 100
+    """Number of written peers that triggers the flush to the database."""
+
+
 @dataclass(frozen=True)
 class RecommendationsConfiguration:
     enabled: bool
@@ -83,6 +117,12 @@ class RecommendationsConfiguration:
     In model's notation rh_max.
     """
 
+    fading: FadingConfiguration = FadingConfiguration()
+    """How older recommendations are forgotten, in model's notation rf^z_ik."""
+
+    batch_requests: bool = False
+    """If true, recommendations on multiple new peers are requested in a single message per recipient group."""
+
 
 @dataclass(frozen=True)
 class TrustModelConfiguration:
@@ -128,6 +168,54 @@ class TrustModelConfiguration:
     ti_aggregation_strategy: TIAggregation
     """Threat Intelligence aggregation strategy."""
 
+    service_fading: FadingConfiguration = FadingConfiguration()
+    """How older service interactions are forgotten, in model's notation f^k_ij."""
+
+    incremental_service_trust: bool = False
+    """If true, service trust is updated incrementally from running sums,
+    otherwise it is computed from whole history."""
+
+    incremental_recommendation_trust: bool = False
+    """If true, recommendation trust is updated incrementally from running sums,
+    otherwise it is computed from whole history."""
+
+    service_trust_flush_interval_seconds: Optional[float] = None
+    """If set, service trust is not recomputed after every interaction but lazily, when it is read
+    or at the latest after this many seconds. If None, service trust is recomputed immediately."""
+
+    network_opinion_cache_max_size: int = 10000
+    """Maximal number of cached network opinions, the least recently used ones are evicted."""
+
+    network_opinion_cache_stale_seconds: float = 0
+    """How long is the network opinion kept after it expired. When such stale opinion is requested,
+    it is returned immediately, marked as stale, and the fresh opinion is requested from the network.
+    If 0, expired opinions are not used."""
+
+    intelligence_request_timeout_seconds: float = 30
+    """How long to wait for the responses on intelligence request, before the same target can be requested
+    again. Requests on a target that is already being requested are not sent to the network."""
+
+    trust_cache: Optional[TrustCacheConfiguration] = None
+    """If set, trust data are cached in the process and written to the database in batches,
+    if None, every write goes directly to the database."""
+
+    network_codec: str = 'json'
+    """Preferred wire format of the messages exchanged with the network layer,
+    see fides.messaging.codec.CODECS for options."""
+
+    peers_reliability_window_seconds: float = 0
+    """Updates of the peers reliability are merged and sent to the network layer at most once per this window,
+    if 0, every update is sent."""
+
+    peers_reliability_epsilon: float = 0
+    """Smaller changes of the peer's reliability are not sent to the network layer."""
+
+    network_publish_batch_size: int = 1
+    """Number of messages for the network layer that are published together, 1 publishes every message."""
+
+    network_publish_batch_interval_seconds: float = 0.005
+    """Maximal time for which a message for the network layer waits for the batch."""
+
 
 def load_configuration(file_path: str) -> TrustModelConfiguration:
     with open(file_path, "r") as stream:
@@ -140,6 +228,8 @@ def load_configuration(file_path: str) -> TrustModelConfiguration:
 
 
 def __parse_config(data: dict) -> TrustModelConfiguration:
+    # network section is optional
+    network = data.get('network') or {}
     return TrustModelConfiguration(
         privacy_levels=[PrivacyLevel(name=level['name'],
                                      value=level['value'])
@@ -157,7 +247,9 @@ def __parse_config(data: dict) -> TrustModelConfiguration:
             required_trusted_peers_count=data['trust']['recommendations']['requiredTrustedPeersCount'],
             trusted_peer_threshold=data['trust']['recommendations']['trustedPeerThreshold'],
             peers_max_count=data['trust']['recommendations']['peersMaxCount'],
-            history_max_size=data['trust']['recommendations']['historyMaxSize']
+            history_max_size=data['trust']['recommendations']['historyMaxSize'],
+            fading=__parse_fading(data['trust']['recommendations']),
+            batch_requests=data['trust']['recommendations'].get('batchRequests', False)
         ),
         alert_trust_from_unknown=data['trust']['alert']['defaultTrust'],
         trusted_peers=[TrustedEntity(id=e['id'],
@@ -173,11 +265,45 @@ def __parse_config(data: dict) -> TrustModelConfiguration:
                                              confidentiality_level=e['confidentialityLevel'])
                                for e in data['trust']['organisations']],
         network_opinion_cache_valid_seconds=data['trust']['networkOpinionCacheValidSeconds'],
+        network_opinion_cache_max_size=data['trust'].get('networkOpinionCacheMaxSize', 10000),
+        network_opinion_cache_stale_seconds=data['trust'].get('networkOpinionCacheStaleSeconds', 0),
+        intelligence_request_timeout_seconds=data['trust'].get('intelligenceRequestTimeoutSeconds', 30),
         interaction_evaluation_strategy=__parse_evaluation_strategy(data),
-        ti_aggregation_strategy=TIAggregationStrategy[data['trust']['tiAggregationStrategy']]()
+        ti_aggregation_strategy=TIAggregationStrategy[data['trust']['tiAggregationStrategy']](),
+        service_fading=__parse_fading(data['trust']['service']),
+        incremental_service_trust=data['trust']['service'].get('incrementalEvaluation', False),
+        incremental_recommendation_trust=data['trust']['recommendations'].get('incrementalEvaluation', False),
+        service_trust_flush_interval_seconds=data['trust']['service'].get('lazyEvaluationFlushSeconds'),
+        trust_cache=__parse_trust_cache(data),
+        network_codec=network.get('codec', 'json'),
+        peers_reliability_window_seconds=network.get('reliabilityWindowSeconds', 0),
+        peers_reliability_epsilon=network.get('reliabilityEpsilon', 0),
+        network_publish_batch_size=network.get('publishBatchSize', 1),
+        network_publish_batch_interval_seconds=network.get('publishBatchIntervalSeconds', 0.005)
     )
 
 
+def __parse_fading(data: dict) -> FadingConfiguration:
+    fading = data.get('fading')
+    if not fading:
+        return FadingConfiguration()
+    strategy, half_life = fading['strategy'], fading.get('halfLifeSeconds')
+    if strategy not in ('none', 'exponential'):
+        raise ValueError(f'Unknown fading strategy {strategy}, options: [\'none\', \'exponential\'].')
+    if strategy == 'exponential' and (half_life is None or half_life <= 0):
+        raise ValueError(f'Exponential fading requires positive halfLifeSeconds, got {half_life}.')
+    return FadingConfiguration(strategy=strategy, half_life_seconds=half_life)
+
+
+def __parse_trust_cache(data: dict) -> Optional[TrustCacheConfiguration]:
+    cache = data['trust'].get('cache')
+    if not cache or not cache.get('enabled', False):
+        return None
+    return TrustCacheConfiguration(max_size=cache['maxSize'],
+                                   flush_interval_seconds=cache['flushIntervalSeconds'],
+                                   flush_batch_size=cache['flushBatchSize'])
+
+
 def __parse_evaluation_strategy(data: dict) -> TIEvaluation:
     strategies = data['trust']['interactionEvaluationStrategies']
 
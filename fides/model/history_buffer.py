@@ -0,0 +1,131 @@
+import copy
+from array import array
+from typing import Callable, Generic, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from fides.utils.time import Time
+
+R = TypeVar('R')
+"""Type of the history record - ServiceHistoryRecord or RecommendationHistoryRecord."""
+
+
+class HistoryBuffer(Sequence[R], Generic[R]):
+    """
+    Fixed-capacity ring buffer for the history records.
+
+    Satisfaction, weight and timestamp of the records are stored in parallel typed arrays,
+    records are materialized only when they are accessed. Appending modifies the buffer in place,
+    when the buffer is full, the oldest record is evicted. Buffers that are shared, for example by
+    PeerTrustData instances, should be copied before they are modified.
+
+    Behaves like an ordered list of records, first element is the oldest one.
+    """
+
+    def __init__(self,
+                 record_type: Callable[[float, float, Time], R],
+                 capacity: int,
+                 records: Iterable[R] = ()):
+        """
+        :param record_type: constructor of the record with satisfaction, weight and timestamp parameters
+        :param capacity: maximal number of records in the buffer
+        :param records: initial records, ordered from the oldest one, only last "capacity" records are kept
+        """
+        assert capacity > 0, 'Capacity of the history must be positive.'
+        self.__record_type = record_type
+        self.__capacity = capacity
+        self.__satisfaction = array('d', [0.0]) * capacity
+        self.__weight = array('d', [0.0]) * capacity
+        self.__timestamp = array('d', [0.0]) * capacity
+        # index of the oldest record
+        self.__start = 0
+        self.__size = 0
+        for record in records:
+            self.append(record)
+
+    @property
+    def capacity(self) -> int:
+        """Maximal number of records in the buffer."""
+        return self.__capacity
+
+    def copy(self) -> 'HistoryBuffer[R]':
+        """Returns independent copy of the buffer, only the typed arrays are copied, not the records."""
+        clone = copy.copy(self)
+        clone.__satisfaction = self.__satisfaction[:]
+        clone.__weight = self.__weight[:]
+        clone.__timestamp = self.__timestamp[:]
+        return clone
+
+    def append(self, record: R) -> Optional[R]:
+        """Appends record to the history, returns the record that was evicted or None if the buffer was not full."""
+        return self.append_values(record.satisfaction, record.weight, record.timestamp)
+
+    def append_values(self, satisfaction: float, weight: float, timestamp: Time) -> Optional[R]:
+        """Appends record given by its values, returns evicted record or None if the buffer was not full."""
+        evicted = None
+        if self.__size == self.__capacity:
+            evicted = self[0]
+            idx = self.__start
+            self.__start = (self.__start + 1) % self.__capacity
+        else:
+            idx = (self.__start + self.__size) % self.__capacity
+            self.__size += 1
+
+        self.__satisfaction[idx] = satisfaction
+        self.__weight[idx] = weight
+        self.__timestamp[idx] = timestamp
+        return evicted
+
+    def extend_columns(self, satisfaction: array, weight: array, timestamp: array):
+        """Appends records given by the columns ordered from the oldest one.
+
+        Filling an empty buffer copies the columns at once, which is much faster than appending record by record.
+        """
+        if self.__size:
+            for values in zip(satisfaction, weight, timestamp):
+                self.append_values(*values)
+            return
+        # only last "capacity" records are kept
+        size = min(len(satisfaction), self.__capacity)
+        first = len(satisfaction) - size
+        self.__satisfaction[:size] = satisfaction[first:]
+        self.__weight[:size] = weight[first:]
+        self.__timestamp[:size] = timestamp[first:]
+        self.__start = 0
+        self.__size = size
+
+    def columns(self) -> Tuple[array, array, array]:
+        """Returns copy of satisfaction, weight and timestamp columns ordered from the oldest record."""
+        return self.__ordered(self.__satisfaction), self.__ordered(self.__weight), self.__ordered(self.__timestamp)
+
+    def __ordered(self, column: array) -> array:
+        end = self.__start + self.__size
+        if end <= self.__capacity:
+            return column[self.__start:end]
+        return column[self.__start:] + column[:end - self.__capacity]
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[R, List[R]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.__size))]
+
+        if index < 0:
+            index += self.__size
+        if not 0 <= index < self.__size:
+            raise IndexError('History index out of range.')
+
+        idx = (self.__start + index) % self.__capacity
+        return self.__record_type(self.__satisfaction[idx], self.__weight[idx], self.__timestamp[idx])
+
+    def __iter__(self) -> Iterator[R]:
+        for i in range(self.__size):
+            idx = (self.__start + i) % self.__capacity
+            yield self.__record_type(self.__satisfaction[idx], self.__weight[idx], self.__timestamp[idx])
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (HistoryBuffer, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(capacity={self.__capacity}, records={list(self)})'
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from enum import Enum
 from typing import Dict, List
 
 from fides.model.aliases import PeerId, OrganisationId
@@ -99,6 +100,20 @@ TrustMatrix = Dict[PeerId, PeerTrustData]
 """Matrix that have PeerId as a key and then value is data about trust we have."""
 
 
+class TrustMetric(Enum):
+    """Trust metrics of the peer that can be used to filter and order peers in the database queries."""
+
+    SERVICE_TRUST = 'service_trust'
+    """PeerTrustData.service_trust, st_ij."""
+
+    RECOMMENDATION_TRUST = 'recommendation_trust'
+    """PeerTrustData.recommendation_trust, rt_ij."""
+
+    def of(self, peer: PeerTrustData) -> float:
+        """Returns value of this metric for given peer."""
+        return getattr(peer, self.value)
+
+
 def trust_data_prototype(peer: PeerInfo, has_fixed_trust: bool = False) -> PeerTrustData:
     """Creates clear trust object with 0 values and given peer info."""
     return PeerTrustData(
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Iterable
 
+from fides.model.history_buffer import HistoryBuffer
 from fides.utils.time import Time
 
 
@@ -28,4 +29,13 @@ RecommendationHistory = List[RecommendationHistoryRecord]
 """Ordered list with history of recommendation interactions. 
 
 First element in the list is the oldest one. 
+During the runtime, this is usually RecommendationHistoryBuffer that behaves the same way.
 """
+
+
+class RecommendationHistoryBuffer(HistoryBuffer[RecommendationHistoryRecord]):
+    """Compact fixed-capacity ring buffer with the recommendation history, see HistoryBuffer."""
+
+    def __init__(self, capacity: int, records: Iterable[RecommendationHistoryRecord] = ()):
+        super().__init__(RecommendationHistoryRecord, capacity, records)
+
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Iterable
 
+from fides.model.history_buffer import HistoryBuffer
 from fides.utils.time import Time
 
 
@@ -28,4 +29,12 @@ ServiceHistory = List[ServiceHistoryRecord]
 """Ordered list with history of service interactions. 
 
 First element in the list is the oldest one. 
+During the runtime, this is usually ServiceHistoryBuffer that behaves the same way.
 """
+
+
+class ServiceHistoryBuffer(HistoryBuffer[ServiceHistoryRecord]):
+    """Compact fixed-capacity ring buffer with the service history, see HistoryBuffer."""
+
+    def __init__(self, capacity: int, records: Iterable[ServiceHistoryRecord] = ()):
+        super().__init__(ServiceHistoryRecord, capacity, records)
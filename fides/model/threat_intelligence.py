@@ -28,3 +28,6 @@ class SlipsThreatIntelligence(ThreatIntelligence):
 
     confidentiality: Optional[ConfidentialityLevel] = None
     """Confidentiality level if known."""
+
+    stale: bool = False
+    """True if this is cached network opinion that already expired and is being refreshed."""
@@ -1,13 +1,19 @@
-from typing import Union
+import time
+from typing import List, Union
 
+from fides.evaluation.recommendation.incremental import IncrementalRecommendationTrustEvaluator
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
+from fides.messaging.codec import create_codec
 from fides.messaging.message_handler import MessageHandler
 from fides.messaging.model import NetworkMessage
 from fides.messaging.network_bridge import NetworkBridge
 from fides.messaging.queue_in_memory import InMemoryQueue
 from fides.model.configuration import load_configuration
 from fides.model.threat_intelligence import SlipsThreatIntelligence
-from fides.persistence.threat_intelligence_in_memory import InMemoryThreatIntelligenceDatabase
+from fides.persistence.threat_intelligence_prefix import PrefixThreatIntelligenceDatabase
+from fides.persistence.trust_caching import CachingTrustDatabase
 from fides.persistence.trust_in_memory import InMemoryTrustDatabase
+from fides.persistence.trust_lazy import LazyEvaluationTrustDatabase
 from fides.protocols.alert import AlertProtocol
 from fides.protocols.initial_trusl import InitialTrustProtocol
 from fides.protocols.opinion import OpinionAggregator
@@ -24,26 +30,45 @@ if __name__ == '__main__':
 
     config = load_configuration('../fides.conf.yml')
 
-    trust_db = InMemoryTrustDatabase(config)
-    ti_db = InMemoryThreatIntelligenceDatabase()
-
     queue = InMemoryQueue()
 
-    bridge = NetworkBridge(queue)
+    bridge = NetworkBridge(queue, create_codec(config.network_codec),
+                           config.peers_reliability_window_seconds, config.peers_reliability_epsilon)
+
+    # decorators of the trust database with pending work, ordered from the outer one
+    buffered_dbs: List[Union[LazyEvaluationTrustDatabase, CachingTrustDatabase]] = []
+    trust_db = InMemoryTrustDatabase(config)
+    if config.trust_cache is not None:
+        trust_db = CachingTrustDatabase(trust_db, config.trust_cache.max_size,
+                                        config.trust_cache.flush_interval_seconds, config.trust_cache.flush_batch_size)
+        buffered_dbs.insert(0, trust_db)
+    if config.service_trust_flush_interval_seconds is not None:
+        trust_db = LazyEvaluationTrustDatabase(
+            trust_db, config.service_trust_flush_interval_seconds,
+            on_flush=lambda m: bridge.send_peers_reliability({p.peer_id: p.service_trust for p in m.values()})
+        )
+        buffered_dbs.insert(0, trust_db)
+    ti_db = PrefixThreatIntelligenceDatabase()
 
 
     def network_opinion_callback(ti: SlipsThreatIntelligence):
         logger.info(f'Callback: Target: {ti.target}, Score: {ti.score}, Confidence: {ti.confidence}')
 
 
-    recommendations = RecommendationProtocol(config, trust_db, bridge, )
-    trust = InitialTrustProtocol(trust_db, config, recommendations)
+    # running sums of the incremental evaluation are shared by all protocols
+    service_evaluator = IncrementalServiceTrustEvaluator() if config.incremental_service_trust else None
+    recommendation_evaluator = IncrementalRecommendationTrustEvaluator() \
+        if config.incremental_recommendation_trust else None
+
+    recommendations = RecommendationProtocol(config, trust_db, bridge, service_evaluator, recommendation_evaluator)
+    trust = InitialTrustProtocol(trust_db, config, recommendations, service_evaluator)
     peer_list = PeerListUpdateProtocol(trust_db, bridge, recommendations, trust)
     opinion = OpinionAggregator(config, ti_db, config.ti_aggregation_strategy)
 
     intelligence = ThreatIntelligenceProtocol(trust_db, ti_db, bridge, config, opinion, trust,
-                                              config.interaction_evaluation_strategy, network_opinion_callback)
-    alert = AlertProtocol(trust_db, bridge, trust, config, opinion, network_opinion_callback)
+                                              config.interaction_evaluation_strategy, network_opinion_callback,
+                                              service_evaluator)
+    alert = AlertProtocol(trust_db, bridge, trust, config, opinion, network_opinion_callback, service_evaluator)
 
 
     def on_unknown_message(message: NetworkMessage):
@@ -62,7 +87,23 @@ if __name__ == '__main__':
         on_intelligence_request=intelligence.handle_intelligence_request,
         on_intelligence_response=intelligence.handle_intelligence_response,
         on_unknown=on_unknown_message,
-        on_error=on_error
+        on_error=on_error,
+        on_batch_recommendation_request=recommendations.handle_batch_recommendation_request
     )
 
     bridge.listen(message_handler)
+
+    try:
+        while True:
+            # the decorators don't have their own timers, so the pending work is flushed from here
+            for db in buffered_dbs:
+                db.flush_if_due()
+            bridge.flush_peers_reliability_if_due()
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        logger.info('Stopping.')
+    finally:
+        # write all pending trust data, outer decorators first as they write to the inner ones
+        for db in buffered_dbs:
+            db.flush()
+        bridge.flush_peers_reliability()
@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from threading import Lock
+from typing import Optional
+
+from fides.model.aliases import Target
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.utils.time import Time, now
+
+
+@dataclass
+class NetworkOpinionCacheStatistics:
+    """Counters of the NetworkOpinionCache."""
+
+    hits: int = 0
+    """Number of reads that found valid opinion."""
+
+    stale_hits: int = 0
+    """Number of reads that found expired opinion in the stale window."""
+
+    misses: int = 0
+    """Number of reads that did not find valid opinion."""
+
+    evictions: int = 0
+    """Number of valid opinions removed because the cache was full."""
+
+    expirations: int = 0
+    """Number of opinions removed because they expired, including the stale window."""
+
+
+class NetworkOpinionCache:
+    """Bounded cache of the aggregated network opinions.
+
+    When the cache is full, the least recently used opinion is evicted. Expired opinions are removed
+    on every access, because all opinions have the same time to live, they expire in the order
+    in which they were cached, so the removal costs O(1) per expired opinion.
+
+    Expired opinions can be kept for additional stale window, during which they are returned
+    only when the caller accepts stale opinions.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, stale_seconds: float = 0):
+        """
+        :param max_size: maximal number of cached opinions
+        :param ttl_seconds: how long is the opinion valid
+        :param stale_seconds: how long is the opinion kept after it expired
+        """
+        assert max_size > 0, 'Cache size must be positive.'
+        self.__max_size = max_size
+        self.__ttl_seconds = ttl_seconds
+        self.__stale_seconds = stale_seconds
+        # ordered from the least recently used opinion
+        self.__opinions: OrderedDict[Target, SlipsThreatIntelligence] = OrderedDict()
+        # ordered from the oldest opinion, so from the first one that expires
+        self.__created: OrderedDict[Target, Time] = OrderedDict()
+        self.__statistics = NetworkOpinionCacheStatistics()
+        self.__lock = Lock()
+
+    @property
+    def statistics(self) -> NetworkOpinionCacheStatistics:
+        """Snapshot of the cache counters."""
+        with self.__lock:
+            return replace(self.__statistics)
+
+    def __len__(self) -> int:
+        return len(self.__opinions)
+
+    def put(self, ti: SlipsThreatIntelligence):
+        """Caches opinion on its target, replaces older opinion on the same target."""
+        with self.__lock:
+            current_time = now()
+            self.__remove_expired(current_time)
+            self.__opinions[ti.target] = ti
+            self.__opinions.move_to_end(ti.target)
+            self.__created[ti.target] = current_time
+            self.__created.move_to_end(ti.target)
+
+            while len(self.__opinions) > self.__max_size:
+                target, _ = self.__opinions.popitem(last=False)
+                del self.__created[target]
+                self.__statistics.evictions += 1
+
+    def get(self, target: Target, include_stale: bool = False) -> Optional[SlipsThreatIntelligence]:
+        """Returns valid opinion on the target or None if there is none.
+
+        :param target: target of the opinion
+        :param include_stale: if True, opinion in the stale window is returned as well, marked as stale
+        :return: cached opinion or None
+        """
+        with self.__lock:
+            current_time = now()
+            self.__remove_expired(current_time)
+            ti = self.__opinions.get(target)
+            stale = ti is not None and current_time - self.__created[target] >= self.__ttl_seconds
+            if ti is None or (stale and not include_stale):
+                self.__statistics.misses += 1
+                return None
+            self.__opinions.move_to_end(target)
+            if stale:
+                self.__statistics.stale_hits += 1
+                return replace(ti, stale=True)
+            self.__statistics.hits += 1
+            return ti
+
+    def __remove_expired(self, current_time: Time):
+        while self.__created:
+            target, created = next(iter(self.__created.items()))
+            if current_time - created < self.__ttl_seconds + self.__stale_seconds:
+                return
+            del self.__created[target]
+            del self.__opinions[target]
+            self.__statistics.expirations += 1
@@ -0,0 +1,105 @@
+from typing import Generic, List, Optional, TypeVar
+
+V = TypeVar('V')
+
+
+class PrefixTrie(Generic[V]):
+    """Path-compressed binary trie (radix tree) mapping bit prefixes to values.
+
+    Keys are integers of fixed width, the prefix consists of the highest length bits of the key.
+    Both insert and longest prefix match visit at most one node per bit, so they are O(width).
+    Nodes exist only where the stored prefixes branch, so the trie needs O(n) nodes for n prefixes.
+    """
+
+    class Node:
+        __slots__ = ('key', 'length', 'children', 'value')
+
+        def __init__(self, key: int, length: int, value=None):
+            self.key = key
+            """Prefix of the node, bits after the length are zero."""
+            self.length = length
+            self.children: List[Optional['PrefixTrie.Node']] = [None, None]
+            self.value = value
+
+    def __init__(self, width: int):
+        """
+        :param width: number of bits of the keys, 32 for IPv4 and 128 for IPv6
+        """
+        self.__width = width
+        self.__root = PrefixTrie.Node(0, 0)
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def insert(self, key: int, length: int, value: V):
+        """Stores value for the prefix of the given length, replaces the previous value of the same prefix."""
+        assert 0 <= length <= self.__width, f'Prefix length must be between 0 and {self.__width}.'
+        width = self.__width
+        key = self.__mask(key, length)
+        node = self.__root
+        while True:
+            # node is a prefix of the inserted key
+            if node.length == length:
+                if node.value is None:
+                    self.__size += 1
+                node.value = value
+                return
+
+            bit = (key >> (width - 1 - node.length)) & 1
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = PrefixTrie.Node(key, length, value)
+                self.__size += 1
+                return
+
+            # the child is usually a prefix of the key as well, so check that first
+            child_length = child.length
+            if child_length <= length and not (key ^ child.key) >> (width - child_length):
+                node = child
+                continue
+
+            common = self.__common_length(key, child.key, min(length, child_length))
+
+            # inserted prefix branches in the middle of the edge to the child
+            if common == length:
+                branch = PrefixTrie.Node(key, length, value)
+            else:
+                branch = PrefixTrie.Node(self.__mask(key, common), common)
+                branch.children[self.__bit(key, common)] = PrefixTrie.Node(key, length, value)
+            branch.children[self.__bit(child.key, common)] = child
+            node.children[bit] = branch
+            self.__size += 1
+            return
+
+    def longest_match(self, key: int) -> Optional[V]:
+        """Returns value of the longest stored prefix of the key, None if no prefix matches."""
+        width = self.__width
+        best = None
+        node = self.__root
+        while node is not None:
+            length = node.length
+            if (key ^ node.key) >> (width - length):
+                break
+            if node.value is not None:
+                best = node.value
+            if length == width:
+                break
+            node = node.children[(key >> (width - 1 - length)) & 1]
+        return best
+
+    def __bit(self, key: int, index: int) -> int:
+        """Returns bit of the key on the index, counted from the highest bit."""
+        return (key >> (self.__width - 1 - index)) & 1
+
+    def __mask(self, key: int, length: int) -> int:
+        """Keeps only the highest length bits of the key."""
+        shift = self.__width - length
+        return (key >> shift) << shift
+
+    def __common_length(self, a: int, b: int, limit: int) -> int:
+        """Returns length of the common prefix of the keys, at most limit."""
+        different = a ^ b
+        if not different:
+            return limit
+        return min(self.__width - different.bit_length(), limit)
@@ -0,0 +1,59 @@
+from dataclasses import replace
+from ipaddress import ip_address, ip_network
+from threading import RLock
+from typing import Dict, Iterable, Optional
+
+from fides.model.aliases import Target
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.prefix_trie import PrefixTrie
+from fides.persistence.threat_intelligence import ThreatIntelligenceDatabase
+
+
+class PrefixThreatIntelligenceDatabase(ThreatIntelligenceDatabase):
+    """Implementation of ThreatIntelligenceDatabase that answers queries on IP addresses from network level data.
+
+    Intelligence on IP addresses and networks (CIDR notation, such as 10.0.0.0/8 or 2001:db8::/32) is stored
+    in a prefix trie for each IP version, query on an IP address returns intelligence on the most specific
+    network that contains the address, in O(address bits). Domains are matched exactly, case-insensitive.
+    """
+
+    def __init__(self):
+        self.__tries: Dict[int, PrefixTrie[SlipsThreatIntelligence]] = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+        self.__domains: Dict[Target, SlipsThreatIntelligence] = {}
+        self.__lock = RLock()
+
+    def __len__(self) -> int:
+        return sum(len(trie) for trie in self.__tries.values()) + len(self.__domains)
+
+    def get_for(self, target: Target) -> Optional[SlipsThreatIntelligence]:
+        """Returns threat intelligence for given target or None if there are no data.
+
+        Returned intelligence has the queried target, even when it was found for the whole network.
+        """
+        try:
+            address = ip_address(target)
+        except ValueError:
+            ti = self.__domains.get(target.lower())
+        else:
+            ti = self.__tries[address.version].longest_match(int(address))
+        # copy, so the callers can not modify the stored intelligence
+        return replace(ti, target=target) if ti is not None else None
+
+    def save(self, ti: SlipsThreatIntelligence):
+        """Saves given ti to the database, target can be a domain, an IP address or a network."""
+        with self.__lock:
+            self.__save(ti)
+
+    def save_all(self, intelligence: Iterable[SlipsThreatIntelligence]):
+        """Saves all intelligence to the database, use this for loading of the large block lists."""
+        with self.__lock:
+            for ti in intelligence:
+                self.__save(ti)
+
+    def __save(self, ti: SlipsThreatIntelligence):
+        try:
+            network = ip_network(ti.target, strict=False)
+        except ValueError:
+            self.__domains[ti.target.lower()] = ti
+        else:
+            self.__tries[network.version].insert(int(network.network_address), network.prefixlen, ti)
@@ -1,9 +1,12 @@
-from typing import List, Optional, Union
+from typing import Callable, Collection, Dict, List, Optional, Tuple, Union
 
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
+from fides.evaluation.service.interaction import Satisfaction, Weight
+from fides.evaluation.service.process import process_service_interactions
 from fides.messaging.model import PeerInfo
 from fides.model.aliases import PeerId, Target, OrganisationId
 from fides.model.configuration import TrustModelConfiguration
-from fides.model.peer_trust_data import PeerTrustData, TrustMatrix
+from fides.model.peer_trust_data import PeerTrustData, TrustMatrix, TrustMetric
 from fides.model.threat_intelligence import SlipsThreatIntelligence
 
 
@@ -41,6 +44,31 @@ class TrustDatabase:
         """Returns peers that have >= service_trust then the minimal."""
         raise NotImplemented()
 
+    def get_top_peers_trust_data(self,
+                                 order_by: TrustMetric,
+                                 limit: int,
+                                 minimal_trust: Dict[TrustMetric, float],
+                                 exclude: Collection[PeerId] = ()) -> List[PeerTrustData]:
+        """Returns at most limit peers with the highest order_by metric, ordered from the highest one.
+
+        Only peers that have at least one of the metrics from minimal_trust >= its value are returned,
+        peers in exclude are skipped. Each peer is returned at most once.
+
+        This implementation scans the database, backends should answer the query from an ordered index.
+        """
+        peers: List[PeerInfo] = []
+        if TrustMetric.SERVICE_TRUST in minimal_trust:
+            peers += self.get_peers_with_geq_service_trust(minimal_trust[TrustMetric.SERVICE_TRUST])
+        if TrustMetric.RECOMMENDATION_TRUST in minimal_trust:
+            peers += self.get_peers_with_geq_recommendation_trust(minimal_trust[TrustMetric.RECOMMENDATION_TRUST])
+
+        excluded = set(exclude)
+        candidates = [p for p in self.get_peers_trust_data([p.id for p in peers if p.id not in excluded]).values()
+                      if p]
+        # ties are ordered by peer id, so the result is deterministic
+        candidates.sort(key=lambda p: (-order_by.of(p), p.peer_id))
+        return candidates[:limit]
+
     def store_peer_trust_data(self, trust_data: PeerTrustData):
         """Stores trust data for given peer - overwrites any data if existed."""
         raise NotImplemented()
@@ -54,6 +82,30 @@ class TrustDatabase:
         """Returns trust data for given peer ID, if no data are found, returns None."""
         raise NotImplemented()
 
+    def record_service_interactions(self,
+                                    data: Dict[PeerId, Tuple[PeerTrustData, Satisfaction, Weight]],
+                                    updated_peers: Optional[TrustMatrix] = None,
+                                    on_evaluated: Optional[Callable[[TrustMatrix], None]] = None,
+                                    evaluator: Optional[IncrementalServiceTrustEvaluator] = None) -> TrustMatrix:
+        """Evaluates service interactions with the peers and stores their new trust data.
+
+        This implementation recomputes the service trust immediately, decorators can defer the recomputation.
+
+        :param data: interactions to evaluate
+        :param updated_peers: other peers updated by the caller that are stored together with the evaluated ones,
+        peers in data should already contain these updates
+        :param on_evaluated: executed with the stored peers that have up-to-date service trust,
+        for example to notify the network layer
+        :param evaluator: evaluator that updates service trust incrementally, None computes it from the whole history
+        :return: stored trust data of all peers
+        """
+        trust_matrix = {**(updated_peers if updated_peers else {}),
+                        **process_service_interactions(self.__configuration, data, evaluator)}
+        self.store_peer_trust_matrix(trust_matrix)
+        if on_evaluated:
+            on_evaluated(trust_matrix)
+        return trust_matrix
+
     def get_peers_trust_data(self, peer_ids: List[Union[PeerId, PeerInfo]]) -> TrustMatrix:
         """Return trust data for each peer from peer_ids."""
         data = [self.get_peer_trust_data(peer_id) for peer_id in peer_ids]
@@ -63,6 +115,10 @@ class TrustDatabase:
         """Caches aggregated opinion on given target."""
         raise NotImplemented()
 
-    def get_cached_network_opinion(self, target: Target) -> Optional[SlipsThreatIntelligence]:
-        """Returns cached network opinion. Checks cache time and returns None if data expired."""
+    def get_cached_network_opinion(self, target: Target, include_stale: bool = False) \
+            -> Optional[SlipsThreatIntelligence]:
+        """Returns cached network opinion. Checks cache time and returns None if data expired.
+
+        If include_stale is True, expired opinion in the stale window is returned as well, marked as stale.
+        """
         raise NotImplemented()
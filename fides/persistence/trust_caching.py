@@ -0,0 +1,227 @@
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from threading import RLock
+from time import perf_counter
+from typing import Collection, Dict, List, Optional, Union
+
+from fides.messaging.model import PeerInfo
+from fides.model.aliases import PeerId, Target, OrganisationId
+from fides.model.peer_trust_data import PeerTrustData, TrustMatrix, TrustMetric
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.trust import TrustDatabase
+from fides.utils.logger import Logger
+from fides.utils.time import Time, now
+
+logger = Logger(__name__)
+
+
+@dataclass
+class CacheStatistics:
+    """Statistics of the CachingTrustDatabase."""
+
+    hits: int = 0
+    """Number of peers that were read from the cache."""
+
+    misses: int = 0
+    """Number of peers that had to be read from the underlying database."""
+
+    flushes: int = 0
+    """Number of batches written to the underlying database."""
+
+    flushed_peers: int = 0
+    """Number of peers written to the underlying database."""
+
+    flush_seconds_total: float = 0
+    """Time spent writing to the underlying database."""
+
+    flush_seconds_max: float = 0
+    """Longest write to the underlying database."""
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of the reads served from the cache, 0 if nothing was read yet."""
+        reads = self.hits + self.misses
+        return self.hits / reads if reads else 0
+
+    @property
+    def flush_seconds_mean(self) -> float:
+        """Mean duration of a single flush, 0 if nothing was flushed yet."""
+        return self.flush_seconds_total / self.flushes if self.flushes else 0
+
+
+class CachingTrustDatabase(TrustDatabase):
+    """Trust database decorator with write-behind cache of the peers trust data.
+
+    Reads are served from a bounded in-process LRU cache, writes only update the cache and mark the peers dirty.
+    Dirty peers are written to the underlying database in a single batch when there are at least
+    flush_batch_size of them, when the flush interval passes or when flush is called - it must be called
+    before the process exits, otherwise the dirty peers are lost.
+
+    Queries over all peers (thresholds, organisations, top peers) flush the dirty peers first
+    and are answered by the underlying database.
+    """
+
+    def __init__(self,
+                 delegate: TrustDatabase,
+                 max_size: int,
+                 flush_interval_seconds: float,
+                 flush_batch_size: int):
+        """
+        :param delegate: database that actually stores the data
+        :param max_size: maximal number of peers in the cache
+        :param flush_interval_seconds: maximal time for which a dirty peer is not written to the delegate
+        :param flush_batch_size: number of dirty peers that triggers the flush
+        """
+        assert max_size > 0, 'Cache size must be positive.'
+        super().__init__(delegate.get_model_configuration())
+        self.__delegate = delegate
+        self.__max_size = max_size
+        self.__flush_interval_seconds = flush_interval_seconds
+        self.__flush_batch_size = flush_batch_size
+        # ordered from the least recently used peer
+        self.__cache: OrderedDict[PeerId, PeerTrustData] = OrderedDict()
+        self.__dirty: Dict[PeerId, None] = {}
+        # time when the oldest dirty peer was marked
+        self.__dirty_since: Optional[Time] = None
+        self.__statistics = CacheStatistics()
+        self.__lock = RLock()
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        """Snapshot of the cache statistics."""
+        with self.__lock:
+            return replace(self.__statistics)
+
+    @property
+    def dirty_peers(self) -> List[PeerId]:
+        """Peers that were not written to the underlying database yet."""
+        return list(self.__dirty)
+
+    def flush(self):
+        """Writes all dirty peers to the underlying database in a single batch."""
+        with self.__lock:
+            if not self.__dirty:
+                return
+            trust_matrix = {peer_id: self.__cache[peer_id] for peer_id in self.__dirty}
+            start = perf_counter()
+            self.__delegate.store_peer_trust_matrix(trust_matrix)
+            duration = perf_counter() - start
+            # peers stay dirty when the write fails, so they are written during the next flush
+            self.__dirty.clear()
+            self.__dirty_since = None
+
+            self.__statistics.flushes += 1
+            self.__statistics.flushed_peers += len(trust_matrix)
+            self.__statistics.flush_seconds_total += duration
+            self.__statistics.flush_seconds_max = max(self.__statistics.flush_seconds_max, duration)
+            logger.debug(f'Flushed {len(trust_matrix)} peers in {duration * 1000:.2f} ms.')
+
+    def flush_if_due(self):
+        """Flushes dirty peers if the flush interval passed since the oldest one was marked."""
+        with self.__lock:
+            if self.__dirty_since is not None and now() - self.__dirty_since >= self.__flush_interval_seconds:
+                self.flush()
+
+    def store_peer_trust_data(self, trust_data: PeerTrustData):
+        """Stores trust data for given peer - overwrites any data if existed."""
+        self.store_peer_trust_matrix({trust_data.peer_id: trust_data})
+
+    def store_peer_trust_matrix(self, trust_matrix: TrustMatrix):
+        """Stores trust matrix to the cache, it is written to the underlying database later."""
+        with self.__lock:
+            for peer in trust_matrix.values():
+                if self.__dirty_since is None:
+                    self.__dirty_since = now()
+                self.__dirty[peer.peer_id] = None
+                self.__put(peer)
+
+            if len(self.__dirty) >= self.__flush_batch_size:
+                self.flush()
+            else:
+                self.flush_if_due()
+
+    def get_peer_trust_data(self, peer: Union[PeerId, PeerInfo]) -> Optional[PeerTrustData]:
+        """Returns trust data for given peer ID, if no data are found, returns None."""
+        peer_id = peer.id if isinstance(peer, PeerInfo) else peer
+        return self.get_peers_trust_data([peer_id]).get(peer_id)
+
+    def get_peers_trust_data(self, peer_ids: List[Union[PeerId, PeerInfo]]) -> TrustMatrix:
+        """Return trust data for each peer from peer_ids, peers that are not cached are loaded in one batch."""
+        with self.__lock:
+            trust_matrix: TrustMatrix = {}
+            missing: List[PeerId] = []
+            for peer_id in dict.fromkeys(p.id if isinstance(p, PeerInfo) else p for p in peer_ids):
+                peer = self.__cache.get(peer_id)
+                if peer is None:
+                    missing.append(peer_id)
+                else:
+                    self.__cache.move_to_end(peer_id)
+                    trust_matrix[peer_id] = peer
+
+            self.__statistics.hits += len(trust_matrix)
+            self.__statistics.misses += len(missing)
+            if missing:
+                loaded = self.__delegate.get_peers_trust_data(missing)
+                for peer in loaded.values():
+                    self.__put(peer)
+                trust_matrix.update(loaded)
+            return trust_matrix
+
+    def get_peers_info(self, peer_ids: List[PeerId]) -> List[PeerInfo]:
+        """Returns list of peer infos for given ids."""
+        trust_matrix = self.get_peers_trust_data(peer_ids)
+        return [trust_matrix[p].info for p in peer_ids if p in trust_matrix]
+
+    def get_peers_with_organisations(self, organisations: List[OrganisationId]) -> List[PeerInfo]:
+        """Returns list of peers that have one of given organisations."""
+        with self.__lock:
+            self.flush()
+            return self.__delegate.get_peers_with_organisations(organisations)
+
+    def get_peers_with_geq_recommendation_trust(self, minimal_recommendation_trust: float) -> List[PeerInfo]:
+        """Returns peers that have >= recommendation_trust then the minimal."""
+        with self.__lock:
+            self.flush()
+            return self.__delegate.get_peers_with_geq_recommendation_trust(minimal_recommendation_trust)
+
+    def get_peers_with_geq_service_trust(self, minimal_service_trust: float) -> List[PeerInfo]:
+        """Returns peers that have >= service_trust then the minimal."""
+        with self.__lock:
+            self.flush()
+            return self.__delegate.get_peers_with_geq_service_trust(minimal_service_trust)
+
+    def get_top_peers_trust_data(self,
+                                 order_by: TrustMetric,
+                                 limit: int,
+                                 minimal_trust: Dict[TrustMetric, float],
+                                 exclude: Collection[PeerId] = ()) -> List[PeerTrustData]:
+        """Returns at most limit peers with the highest order_by metric, ordered from the highest one."""
+        with self.__lock:
+            self.flush()
+            return self.__delegate.get_top_peers_trust_data(order_by, limit, minimal_trust, exclude)
+
+    def store_connected_peers_list(self, current_peers: List[PeerInfo]):
+        """Stores list of peers that are directly connected to the Slips."""
+        self.__delegate.store_connected_peers_list(current_peers)
+
+    def get_connected_peers(self) -> List[PeerInfo]:
+        """Returns list of peers that are directly connected to the Slips."""
+        return self.__delegate.get_connected_peers()
+
+    def cache_network_opinion(self, ti: SlipsThreatIntelligence):
+        """Caches aggregated opinion on given target."""
+        self.__delegate.cache_network_opinion(ti)
+
+    def get_cached_network_opinion(self, target: Target, include_stale: bool = False) \
+            -> Optional[SlipsThreatIntelligence]:
+        """Returns cached network opinion. Checks cache time and returns None if data expired."""
+        return self.__delegate.get_cached_network_opinion(target, include_stale)
+
+    def __put(self, peer: PeerTrustData):
+        self.__cache[peer.peer_id] = peer
+        self.__cache.move_to_end(peer.peer_id)
+        while len(self.__cache) > self.__max_size:
+            if next(iter(self.__cache)) in self.__dirty:
+                # the least recently used peer was not written yet
+                self.flush()
+            self.__cache.popitem(last=False)
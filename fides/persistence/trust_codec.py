@@ -0,0 +1,164 @@
+"""
+Compact binary encoding of PeerTrustData.
+
+Layout, all numbers are little-endian:
+- header: version, flags, service trust, reputation, recommendation trust, competence belief,
+  integrity belief, initial reputation provided by count, service history size,
+  recommendation history size, number of organisations
+- peer info: id, ip if the flag is set and organisations, each as utf-8 string prefixed by its length
+- service history and recommendation history, each as satisfaction, weight and timestamp float64 arrays
+
+Histories are at the end, so a decoder that needs only the peer info and scalar metrics does not touch them.
+"""
+
+import struct
+import sys
+from array import array
+from typing import List, Tuple
+
+from fides.model.configuration import TrustModelConfiguration
+from fides.model.history_buffer import HistoryBuffer
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import PeerTrustData
+from fides.model.recommendation_history import RecommendationHistoryBuffer
+from fides.model.service_history import ServiceHistoryBuffer
+
+CODEC_VERSION = 1
+"""Version of the encoding, stored in the first byte."""
+
+__HEADER = struct.Struct('<BB5dIHHH')
+__STRING_SIZE = struct.Struct('<H')
+# satisfaction, weight and timestamp
+__RECORD_SIZE = 3 * 8
+
+__HAS_FIXED_TRUST = 0b01
+__HAS_IP = 0b10
+
+
+def encode_peer_trust_data(peer: PeerTrustData) -> bytes:
+    """Encodes peer trust data to the compact binary representation."""
+    info = peer.info
+    flags = (__HAS_FIXED_TRUST if peer.has_fixed_trust else 0) | (__HAS_IP if info.ip is not None else 0)
+    parts = [__HEADER.pack(CODEC_VERSION, flags,
+                           peer.service_trust, peer.reputation, peer.recommendation_trust,
+                           peer.competence_belief, peer.integrity_belief,
+                           peer.initial_reputation_provided_by_count,
+                           len(peer.service_history), len(peer.recommendation_history), len(info.organisations))]
+
+    strings = [info.id] + ([info.ip] if info.ip is not None else []) + list(info.organisations)
+    for string in strings:
+        encoded = string.encode('utf-8')
+        parts.append(__STRING_SIZE.pack(len(encoded)))
+        parts.append(encoded)
+
+    parts.append(encode_history(peer.service_history))
+    parts.append(encode_history(peer.recommendation_history))
+    return b''.join(parts)
+
+
+def decode_peer_trust_data(data: bytes,
+                           configuration: TrustModelConfiguration,
+                           include_histories: bool = True) -> PeerTrustData:
+    """Decodes peer trust data encoded by encode_peer_trust_data.
+
+    :param data: encoded trust data
+    :param configuration: configuration of the current trust model, determines capacity of the histories
+    :param include_histories: when False, histories are not decoded and the returned histories are empty,
+    such data must not be stored back to the database
+    :return: decoded trust data
+    """
+    view = memoryview(data)
+    version, flags, service_trust, reputation, recommendation_trust, competence_belief, integrity_belief, \
+        initial_reputation_provided_by_count, service_history_size, recommendation_history_size, \
+        organisations_count = __decode_header(view)
+
+    info, offset = __decode_info(view, flags, organisations_count)
+    service_history = ServiceHistoryBuffer(capacity=configuration.service_history_max_size)
+    recommendation_history = RecommendationHistoryBuffer(capacity=configuration.recommendations.history_max_size)
+    if include_histories:
+        offset = __decode_history(view, offset, service_history_size, service_history)
+        __decode_history(view, offset, recommendation_history_size, recommendation_history)
+
+    return PeerTrustData(
+        info=info,
+        has_fixed_trust=bool(flags & __HAS_FIXED_TRUST),
+        service_trust=service_trust,
+        reputation=reputation,
+        recommendation_trust=recommendation_trust,
+        competence_belief=competence_belief,
+        integrity_belief=integrity_belief,
+        initial_reputation_provided_by_count=initial_reputation_provided_by_count,
+        service_history=service_history,
+        recommendation_history=recommendation_history
+    )
+
+
+def decode_peer_info(data: bytes) -> PeerInfo:
+    """Decodes only the peer info from data encoded by encode_peer_trust_data, histories are skipped."""
+    view = memoryview(data)
+    header = __decode_header(view)
+    info, _ = __decode_info(view, flags=header[1], organisations_count=header[-1])
+    return info
+
+
+def encode_history(history) -> bytes:
+    """Encodes only the history as satisfaction, weight and timestamp float64 arrays."""
+    return b''.join(column.tobytes() for column in __history_columns(history))
+
+
+def decode_history(data: bytes, history: HistoryBuffer) -> HistoryBuffer:
+    """Decodes history encoded by encode_history and appends it to the given buffer, returns the buffer."""
+    __decode_history(memoryview(data), 0, len(data) // __RECORD_SIZE, history)
+    return history
+
+
+def __decode_header(view: memoryview) -> tuple:
+    if not len(view) or view[0] != CODEC_VERSION:
+        raise ValueError(f'Unsupported trust data encoding version {view[0] if len(view) else None}.')
+    return __HEADER.unpack_from(view)
+
+
+def __decode_info(view: memoryview, flags: int, organisations_count: int) -> Tuple[PeerInfo, int]:
+    """Decodes peer info that follows the header, returns it with the offset of the histories."""
+    has_ip = bool(flags & __HAS_IP)
+    strings, offset = __decode_strings(view, __HEADER.size, 1 + has_ip + organisations_count)
+    info = PeerInfo(id=strings[0],
+                    ip=strings[1] if has_ip else None,
+                    organisations=strings[1 + has_ip:])
+    return info, offset
+
+
+def __decode_strings(view: memoryview, offset: int, count: int) -> Tuple[List[str], int]:
+    strings = []
+    for _ in range(count):
+        size, = __STRING_SIZE.unpack_from(view, offset)
+        offset += __STRING_SIZE.size
+        strings.append(str(view[offset:offset + size], 'utf-8'))
+        offset += size
+    return strings, offset
+
+
+def __history_columns(history) -> Tuple[array, array, array]:
+    if isinstance(history, HistoryBuffer):
+        columns = history.columns()
+    else:
+        columns = (array('d', (r.satisfaction for r in history)),
+                   array('d', (r.weight for r in history)),
+                   array('d', (r.timestamp for r in history)))
+    if sys.byteorder == 'big':
+        for column in columns:
+            column.byteswap()
+    return columns
+
+
+def __decode_history(view: memoryview, offset: int, size: int, history: HistoryBuffer) -> int:
+    columns = []
+    for _ in range(3):
+        column = array('d')
+        column.frombytes(view[offset:offset + size * column.itemsize])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        columns.append(column)
+        offset += size * column.itemsize
+    history.extend_columns(*columns)
+    return offset
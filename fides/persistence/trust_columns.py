@@ -0,0 +1,280 @@
+import os
+from typing import Collection, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from fides.messaging.model import PeerInfo
+from fides.model.aliases import PeerId, Target, OrganisationId
+from fides.model.peer_trust_data import PeerTrustData, TrustMatrix, TrustMetric
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.trust import TrustDatabase
+
+
+class MemoryMappedTrustColumns:
+    """Scalar trust metrics of the peers stored in fixed-width columns of a memory-mapped file.
+
+    The file starts with a header followed by one contiguous column per metric, row i of every column
+    belongs to the same peer. Opening the file only maps it and builds peer id -> row index from the id column,
+    the metrics are read directly from the mapped pages, so other processes can open the same file read only
+    and query it without copying. Rows are only appended and overwritten in place, a reader can see
+    a single row partially updated, but never a row of a different peer.
+    """
+
+    MAGIC = b'FIDESTC'
+    VERSION = 1
+    HEADER_SIZE = 64
+
+    __HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('peer_id_size', '<u4'),
+                         ('capacity', '<u8'), ('size', '<u8')])
+
+    COLUMNS = {
+        'service_trust': '<f8',
+        'reputation': '<f8',
+        'recommendation_trust': '<f8',
+        'competence_belief': '<f8',
+        'integrity_belief': '<f8',
+        'initial_reputation_provided_by_count': '<i4',
+        'has_fixed_trust': 'u1',
+    }
+    """Columns with the metrics, names match attributes of PeerTrustData."""
+
+    def __init__(self, path: str, read_only: bool = False, initial_capacity: int = 1024, peer_id_size: int = 64):
+        """
+        :param path: path to the file, created when it does not exist and read_only is False
+        :param read_only: map the file read only, for example for other processes
+        :param initial_capacity: number of rows of a new file, the file is doubled when it is full
+        :param peer_id_size: maximal length of the utf-8 encoded peer id in a new file
+        """
+        self.__path = path
+        self.__read_only = read_only
+        if not os.path.exists(path):
+            if read_only:
+                raise FileNotFoundError(f'Trust columns file {path} does not exist.')
+            self.__create(path, initial_capacity, peer_id_size)
+        self.__index: Dict[PeerId, int] = {}
+        self.__map()
+
+    @property
+    def size(self) -> int:
+        """Number of peers in the store."""
+        self.__remap_if_replaced()
+        return int(self.__header['size'][0])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def store(self, peers: Iterable[PeerTrustData]):
+        """Stores scalar metrics of given peers, existing rows are overwritten in place."""
+        assert not self.__read_only, 'Store is opened read only.'
+        self.__sync_index()
+        for peer in peers:
+            row = self.__index.get(peer.peer_id)
+            if row is None:
+                row = self.__append(peer.peer_id)
+            for name, column in self.__columns.items():
+                column[row] = getattr(peer, name)
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns read only view of the column with metric values for all stored peers, index is the row."""
+        self.__sync_index()
+        view = self.__columns[name][:self.size]
+        view.flags.writeable = False
+        return view
+
+    def row_of(self, peer_id: PeerId) -> Optional[int]:
+        """Returns row of the given peer or None if the peer is not stored."""
+        self.__sync_index()
+        return self.__index.get(peer_id)
+
+    def peer_ids(self, rows: Iterable[int]) -> List[PeerId]:
+        """Returns ids of the peers in given rows."""
+        return [self.__peer_ids[row].decode('utf-8') for row in rows]
+
+    def get_peers_with_geq(self, metric: TrustMetric, minimal_value: float) -> List[PeerId]:
+        """Returns peers with metric >= minimal_value, ordered from the highest value."""
+        values = self.column(metric.value)
+        rows = np.flatnonzero(values >= minimal_value)
+        # ties are left in the row order, ordering them by id would cost more than the selection itself
+        return self.peer_ids(rows[np.argsort(-values[rows], kind='stable')])
+
+    def get_top_peers(self,
+                      order_by: TrustMetric,
+                      limit: int,
+                      minimal_trust: Dict[TrustMetric, float],
+                      exclude: Collection[PeerId] = ()) -> List[PeerId]:
+        """Returns at most limit peers with the highest order_by metric, see TrustDatabase.get_top_peers_trust_data."""
+        if limit <= 0 or not minimal_trust:
+            return []
+        mask = np.zeros(self.size, dtype=bool)
+        for metric, minimum in minimal_trust.items():
+            mask |= self.column(metric.value) >= minimum
+        for peer_id in exclude:
+            row = self.row_of(peer_id)
+            if row is not None:
+                mask[row] = False
+        return self.peer_ids(self.__top(np.flatnonzero(mask), self.column(order_by.value), limit))
+
+    def flush(self):
+        """Writes changed pages to the file."""
+        if not self.__read_only:
+            self.__mm.flush()
+
+    def __top(self, rows: np.ndarray, values: np.ndarray, limit: int) -> np.ndarray:
+        """Returns limit rows with the highest value, ordered from the highest one, ties are ordered by peer id."""
+        if len(rows) > limit:
+            # only rows with at least the limit-th highest value are sorted, including all its ties
+            selected = values[rows]
+            kth = np.partition(selected, len(selected) - limit)[len(selected) - limit]
+            rows = rows[selected >= kth]
+        # lexsort uses the last key as the primary one
+        return rows[np.lexsort((self.__peer_ids[rows], -values[rows]))][:limit]
+
+    def __append(self, peer_id: PeerId) -> int:
+        encoded = peer_id.encode('utf-8')
+        if len(encoded) > self.__peer_ids.dtype.itemsize:
+            raise ValueError(f'Peer id {peer_id} is longer than {self.__peer_ids.dtype.itemsize} bytes.')
+        row = self.size
+        if row == len(self.__peer_ids):
+            self.__grow(2 * row)
+        self.__peer_ids[row] = encoded
+        self.__index[peer_id] = row
+        # size is increased after the row is written, so readers never see an empty row
+        self.__header['size'] = row + 1
+        return row
+
+    def __remap_if_replaced(self):
+        if self.__read_only and os.stat(self.__path).st_ino != self.__inode:
+            # the writer grew the file and replaced it, rows keep their positions
+            self.__map()
+
+    def __sync_index(self):
+        """Adds rows appended by other process to the index."""
+        if len(self.__index) < self.size:
+            for row in range(len(self.__index), self.size):
+                self.__index[self.__peer_ids[row].decode('utf-8')] = row
+
+    def __grow(self, capacity: int):
+        """Copies the data to a file with bigger capacity and replaces the current one."""
+        size = self.size
+        temporary_path = f'{self.__path}.grow'
+        self.__create(temporary_path, capacity, self.__peer_ids.dtype.itemsize)
+        grown = MemoryMappedTrustColumns(temporary_path)
+        grown.__peer_ids[:size] = self.__peer_ids[:size]
+        for name, column in self.__columns.items():
+            grown.__columns[name][:size] = column[:size]
+        grown.__header['size'] = size
+        grown.flush()
+        del grown
+        self.__mm.flush()
+        os.replace(temporary_path, self.__path)
+        self.__map()
+
+    def __map(self):
+        self.__inode = os.stat(self.__path).st_ino
+        self.__mm = np.memmap(self.__path, dtype=np.uint8, mode='r' if self.__read_only else 'r+')
+        self.__header = np.ndarray((1,), dtype=self.__HEADER, buffer=self.__mm)
+        header = self.__header[0]
+        if header['magic'] != self.MAGIC or header['version'] != self.VERSION:
+            raise ValueError(f'File {self.__path} is not a trust columns file of version {self.VERSION}.')
+
+        capacity = int(header['capacity'])
+        offset = self.HEADER_SIZE
+        self.__peer_ids = np.ndarray((capacity,), dtype=f'S{header["peer_id_size"]}', buffer=self.__mm, offset=offset)
+        offset += self.__peer_ids.nbytes
+        self.__columns: Dict[str, np.ndarray] = {}
+        for name, dtype in self.COLUMNS.items():
+            # columns are aligned to 8 bytes
+            offset += -offset % 8
+            self.__columns[name] = np.ndarray((capacity,), dtype=dtype, buffer=self.__mm, offset=offset)
+            offset += self.__columns[name].nbytes
+        self.__sync_index()
+
+    @classmethod
+    def __create(cls, path: str, capacity: int, peer_id_size: int):
+        size = cls.HEADER_SIZE + capacity * peer_id_size
+        for dtype in cls.COLUMNS.values():
+            size += -size % 8 + capacity * np.dtype(dtype).itemsize
+        with open(path, 'wb') as file:
+            file.truncate(size)
+        mm = np.memmap(path, dtype=np.uint8, mode='r+')
+        header = np.ndarray((1,), dtype=cls.__HEADER, buffer=mm)
+        header[0] = (cls.MAGIC, cls.VERSION, peer_id_size, capacity, 0)
+        mm.flush()
+
+
+class ColumnarTrustDatabase(TrustDatabase):
+    """Trust database decorator that answers the threshold and top peers queries from MemoryMappedTrustColumns.
+
+    All data are stored in the delegate, scalar metrics are mirrored to the columns on every write.
+    Queries select the peers with vectorized operations over the columns and load only the selected
+    peers from the delegate. The columns file should be paired with a persistent delegate,
+    peers that are in the columns but not in the delegate are left out from the results.
+    """
+
+    def __init__(self, delegate: TrustDatabase, columns: MemoryMappedTrustColumns):
+        super().__init__(delegate.get_model_configuration())
+        self.__delegate = delegate
+        self.__columns = columns
+
+    def store_peer_trust_data(self, trust_data: PeerTrustData):
+        """Stores trust data for given peer - overwrites any data if existed."""
+        self.__delegate.store_peer_trust_data(trust_data)
+        self.__columns.store([trust_data])
+
+    def store_peer_trust_matrix(self, trust_matrix: TrustMatrix):
+        """Stores trust matrix."""
+        self.__delegate.store_peer_trust_matrix(trust_matrix)
+        self.__columns.store(trust_matrix.values())
+
+    def get_peers_with_geq_recommendation_trust(self, minimal_recommendation_trust: float) -> List[PeerInfo]:
+        """Returns peers that have >= recommendation_trust then the minimal."""
+        peer_ids = self.__columns.get_peers_with_geq(TrustMetric.RECOMMENDATION_TRUST, minimal_recommendation_trust)
+        return self.__delegate.get_peers_info(peer_ids)
+
+    def get_peers_with_geq_service_trust(self, minimal_service_trust: float) -> List[PeerInfo]:
+        """Returns peers that have >= service_trust then the minimal."""
+        peer_ids = self.__columns.get_peers_with_geq(TrustMetric.SERVICE_TRUST, minimal_service_trust)
+        return self.__delegate.get_peers_info(peer_ids)
+
+    def get_top_peers_trust_data(self,
+                                 order_by: TrustMetric,
+                                 limit: int,
+                                 minimal_trust: Dict[TrustMetric, float],
+                                 exclude: Collection[PeerId] = ()) -> List[PeerTrustData]:
+        """Returns at most limit peers with the highest order_by metric, ordered from the highest one."""
+        peer_ids = self.__columns.get_top_peers(order_by, limit, minimal_trust, exclude)
+        trust_matrix = self.__delegate.get_peers_trust_data(peer_ids)
+        return [trust_matrix[p] for p in peer_ids if p in trust_matrix]
+
+    def store_connected_peers_list(self, current_peers: List[PeerInfo]):
+        """Stores list of peers that are directly connected to the Slips."""
+        self.__delegate.store_connected_peers_list(current_peers)
+
+    def get_connected_peers(self) -> List[PeerInfo]:
+        """Returns list of peers that are directly connected to the Slips."""
+        return self.__delegate.get_connected_peers()
+
+    def get_peers_info(self, peer_ids: List[PeerId]) -> List[PeerInfo]:
+        """Returns list of peer infos for given ids."""
+        return self.__delegate.get_peers_info(peer_ids)
+
+    def get_peers_with_organisations(self, organisations: List[OrganisationId]) -> List[PeerInfo]:
+        """Returns list of peers that have one of given organisations."""
+        return self.__delegate.get_peers_with_organisations(organisations)
+
+    def get_peer_trust_data(self, peer: Union[PeerId, PeerInfo]) -> Optional[PeerTrustData]:
+        """Returns trust data for given peer ID, if no data are found, returns None."""
+        return self.__delegate.get_peer_trust_data(peer)
+
+    def get_peers_trust_data(self, peer_ids: List[Union[PeerId, PeerInfo]]) -> TrustMatrix:
+        """Return trust data for each peer from peer_ids."""
+        return self.__delegate.get_peers_trust_data(peer_ids)
+
+    def cache_network_opinion(self, ti: SlipsThreatIntelligence):
+        """Caches aggregated opinion on given target."""
+        self.__delegate.cache_network_opinion(ti)
+
+    def get_cached_network_opinion(self, target: Target, include_stale: bool = False) \
+            -> Optional[SlipsThreatIntelligence]:
+        """Returns cached network opinion. Checks cache time and returns None if data expired."""
+        return self.__delegate.get_cached_network_opinion(target, include_stale)
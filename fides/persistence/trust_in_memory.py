@@ -1,12 +1,14 @@
-from typing import List, Optional, Union, Dict, Tuple
+from math import inf
+from typing import Collection, FrozenSet, List, Optional, Union, Dict
 
 from fides.messaging.model import PeerInfo
-from fides.model.aliases import PeerId, Target, OrganisationId
+from fides.model.aliases import PeerId, OrganisationId, Target
 from fides.model.configuration import TrustModelConfiguration
-from fides.model.peer_trust_data import PeerTrustData, TrustMatrix
+from fides.model.peer_trust_data import PeerTrustData, TrustMatrix, TrustMetric
 from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.network_opinion_cache import NetworkOpinionCache
 from fides.persistence.trust import TrustDatabase
-from fides.utils.time import Time, now
+from fides.persistence.trust_index import TrustMetricIndex
 
 
 class InMemoryTrustDatabase(TrustDatabase):
@@ -19,7 +21,14 @@ class InMemoryTrustDatabase(TrustDatabase):
         super().__init__(configuration)
         self.__connected_peers: List[PeerInfo] = []
         self.__trust_matrix: TrustMatrix = {}
-        self.__network_opinions: Dict[Target, Tuple[Time, SlipsThreatIntelligence]] = {}
+        self.__indexes: Dict[TrustMetric, TrustMetricIndex] = {metric: TrustMetricIndex() for metric in TrustMetric}
+        # organisation -> members, dict instead of set keeps the order in which the peers were added
+        self.__organisations: Dict[OrganisationId, Dict[PeerId, None]] = {}
+        # organisations under which the peer is indexed, copy because PeerInfo can be modified in place
+        self.__peer_organisations: Dict[PeerId, FrozenSet[OrganisationId]] = {}
+        self.__network_opinions = NetworkOpinionCache(configuration.network_opinion_cache_max_size,
+                                                      configuration.network_opinion_cache_valid_seconds,
+                                                      configuration.network_opinion_cache_stale_seconds)
 
     def store_connected_peers_list(self, current_peers: List[PeerInfo]):
         """Stores list of peers that are directly connected to the Slips."""
@@ -31,16 +40,66 @@ class InMemoryTrustDatabase(TrustDatabase):
 
     def get_peers_with_organisations(self, organisations: List[OrganisationId]) -> List[PeerInfo]:
         """Returns list of peers that have one of given organisations."""
-        required = set(organisations)
-        return [p.info for p in self.__trust_matrix.values() if len(required.intersection(p.organisations)) > 0]
+        members: Dict[PeerId, None] = {}
+        for organisation in organisations:
+            members.update(self.__organisations.get(organisation, {}))
+        return [self.__trust_matrix[p].info for p in members]
 
     def get_peers_with_geq_recommendation_trust(self, minimal_recommendation_trust: float) -> List[PeerInfo]:
         """Returns peers that have >= recommendation_trust then the minimal."""
-        return [p.info for p in self.__trust_matrix.values() if p.recommendation_trust >= minimal_recommendation_trust]
+        index = self.__indexes[TrustMetric.RECOMMENDATION_TRUST]
+        return [self.__trust_matrix[p].info for p in index.iterate_geq(minimal_recommendation_trust)]
+
+    def get_top_peers_trust_data(self,
+                                 order_by: TrustMetric,
+                                 limit: int,
+                                 minimal_trust: Dict[TrustMetric, float],
+                                 exclude: Collection[PeerId] = ()) -> List[PeerTrustData]:
+        """Returns at most limit peers with the highest order_by metric, ordered from the highest one.
+
+        Only peers that have at least one of the metrics from minimal_trust >= its value are returned,
+        peers in exclude are skipped. Each peer is returned at most once.
+        """
+        if limit <= 0:
+            return []
+        excluded = set(exclude)
+        result: List[PeerId] = []
+        # peers that satisfy the threshold on order_by metric are the prefix of its index
+        order_by_minimum = minimal_trust.get(order_by, inf)
+        for peer_id in self.__indexes[order_by].iterate_geq(order_by_minimum):
+            if peer_id not in excluded:
+                result.append(peer_id)
+                if len(result) == limit:
+                    return [self.__trust_matrix[p] for p in result]
+
+        # all other peers are ordered after the prefix, so we need to merge them
+        selected = excluded.union(result)
+        others = {peer_id
+                  for metric, minimum in minimal_trust.items() if metric != order_by
+                  for peer_id in self.__indexes[metric].iterate_geq(minimum) if peer_id not in selected}
+        order_by_index = self.__indexes[order_by]
+        result += sorted(others, key=lambda p: (-order_by_index.value_of(p), p))[:limit - len(result)]
+        return [self.__trust_matrix[p] for p in result]
 
     def store_peer_trust_data(self, trust_data: PeerTrustData):
         """Stores trust data for given peer - overwrites any data if existed."""
         self.__trust_matrix[trust_data.peer_id] = trust_data
+        for metric, index in self.__indexes.items():
+            index.update(trust_data.peer_id, metric.of(trust_data))
+        self.__update_organisations(trust_data.peer_id, frozenset(trust_data.organisations))
+
+    def __update_organisations(self, peer_id: PeerId, current: FrozenSet[OrganisationId]):
+        previous = self.__peer_organisations.get(peer_id, frozenset())
+        if previous == current:
+            return
+        for organisation in previous.difference(current):
+            members = self.__organisations[organisation]
+            del members[peer_id]
+            if not members:
+                del self.__organisations[organisation]
+        for organisation in current.difference(previous):
+            self.__organisations.setdefault(organisation, {})[peer_id] = None
+        self.__peer_organisations[peer_id] = current
 
     def get_peer_trust_data(self, peer: Union[PeerId, PeerInfo]) -> Optional[PeerTrustData]:
         """Returns trust data for given peer ID, if no data are found, returns None."""
@@ -53,20 +112,22 @@ class InMemoryTrustDatabase(TrustDatabase):
         return [tr.info for p in peer_ids if (tr := self.__trust_matrix.get(p))]
 
     def get_peers_with_geq_service_trust(self, minimal_service_trust: float) -> List[PeerInfo]:
-        return [p.info for p in self.__trust_matrix.values() if p.service_trust >= minimal_service_trust]
+        index = self.__indexes[TrustMetric.SERVICE_TRUST]
+        return [self.__trust_matrix[p].info for p in index.iterate_geq(minimal_service_trust)]
 
     def cache_network_opinion(self, ti: SlipsThreatIntelligence):
         """Caches aggregated opinion on given target."""
-        self.__network_opinions[ti.target] = now(), ti
-
-    def get_cached_network_opinion(self, target: Target) -> Optional[SlipsThreatIntelligence]:
-        """Returns cached network opinion. Checks cache time and returns None if data expired."""
-        rec = self.__network_opinions.get(target)
-        if rec is None:
-            return None
-        created_seconds, ti = rec
-        # we need to check if the cache is still valid
-        if now() - created_seconds < self.__configuration.network_opinion_cache_valid_seconds:
-            return ti
-        else:
-            return None
+        self.__network_opinions.put(ti)
+
+    def get_cached_network_opinion(self, target: Target, include_stale: bool = False) \
+            -> Optional[SlipsThreatIntelligence]:
+        """Returns cached network opinion. Checks cache time and returns None if data expired.
+
+        If include_stale is True, expired opinion in the stale window is returned as well, marked as stale.
+        """
+        return self.__network_opinions.get(target, include_stale)
+
+    @property
+    def network_opinion_cache(self) -> NetworkOpinionCache:
+        """Bounded in-process cache of the network opinions."""
+        return self.__network_opinions
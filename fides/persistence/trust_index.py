@@ -0,0 +1,52 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Tuple
+
+from fides.model.aliases import PeerId
+
+
+class TrustMetricIndex:
+    """Peers ordered by the value of a single trust metric, from the highest value.
+
+    Position of the peer is found by O(log n) binary search, but inserting into and deleting from the sorted list
+    shifts its tail, so updates are O(n) - a single memmove, which is cheap for the number of peers a node knows.
+    Iteration over the k best peers is O(k).
+    """
+
+    def __init__(self):
+        # sorted by (-value, peer_id), so the highest values are at the beginning
+        self.__keys: List[Tuple[float, PeerId]] = []
+        self.__values: Dict[PeerId, float] = {}
+
+    def update(self, peer_id: PeerId, value: float):
+        """Inserts peer to the index or moves it to the position given by the new value."""
+        old_value = self.__values.get(peer_id)
+        if old_value == value:
+            return
+        if old_value is not None:
+            self.__remove_key(peer_id, old_value)
+        self.__values[peer_id] = value
+        insort(self.__keys, (-value, peer_id))
+
+    def remove(self, peer_id: PeerId):
+        """Removes peer from the index if it is present."""
+        old_value = self.__values.pop(peer_id, None)
+        if old_value is not None:
+            self.__remove_key(peer_id, old_value)
+
+    def value_of(self, peer_id: PeerId) -> float:
+        """Returns indexed value for the peer."""
+        return self.__values[peer_id]
+
+    def iterate_geq(self, minimal_value: float) -> Iterator[PeerId]:
+        """Iterates over peers with value >= minimal_value, from the highest value."""
+        for negative_value, peer_id in self.__keys:
+            if -negative_value < minimal_value:
+                return
+            yield peer_id
+
+    def __remove_key(self, peer_id: PeerId, value: float):
+        idx = bisect_left(self.__keys, (-value, peer_id))
+        del self.__keys[idx]
+
+    def __len__(self) -> int:
+        return len(self.__values)
@@ -0,0 +1,182 @@
+from threading import RLock
+from typing import Callable, Collection, Dict, Iterable, List, Optional, Tuple, Union
+
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
+from fides.evaluation.service.interaction import Satisfaction, Weight
+from fides.evaluation.service.process import append_service_interactions, evaluate_service_trust
+from fides.messaging.model import PeerInfo
+from fides.model.aliases import PeerId, Target, OrganisationId
+from fides.model.peer_trust_data import PeerTrustData, TrustMatrix, TrustMetric
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.trust import TrustDatabase
+from fides.utils.logger import Logger
+from fides.utils.time import Time, now
+
+logger = Logger(__name__)
+
+
+class LazyEvaluationTrustDatabase(TrustDatabase):
+    """Trust database decorator that defers recomputation of the service trust.
+
+    Interactions are only appended to the peer's service history and the peer is marked dirty.
+    Service trust of the dirty peers is recomputed when it is read from the database
+    or when the flush interval passes, so a burst of N interactions costs single recomputation.
+    Service trust is a function of the service history and the reputation, so the recomputed
+    values are the same as the ones computed after every interaction.
+    """
+
+    def __init__(self,
+                 delegate: TrustDatabase,
+                 flush_interval_seconds: float,
+                 on_flush: Optional[Callable[[TrustMatrix], None]] = None):
+        """
+        :param delegate: database that actually stores the data
+        :param flush_interval_seconds: maximal time for which the service trust of the dirty peer is not recomputed
+        :param on_flush: callback executed with the recomputed peers, for example to notify the network layer
+        """
+        super().__init__(delegate.get_model_configuration())
+        self.__delegate = delegate
+        self.__flush_interval_seconds = flush_interval_seconds
+        self.__on_flush = on_flush
+        self.__dirty: Dict[PeerId, None] = {}
+        # time when the oldest dirty peer was marked
+        self.__dirty_since: Optional[Time] = None
+        self.__lock = RLock()
+
+    def record_service_interactions(self,
+                                    data: Dict[PeerId, Tuple[PeerTrustData, Satisfaction, Weight]],
+                                    updated_peers: Optional[TrustMatrix] = None,
+                                    on_evaluated: Optional[Callable[[TrustMatrix], None]] = None,
+                                    evaluator: Optional[IncrementalServiceTrustEvaluator] = None) -> TrustMatrix:
+        """Appends interactions to the service histories, stores them and marks peers dirty.
+
+        Service trust of the peers from data is not recomputed yet, it is recomputed when the peer is read
+        or flushed and the recomputed peers are passed to on_flush, on_evaluated receives only updated_peers
+        that are not dirty. Evaluator is not used, flush recomputes service trust from the whole history.
+        """
+        with self.__lock:
+            updated_peers = updated_peers if updated_peers else {}
+            trust_matrix = {**updated_peers, **append_service_interactions(self.get_model_configuration(), data)}
+            self.__delegate.store_peer_trust_matrix(trust_matrix)
+            for peer_id in data.keys():
+                # fixed trust is never recomputed
+                if not trust_matrix[peer_id].has_fixed_trust:
+                    self.__mark_dirty(peer_id)
+
+            evaluated = {peer_id: peer for peer_id, peer in updated_peers.items() if peer_id not in self.__dirty}
+            if evaluated and on_evaluated:
+                on_evaluated(evaluated)
+            self.flush_if_due()
+            return trust_matrix
+
+    def flush(self) -> TrustMatrix:
+        """Recomputes and stores service trust of all dirty peers, returns recomputed peers."""
+        with self.__lock:
+            return self.__flush(list(self.__dirty))
+
+    def flush_if_due(self) -> TrustMatrix:
+        """Flushes dirty peers if the flush interval passed since the oldest one was marked."""
+        with self.__lock:
+            if self.__dirty_since is None or now() - self.__dirty_since < self.__flush_interval_seconds:
+                return {}
+            return self.flush()
+
+    @property
+    def dirty_peers(self) -> List[PeerId]:
+        """Peers with service trust that was not recomputed yet."""
+        return list(self.__dirty)
+
+    def __mark_dirty(self, peer_id: PeerId):
+        if self.__dirty_since is None:
+            self.__dirty_since = now()
+        self.__dirty[peer_id] = None
+
+    def __flush(self, peer_ids: Iterable[PeerId]) -> TrustMatrix:
+        dirty = [peer_id for peer_id in peer_ids if peer_id in self.__dirty]
+        if not dirty:
+            return {}
+
+        for peer_id in dirty:
+            del self.__dirty[peer_id]
+        if not self.__dirty:
+            self.__dirty_since = None
+
+        peers = [p for p in self.__delegate.get_peers_trust_data(dirty).values() if p]
+        trust_matrix = evaluate_service_trust(self.get_model_configuration(), peers)
+        self.__delegate.store_peer_trust_matrix(trust_matrix)
+        logger.debug(f'Service trust recomputed for {len(trust_matrix)} dirty peers.')
+
+        if self.__on_flush:
+            self.__on_flush(trust_matrix)
+        return trust_matrix
+
+    def store_connected_peers_list(self, current_peers: List[PeerInfo]):
+        """Stores list of peers that are directly connected to the Slips."""
+        self.__delegate.store_connected_peers_list(current_peers)
+
+    def get_connected_peers(self) -> List[PeerInfo]:
+        """Returns list of peers that are directly connected to the Slips."""
+        return self.__delegate.get_connected_peers()
+
+    def get_peers_info(self, peer_ids: List[PeerId]) -> List[PeerInfo]:
+        """Returns list of peer infos for given ids."""
+        return self.__delegate.get_peers_info(peer_ids)
+
+    def get_peers_with_organisations(self, organisations: List[OrganisationId]) -> List[PeerInfo]:
+        """Returns list of peers that have one of given organisations."""
+        return self.__delegate.get_peers_with_organisations(organisations)
+
+    def get_peers_with_geq_recommendation_trust(self, minimal_recommendation_trust: float) -> List[PeerInfo]:
+        """Returns peers that have >= recommendation_trust then the minimal."""
+        return self.__delegate.get_peers_with_geq_recommendation_trust(minimal_recommendation_trust)
+
+    def get_peers_with_geq_service_trust(self, minimal_service_trust: float) -> List[PeerInfo]:
+        """Returns peers that have >= service_trust then the minimal."""
+        with self.__lock:
+            # query over service trust of all peers
+            self.flush()
+            return self.__delegate.get_peers_with_geq_service_trust(minimal_service_trust)
+
+    def get_top_peers_trust_data(self,
+                                 order_by: TrustMetric,
+                                 limit: int,
+                                 minimal_trust: Dict[TrustMetric, float],
+                                 exclude: Collection[PeerId] = ()) -> List[PeerTrustData]:
+        """Returns at most limit peers with the highest order_by metric, ordered from the highest one."""
+        with self.__lock:
+            if order_by == TrustMetric.SERVICE_TRUST or TrustMetric.SERVICE_TRUST in minimal_trust:
+                # query over service trust of all peers
+                self.flush()
+            return self.__delegate.get_top_peers_trust_data(order_by, limit, minimal_trust, exclude)
+
+    def store_peer_trust_data(self, trust_data: PeerTrustData):
+        """Stores trust data for given peer - overwrites any data if existed."""
+        with self.__lock:
+            self.__delegate.store_peer_trust_data(trust_data)
+
+    def store_peer_trust_matrix(self, trust_matrix: TrustMatrix):
+        """Stores trust matrix."""
+        with self.__lock:
+            self.__delegate.store_peer_trust_matrix(trust_matrix)
+
+    def get_peer_trust_data(self, peer: Union[PeerId, PeerInfo]) -> Optional[PeerTrustData]:
+        """Returns trust data for given peer ID, if no data are found, returns None."""
+        peer_id = peer.id if isinstance(peer, PeerInfo) else peer
+        with self.__lock:
+            recomputed = self.__flush([peer_id])
+            return recomputed[peer_id] if recomputed else self.__delegate.get_peer_trust_data(peer_id)
+
+    def get_peers_trust_data(self, peer_ids: List[Union[PeerId, PeerInfo]]) -> TrustMatrix:
+        """Return trust data for each peer from peer_ids."""
+        with self.__lock:
+            self.__flush([p.id if isinstance(p, PeerInfo) else p for p in peer_ids])
+            return self.__delegate.get_peers_trust_data(peer_ids)
+
+    def cache_network_opinion(self, ti: SlipsThreatIntelligence):
+        """Caches aggregated opinion on given target."""
+        self.__delegate.cache_network_opinion(ti)
+
+    def get_cached_network_opinion(self, target: Target, include_stale: bool = False) \
+            -> Optional[SlipsThreatIntelligence]:
+        """Returns cached network opinion. Checks cache time and returns None if data expired."""
+        return self.__delegate.get_cached_network_opinion(target, include_stale)
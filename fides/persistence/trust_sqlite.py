@@ -0,0 +1,260 @@
+import json
+import sqlite3
+from dataclasses import asdict
+from threading import RLock
+from typing import Collection, Dict, Iterable, List, Optional, Sequence, Union
+
+from fides.messaging.model import PeerInfo
+from fides.model.aliases import PeerId, OrganisationId, Target
+from fides.model.configuration import TrustModelConfiguration
+from fides.model.peer_trust_data import PeerTrustData, TrustMatrix, TrustMetric
+from fides.model.recommendation_history import RecommendationHistoryBuffer
+from fides.model.service_history import ServiceHistoryBuffer
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.network_opinion_cache import NetworkOpinionCache
+from fides.persistence.trust import TrustDatabase
+from fides.persistence.trust_codec import encode_history, decode_history
+
+
+class SqliteTrustDatabase(TrustDatabase):
+    """Trust database implementation that stores data in the embedded SQLite database.
+
+    Scalar metrics are stored in columns, service trust, recommendation trust and organisations are indexed,
+    so all queries are answered from the indexes. Histories are stored as blobs encoded by
+    fides.persistence.trust_codec. The database runs in WAL mode, so the readers do not block the writer.
+    """
+
+    MAX_VARIABLES = 500
+    """Maximal number of parameters in a single query, bigger queries are split."""
+
+    __SCHEMA = '''
+CREATE TABLE IF NOT EXISTS peers (
+    peer_id TEXT PRIMARY KEY,
+    ip TEXT,
+    has_fixed_trust INTEGER NOT NULL,
+    service_trust REAL NOT NULL,
+    reputation REAL NOT NULL,
+    recommendation_trust REAL NOT NULL,
+    competence_belief REAL NOT NULL,
+    integrity_belief REAL NOT NULL,
+    initial_reputation_provided_by_count INTEGER NOT NULL,
+    service_history BLOB NOT NULL,
+    recommendation_history BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS peers_service_trust ON peers (service_trust);
+CREATE INDEX IF NOT EXISTS peers_recommendation_trust ON peers (recommendation_trust);
+
+CREATE TABLE IF NOT EXISTS peer_organisations (
+    organisation_id TEXT NOT NULL,
+    peer_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (organisation_id, peer_id)
+);
+CREATE INDEX IF NOT EXISTS peer_organisations_peer ON peer_organisations (peer_id, position);
+
+CREATE TABLE IF NOT EXISTS connected_peers (
+    position INTEGER PRIMARY KEY,
+    info TEXT NOT NULL
+);
+'''
+
+    __PEER_COLUMNS = 'peer_id, ip, has_fixed_trust, service_trust, reputation, recommendation_trust, ' \
+                     'competence_belief, integrity_belief, initial_reputation_provided_by_count, ' \
+                     'service_history, recommendation_history'
+
+    def __init__(self, configuration: TrustModelConfiguration, path: str):
+        """
+        :param configuration: configuration of the current trust model
+        :param path: path to the database file, created if it does not exist, ':memory:' for a temporary database
+        """
+        super().__init__(configuration)
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__lock = RLock()
+        # network opinions are kept only in memory
+        self.__network_opinions = NetworkOpinionCache(configuration.network_opinion_cache_max_size,
+                                                      configuration.network_opinion_cache_valid_seconds,
+                                                      configuration.network_opinion_cache_stale_seconds)
+        with self.__lock, self.__connection:
+            self.__connection.execute('PRAGMA journal_mode=WAL')
+            # still consistent in WAL mode, only the last transactions can be lost on power failure
+            self.__connection.execute('PRAGMA synchronous=NORMAL')
+            self.__connection.executescript(self.__SCHEMA)
+
+    def close(self):
+        """Closes connection to the database."""
+        with self.__lock:
+            self.__connection.close()
+
+    def store_connected_peers_list(self, current_peers: List[PeerInfo]):
+        """Stores list of peers that are directly connected to the Slips."""
+        with self.__lock, self.__connection:
+            self.__connection.execute('DELETE FROM connected_peers')
+            self.__connection.executemany('INSERT INTO connected_peers (position, info) VALUES (?, ?)',
+                                          ((i, json.dumps(asdict(p))) for i, p in enumerate(current_peers)))
+
+    def get_connected_peers(self) -> List[PeerInfo]:
+        """Returns list of peers that are directly connected to the Slips."""
+        rows = self.__query('SELECT info FROM connected_peers ORDER BY position')
+        return [PeerInfo(**json.loads(info)) for info, in rows]
+
+    def get_peers_info(self, peer_ids: List[PeerId]) -> List[PeerInfo]:
+        """Returns list of peer infos for given ids."""
+        infos = self.__load_infos(peer_ids)
+        return [infos[p] for p in peer_ids if p in infos]
+
+    def get_peers_with_organisations(self, organisations: List[OrganisationId]) -> List[PeerInfo]:
+        """Returns list of peers that have one of given organisations."""
+        peer_ids = set()
+        for chunk in self.__chunks(list(set(organisations))):
+            rows = self.__query(f'SELECT peer_id FROM peer_organisations '
+                                f'WHERE organisation_id IN ({self.__placeholders(chunk)})', chunk)
+            peer_ids.update(peer_id for peer_id, in rows)
+        return self.get_peers_info(sorted(peer_ids))
+
+    def get_peers_with_geq_recommendation_trust(self, minimal_recommendation_trust: float) -> List[PeerInfo]:
+        """Returns peers that have >= recommendation_trust then the minimal."""
+        return self.__get_peers_with_geq(TrustMetric.RECOMMENDATION_TRUST, minimal_recommendation_trust)
+
+    def get_peers_with_geq_service_trust(self, minimal_service_trust: float) -> List[PeerInfo]:
+        """Returns peers that have >= service_trust then the minimal."""
+        return self.__get_peers_with_geq(TrustMetric.SERVICE_TRUST, minimal_service_trust)
+
+    def get_top_peers_trust_data(self,
+                                 order_by: TrustMetric,
+                                 limit: int,
+                                 minimal_trust: Dict[TrustMetric, float],
+                                 exclude: Collection[PeerId] = ()) -> List[PeerTrustData]:
+        """Returns at most limit peers with the highest order_by metric, ordered from the highest one.
+
+        Only peers that have at least one of the metrics from minimal_trust >= its value are returned,
+        peers in exclude are skipped. Each peer is returned at most once.
+        """
+        if limit <= 0 or not minimal_trust:
+            return []
+        conditions = ' OR '.join(f'{self.__column(metric)} >= ?' for metric in minimal_trust)
+        # excluded peers are filtered here, so the query does not need a parameter for each of them
+        excluded = set(exclude)
+        rows = self.__query(f'SELECT peer_id FROM peers WHERE {conditions} '
+                            f'ORDER BY {self.__column(order_by)} DESC, peer_id LIMIT ?',
+                            [*minimal_trust.values(), limit + len(excluded)])
+        peer_ids = [peer_id for peer_id, in rows if peer_id not in excluded][:limit]
+        trust_matrix = self.get_peers_trust_data(peer_ids)
+        return [trust_matrix[p] for p in peer_ids]
+
+    def store_peer_trust_data(self, trust_data: PeerTrustData):
+        """Stores trust data for given peer - overwrites any data if existed."""
+        self.store_peer_trust_matrix({trust_data.peer_id: trust_data})
+
+    def store_peer_trust_matrix(self, trust_matrix: TrustMatrix):
+        """Stores trust matrix in a single transaction."""
+        if not trust_matrix:
+            return
+        peers = list(trust_matrix.values())
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                f'INSERT OR REPLACE INTO peers ({self.__PEER_COLUMNS}) '
+                f'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                ((p.peer_id, p.info.ip, int(p.has_fixed_trust), p.service_trust, p.reputation,
+                  p.recommendation_trust, p.competence_belief, p.integrity_belief,
+                  p.initial_reputation_provided_by_count,
+                  encode_history(p.service_history), encode_history(p.recommendation_history)) for p in peers))
+            self.__connection.executemany('DELETE FROM peer_organisations WHERE peer_id = ?',
+                                          ((p.peer_id,) for p in peers))
+            self.__connection.executemany(
+                'INSERT OR IGNORE INTO peer_organisations (organisation_id, peer_id, position) VALUES (?, ?, ?)',
+                ((organisation, p.peer_id, position) for p in peers
+                 for position, organisation in enumerate(p.organisations)))
+
+    def get_peer_trust_data(self, peer: Union[PeerId, PeerInfo]) -> Optional[PeerTrustData]:
+        """Returns trust data for given peer ID, if no data are found, returns None."""
+        peer_id = peer.id if isinstance(peer, PeerInfo) else peer
+        return self.get_peers_trust_data([peer_id]).get(peer_id)
+
+    def get_peers_trust_data(self, peer_ids: List[Union[PeerId, PeerInfo]]) -> TrustMatrix:
+        """Return trust data for each peer from peer_ids."""
+        peer_ids = list(dict.fromkeys(p.id if isinstance(p, PeerInfo) else p for p in peer_ids))
+        configuration = self.get_model_configuration()
+        organisations = self.__load_organisations(peer_ids)
+        trust_matrix = {}
+        for chunk in self.__chunks(peer_ids):
+            rows = self.__query(f'SELECT {self.__PEER_COLUMNS} FROM peers '
+                                f'WHERE peer_id IN ({self.__placeholders(chunk)})', chunk)
+            for peer_id, ip, has_fixed_trust, service_trust, reputation, recommendation_trust, competence_belief, \
+                    integrity_belief, initial_reputation_provided_by_count, service_history, \
+                    recommendation_history in rows:
+                trust_matrix[peer_id] = PeerTrustData(
+                    info=PeerInfo(id=peer_id, organisations=organisations.get(peer_id, []), ip=ip),
+                    has_fixed_trust=bool(has_fixed_trust),
+                    service_trust=service_trust,
+                    reputation=reputation,
+                    recommendation_trust=recommendation_trust,
+                    competence_belief=competence_belief,
+                    integrity_belief=integrity_belief,
+                    initial_reputation_provided_by_count=initial_reputation_provided_by_count,
+                    service_history=decode_history(
+                        service_history, ServiceHistoryBuffer(capacity=configuration.service_history_max_size)),
+                    recommendation_history=decode_history(
+                        recommendation_history,
+                        RecommendationHistoryBuffer(capacity=configuration.recommendations.history_max_size))
+                )
+        return trust_matrix
+
+    def cache_network_opinion(self, ti: SlipsThreatIntelligence):
+        """Caches aggregated opinion on given target."""
+        self.__network_opinions.put(ti)
+
+    def get_cached_network_opinion(self, target: Target, include_stale: bool = False) \
+            -> Optional[SlipsThreatIntelligence]:
+        """Returns cached network opinion. Checks cache time and returns None if data expired.
+
+        If include_stale is True, expired opinion in the stale window is returned as well, marked as stale.
+        """
+        return self.__network_opinions.get(target, include_stale)
+
+    @property
+    def network_opinion_cache(self) -> NetworkOpinionCache:
+        """Bounded in-process cache of the network opinions."""
+        return self.__network_opinions
+
+    def __get_peers_with_geq(self, metric: TrustMetric, minimal_value: float) -> List[PeerInfo]:
+        rows = self.__query(f'SELECT peer_id FROM peers WHERE {self.__column(metric)} >= ? '
+                            f'ORDER BY {self.__column(metric)} DESC, peer_id', (minimal_value,))
+        return self.get_peers_info([peer_id for peer_id, in rows])
+
+    def __load_infos(self, peer_ids: List[PeerId]) -> Dict[PeerId, PeerInfo]:
+        """Loads peer infos without the trust data."""
+        peer_ids = list(dict.fromkeys(peer_ids))
+        organisations = self.__load_organisations(peer_ids)
+        infos = {}
+        for chunk in self.__chunks(peer_ids):
+            rows = self.__query(f'SELECT peer_id, ip FROM peers WHERE peer_id IN ({self.__placeholders(chunk)})',
+                                chunk)
+            infos.update((peer_id, PeerInfo(id=peer_id, organisations=organisations.get(peer_id, []), ip=ip))
+                         for peer_id, ip in rows)
+        return infos
+
+    def __load_organisations(self, peer_ids: List[PeerId]) -> Dict[PeerId, List[OrganisationId]]:
+        organisations = {}
+        for chunk in self.__chunks(peer_ids):
+            rows = self.__query(f'SELECT peer_id, organisation_id FROM peer_organisations '
+                                f'WHERE peer_id IN ({self.__placeholders(chunk)}) ORDER BY peer_id, position', chunk)
+            for peer_id, organisation in rows:
+                organisations.setdefault(peer_id, []).append(organisation)
+        return organisations
+
+    def __query(self, sql: str, parameters: Sequence = ()) -> List[tuple]:
+        with self.__lock:
+            return self.__connection.execute(sql, parameters).fetchall()
+
+    def __chunks(self, values: List) -> Iterable[List]:
+        for start in range(0, len(values), self.MAX_VARIABLES):
+            yield values[start:start + self.MAX_VARIABLES]
+
+    @staticmethod
+    def __placeholders(values: List) -> str:
+        return ', '.join('?' * len(values))
+
+    @staticmethod
+    def __column(metric: TrustMetric) -> str:
+        # metric values are the column names, they are never taken from the input
+        return metric.value
@@ -1,5 +1,6 @@
-from typing import Callable
+from typing import Callable, Optional
 
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
 from fides.evaluation.service.interaction import Weight, SatisfactionLevels
 from fides.messaging.network_bridge import NetworkBridge
 from fides.model.alert import Alert
@@ -22,9 +23,10 @@ class AlertProtocol(Protocol):
                  trust_protocol: InitialTrustProtocol,
                  configuration: TrustModelConfiguration,
                  aggregator: OpinionAggregator,
-                 alert_callback: Callable[[SlipsThreatIntelligence], None]
+                 alert_callback: Callable[[SlipsThreatIntelligence], None],
+                 service_trust_evaluator: Optional[IncrementalServiceTrustEvaluator] = None
                  ):
-        super().__init__(configuration, trust_db, bridge)
+        super().__init__(configuration, trust_db, bridge, service_trust_evaluator)
         self.__trust_protocol = trust_protocol
         self.__alert_callback = alert_callback
         self.__aggregator = aggregator
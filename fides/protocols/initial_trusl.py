@@ -1,3 +1,6 @@
+from typing import Optional
+
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
 from fides.evaluation.service.interaction import Weight, SatisfactionLevels
 from fides.evaluation.service.process import process_service_interaction
 from fides.model.configuration import TrustModelConfiguration, TrustedEntity
@@ -14,11 +17,13 @@ class InitialTrustProtocol:
     def __init__(self,
                  trust_db: TrustDatabase,
                  configuration: TrustModelConfiguration,
-                 recommendation_protocol: RecommendationProtocol
+                 recommendation_protocol: RecommendationProtocol,
+                 service_trust_evaluator: Optional[IncrementalServiceTrustEvaluator] = None
                  ):
         self.__trust_db = trust_db
         self.__configuration = configuration
         self.__recommendation_protocol = recommendation_protocol
+        self.__service_trust_evaluator = service_trust_evaluator
 
     def determine_and_store_initial_trust(self, peer: PeerInfo, get_recommendations: bool = False) -> PeerTrustData:
         """Determines initial trust and stores that value in database.
@@ -61,7 +66,8 @@ class InitialTrustProtocol:
         trust = process_service_interaction(configuration=self.__configuration,
                                             peer=trust,
                                             satisfaction=SatisfactionLevels.Ok,
-                                            weight=Weight.FIRST_ENCOUNTER
+                                            weight=Weight.FIRST_ENCOUNTER,
+                                            evaluator=self.__service_trust_evaluator
                                             )
         logger.debug(f"New trust for peer: {trust.peer_id}", trust)
 
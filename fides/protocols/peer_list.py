@@ -32,13 +32,16 @@ class PeerListUpdateProtocol:
         # we need to establish initial trust for them
         if len(known_peers) != len(peers):
             new_trusts = []
-            for peer in [p for p in peers if p.id not in known_peers]:
+            new_peers = [p for p in peers if p.id not in known_peers]
+            for peer in new_peers:
                 # this stores trust in database as well, do not get recommendations because at this point
                 # we don't have correct peer list in database
                 peer_trust = self.__trust_protocol.determine_and_store_initial_trust(peer, get_recommendations=False)
                 new_trusts.append(peer_trust)
-                # get recommendations for this peer
-                self.__recommendation_protocol.get_recommendation_for(peer, connected_peers=list(known_peers))
+            # get recommendations for new peers, in batch mode all of them are requested at once
+            self.__recommendation_protocol.get_recommendations_for(
+                new_peers, connected_peers=[p for p in peers if p.id in known_peers]
+            )
             # send only updated trusts to the network layer
             self.__bridge.send_peers_reliability({p.peer_id: p.service_trust for p in new_trusts})
         # now set update peer list in database
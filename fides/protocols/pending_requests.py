@@ -0,0 +1,85 @@
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fides.model.aliases import Target
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.utils.time import Time, now
+
+OpinionCallback = Callable[[SlipsThreatIntelligence], None]
+"""Callback that receives aggregated network opinion."""
+
+
+class PendingIntelligenceRequests:
+    """Table of the intelligence requests that were sent to the network and were not answered yet.
+
+    Requests on the same target are collapsed into one, everybody who asked for the target while
+    the request was pending waits for the same response. Requests expire after the timeout,
+    so a lost response does not block the target forever. Expired refreshes of the cache, that nobody waits for,
+    are remembered for another timeout, so their late responses are not mistaken for unrequested opinions.
+    """
+
+    def __init__(self, timeout_seconds: float):
+        """
+        :param timeout_seconds: how long to wait for the response before the target can be requested again
+        """
+        self.__timeout_seconds = timeout_seconds
+        # target -> time when the request was sent and waiting callbacks,
+        # ordered by the time, so the expired requests are at the beginning
+        self.__pending: Dict[Target, Tuple[Time, Dict[OpinionCallback, None]]] = {}
+        # target -> time when the expired refresh was sent, ordered by the time
+        self.__expired_refreshes: Dict[Target, Time] = {}
+        self.__lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    def add_waiter(self, target: Target, callback: Optional[OpinionCallback]) -> bool:
+        """Registers callback waiting for the opinion on the target.
+
+        :param target: requested target
+        :param callback: callback waiting for the opinion, None when nobody waits and only the cache is refreshed
+        :return: True if there was no pending request on the target and the request must be sent to the network
+        """
+        with self.__lock:
+            current_time = now()
+            self.__remove_expired(current_time)
+            pending = self.__pending.get(target)
+            if pending is None:
+                pending = current_time, {}
+                self.__pending[target] = pending
+                self.__expired_refreshes.pop(target, None)
+                is_new = True
+            else:
+                is_new = False
+            if callback is not None:
+                # the same callback is notified only once
+                pending[1][callback] = None
+            return is_new
+
+    def complete(self, target: Target) -> Optional[List[OpinionCallback]]:
+        """Removes pending request on the target and returns callbacks that were waiting for it.
+
+        Returns empty list for a refresh of the cache, even when it recently expired, and None when there was
+        no pending request or when it expired.
+        """
+        with self.__lock:
+            self.__remove_expired(now())
+            pending = self.__pending.pop(target, None)
+            if pending is not None:
+                return list(pending[1])
+            return [] if self.__expired_refreshes.pop(target, None) is not None else None
+
+    def __remove_expired(self, current_time: Time):
+        while self.__pending:
+            target, (created, callbacks) = next(iter(self.__pending.items()))
+            if current_time - created < self.__timeout_seconds:
+                break
+            del self.__pending[target]
+            if not callbacks:
+                self.__expired_refreshes[target] = created
+
+        while self.__expired_refreshes:
+            target, created = next(iter(self.__expired_refreshes.items()))
+            if current_time - created < 2 * self.__timeout_seconds:
+                return
+            del self.__expired_refreshes[target]
@@ -1,7 +1,7 @@
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
 from fides.evaluation.service.interaction import Satisfaction, Weight
-from fides.evaluation.service.process import process_service_interaction
 from fides.messaging.network_bridge import NetworkBridge
 from fides.model.aliases import PeerId
 from fides.model.configuration import TrustModelConfiguration
@@ -14,10 +14,12 @@ class Protocol:
     def __init__(self,
                  configuration: TrustModelConfiguration,
                  trust_db: TrustDatabase,
-                 bridge: NetworkBridge):
+                 bridge: NetworkBridge,
+                 service_trust_evaluator: Optional[IncrementalServiceTrustEvaluator] = None):
         self._configuration = configuration
         self._trust_db = trust_db
         self._bridge = bridge
+        self.__service_trust_evaluator = service_trust_evaluator
 
     def _evaluate_interaction(self,
                               peer: PeerTrustData,
@@ -28,15 +30,17 @@ class Protocol:
         return self._evaluate_interactions({peer.peer_id: (peer, satisfaction, weight)})[peer.peer_id]
 
     def _evaluate_interactions(self,
-                               data: Dict[PeerId, Tuple[PeerTrustData, Satisfaction, Weight]]) -> TrustMatrix:
-        """Callback to evaluate and save new trust data for given peer matrix."""
-        trust_matrix: TrustMatrix = {}
-        # first process all interactions
-        for _, (peer_trust, satisfaction, weight) in data.items():
-            updated_trust = process_service_interaction(self._configuration, peer_trust, satisfaction, weight)
-            trust_matrix[updated_trust.peer_id] = updated_trust
-        # then store matrix
-        self._trust_db.store_peer_trust_matrix(trust_matrix)
-        # and dispatch this update to the network layer
+                               data: Dict[PeerId, Tuple[PeerTrustData, Satisfaction, Weight]],
+                               updated_peers: Optional[TrustMatrix] = None) -> TrustMatrix:
+        """Callback to evaluate and save new trust data for given peer matrix.
+
+        :param data: interactions to evaluate
+        :param updated_peers: other peers updated by the caller that are stored and dispatched
+        together with the evaluated ones, peers in data should already contain these updates
+        """
+        return self._trust_db.record_service_interactions(data, updated_peers, self.__send_peers_reliability,
+                                                          self.__service_trust_evaluator)
+
+    def __send_peers_reliability(self, trust_matrix: TrustMatrix):
+        # dispatch this update to the network layer
         self._bridge.send_peers_reliability({p.peer_id: p.service_trust for p in trust_matrix.values()})
-        return trust_matrix
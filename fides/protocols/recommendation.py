@@ -1,13 +1,16 @@
 import math
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
-from fides.evaluation.recommendation.process import process_new_recommendations
+from fides.evaluation.recommendation.incremental import IncrementalRecommendationTrustEvaluator
+from fides.evaluation.recommendation.process import process_new_recommendations_for_subjects
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
 from fides.evaluation.service.interaction import Weight, SatisfactionLevels
 from fides.messaging.model import PeerRecommendationResponse
 from fides.messaging.network_bridge import NetworkBridge
 from fides.model.aliases import PeerId
 from fides.model.configuration import TrustModelConfiguration
 from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import PeerTrustData, TrustMetric
 from fides.model.recommendation import Recommendation
 from fides.persistence.trust import TrustDatabase
 from fides.protocols.protocol import Protocol
@@ -19,13 +22,19 @@ logger = Logger(__name__)
 class RecommendationProtocol(Protocol):
     """Protocol that is responsible for getting and updating recommendation data."""
 
-    def __init__(self, configuration: TrustModelConfiguration, trust_db: TrustDatabase, bridge: NetworkBridge):
-        super().__init__(configuration, trust_db, bridge)
+    def __init__(self,
+                 configuration: TrustModelConfiguration,
+                 trust_db: TrustDatabase,
+                 bridge: NetworkBridge,
+                 service_trust_evaluator: Optional[IncrementalServiceTrustEvaluator] = None,
+                 recommendation_trust_evaluator: Optional[IncrementalRecommendationTrustEvaluator] = None):
+        super().__init__(configuration, trust_db, bridge, service_trust_evaluator)
         self.__rec_conf = configuration.recommendations
         self.__trust_db = trust_db
         self.__bridge = bridge
+        self.__recommendation_trust_evaluator = recommendation_trust_evaluator
 
-    def get_recommendation_for(self, peer: PeerInfo, connected_peers: Optional[List[PeerId]] = None):
+    def get_recommendation_for(self, peer: PeerInfo, connected_peers: Optional[List[PeerInfo]] = None):
         """Dispatches recommendation request from the network.
 
         connected_peers - new peer list if the one from database is not accurate
@@ -41,14 +50,71 @@ class RecommendationProtocol(Protocol):
         else:
             logger.debug(f"No peers are trusted enough to ask them for recommendation!")
 
+    def get_recommendations_for(self, peers: List[PeerInfo], connected_peers: Optional[List[PeerInfo]] = None):
+        """Dispatches recommendation requests on multiple peers to the network.
+
+        When the batch requests are enabled, recipients are selected only once and a single
+        request is sent to each group of recipients, otherwise each peer is requested separately.
+
+        connected_peers - new peer list if the one from database is not accurate
+        """
+        if not self.__rec_conf.enabled:
+            logger.debug(f"Recommendation protocol is disabled. NOT getting recommendations for {len(peers)} peers.")
+            return
+
+        connected_peers = connected_peers if connected_peers is not None else self.__trust_db.get_connected_peers()
+        if not self.__rec_conf.batch_requests:
+            for peer in peers:
+                self.get_recommendation_for(peer, connected_peers)
+            return
+
+        # peers that are being evaluated are not asked for recommendations on each other
+        candidates = self.__get_recommendation_candidates(connected_peers, [p.id for p in peers])
+        # subjects that should be sent to the same recipients
+        groups: Dict[Tuple[PeerId, ...], List[PeerId]] = {}
+        for peer in peers:
+            recipients = self.__select_recipients(peer, candidates)
+            if recipients:
+                groups.setdefault(tuple(recipients), []).append(peer.id)
+
+        if not groups:
+            logger.debug(f"No peers are trusted enough to ask them for recommendation!")
+        for recipients, subjects in groups.items():
+            self.__bridge.send_batch_recommendation_request(recipients=list(recipients), peers=subjects)
+
     def handle_recommendation_request(self, request_id: str, sender: PeerInfo, subject: PeerId):
         """Handle request for recommendation on given subject."""
+        def respond(recommendations: Dict[PeerId, Recommendation]):
+            self.__bridge.send_recommendation_response(request_id, sender.id, subject, recommendations[subject])
+
+        self.__handle_request(sender, [subject], respond)
+
+    def handle_batch_recommendation_request(self, request_id: str, sender: PeerInfo, subjects: List[PeerId]):
+        """Handle request for recommendations on multiple subjects, responds with a single message."""
+        self.__handle_request(sender, subjects,
+                              lambda r: self.__bridge.send_batch_recommendation_response(request_id, sender.id, r))
+
+    def __handle_request(self,
+                         sender: PeerInfo,
+                         subjects: List[PeerId],
+                         respond: Callable[[Dict[PeerId, Recommendation]], None]):
+        """Creates recommendations on the subjects for the sender, responds and evaluates the interaction."""
         sender_trust = self.__trust_db.get_peer_trust_data(sender)
         # TODO: [+] implement data filtering based on the sender
-        trust = self.__trust_db.get_peer_trust_data(subject)
+        trust_matrix = self.__trust_db.get_peers_trust_data(subjects)
+        respond({subject: self.__create_recommendation(sender_trust, trust_matrix.get(subject))
+                 for subject in subjects})
+        # it is possible that we saw sender for the first time
+        # TODO: [+] initialise peer if we saw it for the first time
+        if sender_trust:
+            self._evaluate_interaction(sender_trust, SatisfactionLevels.Ok, Weight.INTELLIGENCE_REQUEST)
+
+    @staticmethod
+    def __create_recommendation(sender_trust: Optional[PeerTrustData],
+                                trust: Optional[PeerTrustData]) -> Recommendation:
         # if we know sender, and we have some trust for the target
         if sender_trust and trust:
-            recommendation = Recommendation(
+            return Recommendation(
                 competence_belief=trust.competence_belief,
                 integrity_belief=trust.integrity_belief,
                 service_history_size=trust.service_history_size,
@@ -56,55 +122,60 @@ class RecommendationProtocol(Protocol):
                 initial_reputation_provided_by_count=trust.initial_reputation_provided_by_count
             )
         else:
-            recommendation = Recommendation(
+            return Recommendation(
                 competence_belief=0,
                 integrity_belief=0,
                 service_history_size=0,
                 recommendation=0,
                 initial_reputation_provided_by_count=0
             )
-        self.__bridge.send_recommendation_response(request_id, sender.id, subject, recommendation)
-        # it is possible that we saw sender for the first time
-        # TODO: [+] initialise peer if we saw it for the first time
-        if sender_trust:
-            self._evaluate_interaction(sender_trust, SatisfactionLevels.Ok, Weight.INTELLIGENCE_REQUEST)
 
     def handle_recommendation_response(self, responses: List[PeerRecommendationResponse]):
-        """Handles response from peers with recommendations. Updates all necessary values in db."""
+        """Handles response from peers with recommendations. Updates all necessary values in db.
+
+        Responses can contain recommendations on multiple subjects, these are evaluated in a single batch.
+        """
         if len(responses) == 0:
             return
-        # TODO: [+] handle cases with multiple subjects
-        assert all(responses[0].subject == r.subject for r in responses), \
-            "Responses are not for the same subject!"
 
-        subject = self.__trust_db.get_peer_trust_data(responses[0].subject)
-        if subject is None:
-            logger.warn(f'Received recommendation for subject {responses[0].subject} that does not exist!')
-            return
+        recommendations: Dict[PeerId, Dict[PeerId, Recommendation]] = {}
+        for r in responses:
+            recommendations.setdefault(r.subject, {})[r.sender.id] = r.recommendation
+        # check that the data are consistent
+        assert sum(len(r) for r in recommendations.values()) == len(responses), \
+            'Data are not consistent: multiple responses from the same peer on the same subject!'
 
-        recommendations = {r.sender.id: r.recommendation for r in responses}
-        trust_matrix = self.__trust_db.get_peers_trust_data(list(recommendations.keys()))
+        # load subjects and recommenders at once
+        recommender_ids = list(dict.fromkeys(r.sender.id for r in responses))
+        trust_matrix = self.__trust_db.get_peers_trust_data(list(recommendations.keys()) + recommender_ids)
 
-        # check that the data are consistent
-        assert len(trust_matrix) == len(responses) == len(recommendations), \
-            f'Data are not consistent: TM: {len(trust_matrix)}, RES: {len(responses)}, REC: {len(recommendations)}!'
+        for subject in [s for s in recommendations.keys() if trust_matrix.get(s) is None]:
+            logger.warn(f'Received recommendation for subject {subject} that does not exist!')
+            del recommendations[subject]
+        if not recommendations:
+            return
+
+        recommender_ids = list(dict.fromkeys(peer for r in recommendations.values() for peer in r.keys()))
+        recommenders = {peer: trust_matrix.get(peer) for peer in recommender_ids}
+        assert all(recommenders.values()), \
+            f'Data are not consistent: missing trust data for recommenders ' \
+            f'{[peer for peer, trust in recommenders.items() if trust is None]}!'
 
         # update all recommendations
-        updated_matrix = process_new_recommendations(
+        updated_matrix = process_new_recommendations_for_subjects(
             configuration=self._configuration,
-            subject=subject,
-            matrix=trust_matrix,
-            recommendations=recommendations
+            subjects={subject: trust_matrix[subject] for subject in recommendations.keys()},
+            matrix=recommenders,
+            recommendations=recommendations,
+            evaluator=self.__recommendation_trust_evaluator
         )
-        # now store updated matrix
-        self.__trust_db.store_peer_trust_matrix(updated_matrix)
-        # and dispatch event
-        self.__bridge.send_peers_reliability({p.peer_id: p.service_trust for p in updated_matrix.values()})
 
         # TODO: [+] optionally employ same thing as when receiving TI
-        interaction_matrix = {p.peer_id: (p, SatisfactionLevels.Ok, Weight.RECOMMENDATION_RESPONSE)
-                              for p in trust_matrix.values()}
-        self._evaluate_interactions(interaction_matrix)
+        # evaluate interactions on the recommenders with already updated recommendation data
+        # and store everything together with updated subjects
+        interaction_matrix = {peer: (updated_matrix[peer], SatisfactionLevels.Ok, Weight.RECOMMENDATION_RESPONSE)
+                              for peer in recommender_ids}
+        self._evaluate_interactions(interaction_matrix, updated_peers=updated_matrix)
 
     @staticmethod
     def __is_zero_recommendation(recommendation: Recommendation) -> bool:
@@ -117,6 +188,29 @@ class RecommendationProtocol(Protocol):
     def __get_recommendation_request_recipients(self,
                                                 subject: PeerInfo,
                                                 connected_peers: List[PeerInfo]) -> List[PeerId]:
+        return self.__select_recipients(subject, self.__get_recommendation_candidates(connected_peers, [subject.id]))
+
+    def __select_recipients(self,
+                            subject: PeerInfo,
+                            candidates: Tuple[List[PeerTrustData], float]) -> List[PeerId]:
+        """Selects recipients of the recommendation request on subject from the sorted candidates."""
+        candidates, require_trusted_peer_count = candidates
+        # check if we can proceed
+        if len(candidates) == 0 or len(candidates) < require_trusted_peer_count:
+            logger.debug(
+                f"Not enough trusted peers! Candidates: {len(candidates)}, requirement: {require_trusted_peer_count}.")
+            return []
+
+        # and take only top __rec_conf.peers_max_count peers to ask for recommendations
+        return [p.peer_id for p in candidates][:self.__rec_conf.peers_max_count]
+
+    def __get_recommendation_candidates(self,
+                                        connected_peers: List[PeerInfo],
+                                        exclude: List[PeerId]) -> Tuple[List[PeerTrustData], float]:
+        """Returns candidates for recommendation request recipients sorted by service trust
+        and minimal count of the candidates required to send the request.
+
+        Peers in exclude, the subjects of the request, are never candidates."""
         recommenders: List[PeerInfo] = []
         require_trusted_peer_count = self.__rec_conf.required_trusted_peers_count
         trusted_peer_threshold = self.__rec_conf.trusted_peer_threshold
@@ -144,23 +238,21 @@ class RecommendationProtocol(Protocol):
             require_trusted_peer_count = -math.inf
         elif not self.__rec_conf.only_connected:
             # in this case there's no restriction, and we can freely select any peers
-            # select peers that hev at least trusted_peer_threshold recommendation trust
-            recommenders = self.__trust_db.get_peers_with_geq_recommendation_trust(trusted_peer_threshold)
-            # if there's not enough peers like that, select some more with this service trust
-            if len(recommenders) <= self.__rec_conf.peers_max_count:
-                # TODO: [+] maybe add higher trusted_peer_threshold for this one
-                recommenders += self.__trust_db.get_peers_with_geq_service_trust(trusted_peer_threshold)
-
-        # now we need to get all trust data and sort them by recommendation trust
-        candidates = list(self.__trust_db.get_peers_trust_data(recommenders).values())
-        candidates = [c for c in candidates if c.peer_id != subject.id]
-        # check if we can proceed
-        if len(candidates) == 0 or len(candidates) < require_trusted_peer_count:
-            logger.debug(
-                f"Not enough trusted peers! Candidates: {len(candidates)}, requirement: {require_trusted_peer_count}.")
-            return []
+            # select peers that have at least trusted_peer_threshold recommendation or service trust
+            # TODO: [+] maybe add higher trusted_peer_threshold for service trust
+            candidates = self.__trust_db.get_top_peers_trust_data(
+                order_by=TrustMetric.SERVICE_TRUST,
+                limit=self.__rec_conf.peers_max_count,
+                minimal_trust={TrustMetric.RECOMMENDATION_TRUST: trusted_peer_threshold,
+                               TrustMetric.SERVICE_TRUST: trusted_peer_threshold},
+                exclude=exclude
+            )
+            return candidates, require_trusted_peer_count
 
+        # now we need to get all trust data and sort them by service trust
+        excluded = set(exclude)
+        candidates = [c for c in self.__trust_db.get_peers_trust_data(recommenders).values()
+                      if c and c.peer_id not in excluded]
         # now sort them
         candidates.sort(key=lambda c: c.service_trust, reverse=True)
-        # and take only top __rec_conf.peers_max_count peers to ask for recommendations
-        return [p.peer_id for p in candidates][:self.__rec_conf.peers_max_count]
+        return candidates, require_trusted_peer_count
@@ -1,5 +1,6 @@
 from typing import List, Callable, Optional
 
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
 from fides.evaluation.service.interaction import Weight, SatisfactionLevels
 from fides.evaluation.ti_evaluation import TIEvaluation
 from fides.messaging.model import PeerIntelligenceResponse
@@ -13,6 +14,7 @@ from fides.persistence.threat_intelligence import ThreatIntelligenceDatabase
 from fides.persistence.trust import TrustDatabase
 from fides.protocols.initial_trusl import InitialTrustProtocol
 from fides.protocols.opinion import OpinionAggregator
+from fides.protocols.pending_requests import PendingIntelligenceRequests, OpinionCallback
 from fides.protocols.protocol import Protocol
 from fides.utils.logger import Logger
 
@@ -30,24 +32,40 @@ class ThreatIntelligenceProtocol(Protocol):
                  aggregator: OpinionAggregator,
                  trust_protocol: InitialTrustProtocol,
                  ti_evaluation_strategy: TIEvaluation,
-                 network_opinion_callback: Callable[[SlipsThreatIntelligence], None]
+                 network_opinion_callback: Callable[[SlipsThreatIntelligence], None],
+                 service_trust_evaluator: Optional[IncrementalServiceTrustEvaluator] = None
                  ):
-        super().__init__(configuration, trust_db, bridge)
+        super().__init__(configuration, trust_db, bridge, service_trust_evaluator)
         self.__ti_db = ti_db
         self.__aggregator = aggregator
         self.__trust_protocol = trust_protocol
         self.__ti_evaluation_strategy = ti_evaluation_strategy
         self.__network_opinion_callback = network_opinion_callback
+        self.__pending_requests = PendingIntelligenceRequests(configuration.intelligence_request_timeout_seconds)
 
-    def request_data(self, target: Target):
-        """Requests network opinion on given target."""
-        cached = self._trust_db.get_cached_network_opinion(target)
-        if cached:
+    def request_data(self, target: Target, callback: Optional[OpinionCallback] = None):
+        """Requests network opinion on given target.
+
+        :param target: target of the request
+        :param callback: receives the opinion, if None, network opinion callback is used
+        """
+        callback = callback if callback is not None else self.__network_opinion_callback
+        cached = self._trust_db.get_cached_network_opinion(target, include_stale=True)
+        if cached and not cached.stale:
             logger.debug(f'TI for target {target} found in cache.')
-            return self.__network_opinion_callback(cached)
-        else:
+            return callback(cached)
+
+        if cached:
+            logger.debug(f'Stale TI for target {target} found in cache, refreshing it.')
+            callback(cached)
+            # nobody waits for the refresh, the response only updates the cache
+            callback = None
+
+        if self.__pending_requests.add_waiter(target, callback):
             logger.debug(f'Requesting data for target {target} from network.')
             self._bridge.send_intelligence_request(target)
+        else:
+            logger.debug(f'Request for target {target} is already pending, waiting for the response.')
 
     def handle_intelligence_request(self, request_id: str, sender: PeerInfo, target: Target):
         """Handles intelligence request."""
@@ -89,7 +107,13 @@ class ThreatIntelligenceProtocol(Protocol):
         )
         self._evaluate_interactions(interaction_matrix)
 
-        return self.__network_opinion_callback(ti)
+        callbacks = self.__pending_requests.complete(target)
+        if callbacks is None:
+            # response can come after the request expired, the opinion is still useful for the Slips,
+            # late responses to the refreshes have no callbacks and only update the cache
+            callbacks = [self.__network_opinion_callback]
+        for callback in callbacks:
+            callback(ti)
 
     def __filter_ti(self,
                     ti: Optional[SlipsThreatIntelligence],
@@ -59,9 +59,16 @@ class Logger:
         formatted_message = f"T{thread}: {self.__name} -  {message}"
         if params:
             params = asdict(params) if is_dataclass(params) else params
-            formatted_message = f"{formatted_message} {json.dumps(params)}"
+            formatted_message = f"{formatted_message} {json.dumps(params, default=self.__serialize)}"
         return formatted_message
 
+    @staticmethod
+    def __serialize(obj):
+        # for types that are not natively serializable, such as ring buffers with history
+        if is_dataclass(obj):
+            return asdict(obj)
+        return list(obj)
+
     def __print(self, level: str, message: str, params=None):
         formatted_message = self.__format(message, params)
         for print_callback in LoggerPrintCallbacks:
@@ -60,19 +60,25 @@ class TimeEnvironment:
         self._process_fides_messages(epoch)
 
     def _process_fides_messages(self, epoch: Click):
-        recommendation_requests: List[Tuple[PeerId, Set[PeerId]]] = [(m.data['payload'], set(m.data['receiver_ids']))
-                                                                     for m in self._fides_stream if
-                                                                     m.type == 'tl2nl_recommendation_request']
+        # single request can contain multiple subjects when batch requests are enabled
+        recommendation_requests: List[Tuple[List[PeerId], Set[PeerId]]] = [
+            ([m.data['payload']] if m.type == 'tl2nl_recommendation_request' else m.data['payload'],
+             set(m.data['receiver_ids']))
+            for m in self._fides_stream if
+            m.type in ('tl2nl_recommendation_request', 'tl2nl_batch_recommendation_request')
+        ]
         self._fides_stream.clear()
         baseline_behavior = {p.peer_info.id: p.label for p in self._other_peers}
 
-        for (subject, recommender_ids) in recommendation_requests:
-            recommendations = [(p.peer_info, p.provide_recommendation(epoch, subject, baseline_behavior[subject]))
+        for (subjects, recommender_ids) in recommendation_requests:
+            recommendations = [(p.peer_info, subject,
+                                p.provide_recommendation(epoch, subject, baseline_behavior[subject]))
+                               for subject in subjects
                                for p in self._other_peers if p.peer_info.id in recommender_ids]
             responses = [PeerRecommendationResponse(
                 sender=peer_info,
                 subject=subject,
                 recommendation=recommendation
-            ) for (peer_info, recommendation) in recommendations if recommendation]
+            ) for (peer_info, subject, recommendation) in recommendations if recommendation]
 
             self._fides.queue.send_message(serialize(nl2tl_recommendation_response(responses)))
@@ -1,14 +1,55 @@
-from threading import Thread
-from typing import Callable, Optional
+from dataclasses import dataclass, field, replace
+from threading import Thread, Lock, Timer, current_thread
+from time import perf_counter, sleep
+from typing import Callable, Dict, List, Optional, Union
 
 from redis.client import Redis
+from redis.exceptions import RedisError, ResponseError
 
 from fides.messaging.queue import Queue
 from fides.utils.logger import Logger
+from fides.utils.time import Time, now
+from slips.redis_client import binary_client
 
 logger = Logger(__name__)
 
 
+@dataclass
+class PublishStatistics:
+    """Statistics of the batched publishing."""
+
+    batch_sizes: Dict[int, int] = field(default_factory=dict)
+    """Number of published batches by their size."""
+
+    flush_seconds_total: float = 0
+    """Time spent publishing the batches."""
+
+    flush_seconds_max: float = 0
+    """Longest publishing of a single batch."""
+
+    failed_flushes: int = 0
+    """Number of publishing attempts that failed, their messages stayed in the buffer."""
+
+    dropped_messages: int = 0
+    """Number of the oldest buffered messages that were dropped because the buffer was full."""
+
+    @property
+    def batches(self) -> int:
+        """Number of published batches."""
+        return sum(self.batch_sizes.values())
+
+    @property
+    def messages(self) -> int:
+        """Number of published messages."""
+        return sum(size * count for size, count in self.batch_sizes.items())
+
+    @property
+    def flush_seconds_mean(self) -> float:
+        """Mean duration of publishing a single batch, 0 if nothing was published yet."""
+        batches = self.batches
+        return self.flush_seconds_total / batches if batches else 0
+
+
 class RedisQueue(Queue):
     """Implementation of Queue interface that uses two Redis queues."""
 
@@ -37,17 +78,130 @@ class RedisSimplexQueue(Queue):
     """
     Implementation of Queue interface that uses two Redis queues.
     One for sending data and one for listening.
+
+    Sent messages can be published in batches, then they are buffered and published through a single
+    pipeline when there are batch_size of them, when the batch interval passes, or when flush is called
+    - it must be called before the process exits, otherwise the buffered messages are lost.
+    When publishing fails, the batch stays in the buffer and is published again with the next flush,
+    messages that were published before the failure can be then delivered twice. While the publishing fails,
+    at most max_buffered messages are kept and the oldest ones are dropped.
     """
 
-    def __init__(self, r: Redis, send_channel: str, received_channel: str):
-        self.__r = r
+    def __init__(self,
+                 r: Redis,
+                 send_channel: str,
+                 received_channel: str,
+                 binary: bool = False,
+                 batch_size: int = 1,
+                 batch_interval_seconds: float = 0,
+                 max_buffered: int = 10_000):
+        """
+        :param r: redis client
+        :param send_channel: channel for the sent messages
+        :param received_channel: channel with the received messages
+        :param binary: if True, received messages are not decoded and are passed to the listener as bytes
+        :param batch_size: number of buffered messages that are published together, 1 publishes every message
+        :param batch_interval_seconds: maximal time for which a message stays in the buffer,
+        a timer publishes the batch when it passes
+        :param max_buffered: maximal number of buffered messages when publishing fails
+        """
+        assert batch_size > 0, 'Batch size must be positive.'
+        assert max_buffered >= batch_size, 'Buffer must fit the whole batch.'
+        self.__r = binary_client(r) if binary else r
         self.__receive = received_channel
         self.__send = send_channel
         self.__pub = self.__r.pubsub()
         self.__pub_sub_thread: Optional[Thread] = None
+        self.__batch_size = batch_size
+        self.__batch_interval_seconds = batch_interval_seconds
+        self.__buffer: List[Union[str, bytes]] = []
+        # time when the oldest buffered message was sent
+        self.__buffered_since: Optional[Time] = None
+        self.__max_buffered = max_buffered
+        # publishes the batch when the interval passes, even when nothing else is sent
+        self.__timer: Optional[Timer] = None
+        # the oldest messages are being dropped since the last successful publishing
+        self.__dropping = False
+        self.__statistics = PublishStatistics()
+        self.__lock = Lock()
+
+    @property
+    def statistics(self) -> PublishStatistics:
+        """Snapshot of the publishing statistics."""
+        with self.__lock:
+            return replace(self.__statistics, batch_sizes=dict(self.__statistics.batch_sizes))
 
-    def send(self, serialized_data: str, **argv):
-        self.__r.publish(self.__send, serialized_data)
+    def send(self, serialized_data: Union[str, bytes], **argv):
+        with self.__lock:
+            self.__buffer.append(serialized_data)
+            if len(self.__buffer) > self.__max_buffered:
+                self.__drop_oldest()
+            if self.__buffered_since is None:
+                self.__buffered_since = now()
+                self.__schedule_flush()
+            if len(self.__buffer) >= self.__batch_size \
+                    or now() - self.__buffered_since >= self.__batch_interval_seconds:
+                self.__flush()
+
+    def flush(self):
+        """Publishes all buffered messages."""
+        with self.__lock:
+            self.__flush()
+
+    def flush_if_due(self):
+        """Publishes buffered messages if the batch interval passed since the oldest one was sent."""
+        with self.__lock:
+            if self.__buffered_since is not None and now() - self.__buffered_since >= self.__batch_interval_seconds:
+                self.__flush()
+
+    def __flush(self):
+        if not self.__buffer:
+            return
+        batch = self.__buffer
+        statistics = self.__statistics
+        start = perf_counter()
+        try:
+            if len(batch) == 1:
+                self.__r.publish(self.__send, batch[0])
+            else:
+                pipe = self.__r.pipeline(transaction=False)
+                for data in batch:
+                    pipe.publish(self.__send, data)
+                pipe.execute()
+        except RedisError as ex:
+            statistics.failed_flushes += 1
+            logger.error(f'Publishing of {len(batch)} messages failed, they stay buffered, {ex}')
+            # try again when the interval passes
+            self.__schedule_flush()
+            return
+        duration = perf_counter() - start
+        self.__buffer, self.__buffered_since, self.__dropping = [], None, False
+        self.__cancel_timer()
+
+        statistics.batch_sizes[len(batch)] = statistics.batch_sizes.get(len(batch), 0) + 1
+        statistics.flush_seconds_total += duration
+        statistics.flush_seconds_max = max(statistics.flush_seconds_max, duration)
+
+    def __drop_oldest(self):
+        dropped = len(self.__buffer) - self.__max_buffered
+        if not self.__dropping:
+            logger.error(f'Buffer of the unpublished messages is full, dropping the oldest ones.')
+            self.__dropping = True
+        del self.__buffer[:dropped]
+        self.__statistics.dropped_messages += dropped
+
+    def __schedule_flush(self):
+        if self.__batch_size == 1 or self.__batch_interval_seconds <= 0:
+            return
+        self.__cancel_timer()
+        self.__timer = Timer(self.__batch_interval_seconds, self.flush)
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __cancel_timer(self):
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
 
     def listen(self,
                on_message: Callable[[str], None],
@@ -81,13 +235,15 @@ class RedisSimplexQueue(Queue):
         data = None
         if redis_msg is not None \
                 and redis_msg['data'] is not None \
-                and type(redis_msg['data']) == str:
+                and type(redis_msg['data']) in (str, bytes):
             data = redis_msg['data']
 
         if data is None:
             return
-        elif data == 'stop_process':
+        elif data == 'stop_process' or data == b'stop_process':
             logger.debug(f'Stop process message received! Stopping subscription.')
+            # publish what was buffered before the process stops
+            self.flush()
             # unsubscribe from the receive queue
             self.__pub.unsubscribe(self.__receive)
             self.__pub.close()
@@ -129,3 +285,155 @@ class RedisDuplexQueue(RedisSimplexQueue):
 
     def __init__(self, r: Redis, channel: str):
         super().__init__(r, channel, channel)
+
+
+class RedisStreamQueue(Queue):
+    """
+    Implementation of Queue interface that uses two Redis streams.
+    One for sending data and one for listening.
+
+    Unlike pub/sub, messages stay in the stream until they are read, so they are not lost when the reader
+    is slow or restarting, and the reader is never sent more than it asks for. Received messages are read
+    by a consumer group in batches and the whole batch is acknowledged after it was processed. Messages that
+    were read but not acknowledged, because the process crashed, are delivered again when the consumer
+    starts listening. The send stream is trimmed to approximately max_length entries, acknowledged entries
+    are trimmed from the receive stream after each batch, so no other consumer group should read it.
+    Redis older than 6.2 can not trim by entry ID, then the receive stream is trimmed to approximately
+    max_length entries as well and the messages waiting to be read beyond that length are lost.
+    """
+
+    FIELD = 'data'
+    """Field of the stream entry that contains the message."""
+
+    def __init__(self,
+                 r: Redis,
+                 send_stream: str,
+                 receive_stream: str,
+                 group: str = 'fides',
+                 consumer: str = 'fides',
+                 max_length: int = 10_000,
+                 read_count: int = 100,
+                 block_milliseconds: int = 100,
+                 binary: bool = False):
+        """
+        :param r: redis client
+        :param send_stream: stream for the sent messages
+        :param receive_stream: stream with the received messages
+        :param group: consumer group that reads the received messages
+        :param consumer: name of this consumer in the group, must be the same after the restart,
+        so the unacknowledged messages are delivered again
+        :param max_length: approximate maximal number of entries in the send stream
+        :param read_count: maximal number of messages read at once
+        :param block_milliseconds: how long single read waits for new messages,
+        must be positive, so the listener notices that it was stopped
+        :param binary: if True, received messages are not decoded and are passed to the listener as bytes
+        """
+        assert block_milliseconds > 0, 'Read must not block forever.'
+        self.__r = binary_client(r) if binary else r
+        self.__send = send_stream
+        self.__receive = receive_stream
+        self.__group = group
+        self.__consumer = consumer
+        self.__max_length = max_length
+        self.__read_count = read_count
+        self.__block_milliseconds = block_milliseconds
+        self.__listening = False
+        self.__thread: Optional[Thread] = None
+        # XTRIM MINID needs Redis 6.2, older servers trim the receive stream by length
+        self.__trim_acknowledged = True
+
+    def send(self, serialized_data: Union[str, bytes], **argv):
+        self.__r.xadd(self.__send, {self.FIELD: serialized_data}, maxlen=self.__max_length, approximate=True)
+
+    def listen(self,
+               on_message: Callable[[Union[str, bytes]], None],
+               block: bool = False,
+               **argv
+               ):
+        """Starts listening, if :param: block = True, the method blocks current thread!
+
+        Messages that were delivered before, but not acknowledged, are processed first.
+        """
+        self.__create_group()
+        self.__listening = True
+        if block:
+            return self.__consume(on_message)
+        self.__thread = Thread(target=self.__consume, args=(on_message,), daemon=True)
+        self.__thread.start()
+        return self.__thread
+
+    def stop(self):
+        """Stops listening after the currently processed batch."""
+        self.__listening = False
+        if self.__thread is not None and self.__thread is not current_thread():
+            self.__thread.join()
+
+    def read_batch(self, on_message: Callable[[Union[str, bytes]], None], pending: bool = False) -> int:
+        """Reads, processes and acknowledges single batch of messages, processing stops at the stop message.
+
+        :param on_message: executed for each message
+        :param pending: if True, reads messages that were delivered to this consumer before, but not acknowledged
+        :return: number of read stream entries
+        """
+        response = self.__r.xreadgroup(self.__group, self.__consumer, {self.__receive: '0' if pending else '>'},
+                                       count=self.__read_count,
+                                       block=None if pending else self.__block_milliseconds)
+        entries = response[0][1] if response else []
+        processed = 0
+        for _, fields in entries:
+            processed += 1
+            # pending entries that were trimmed from the stream have no fields
+            data = fields.get(self.FIELD, fields.get(self.FIELD.encode())) if fields else None
+            if data is None:
+                continue
+            elif data == 'stop_process' or data == b'stop_process':
+                logger.debug(f'Stop process message received! Stopping listening.')
+                # entries after the stop message stay pending and are delivered when listening starts again
+                self.__listening = False
+                break
+            try:
+                on_message(data)
+            except Exception as ex:
+                logger.error(f'Error when executing on_message!, {ex}')
+
+        if processed:
+            acknowledged = [entry_id for entry_id, _ in entries[:processed]]
+            pipe = self.__r.pipeline(transaction=False)
+            pipe.xack(self.__receive, self.__group, *acknowledged)
+            if self.__trim_acknowledged:
+                # all entries before the last acknowledged one were already acknowledged as well,
+                # raw command as the Redis client that comes with Slips does not support MINID
+                pipe.execute_command('XTRIM', self.__receive, 'MINID', acknowledged[-1])
+            else:
+                # positional maxlen, so it works with the Redis client that comes with Slips
+                pipe.xtrim(self.__receive, self.__max_length, approximate=True)
+            acknowledged_count, trimmed = pipe.execute(raise_on_error=False)
+            if isinstance(acknowledged_count, Exception):
+                raise acknowledged_count
+            if isinstance(trimmed, ResponseError) and self.__trim_acknowledged:
+                logger.warn(f'Redis does not support XTRIM MINID, trimming {self.__receive} by length, {trimmed}')
+                self.__trim_acknowledged = False
+                self.__r.xtrim(self.__receive, self.__max_length, approximate=True)
+            elif isinstance(trimmed, Exception):
+                raise trimmed
+        return len(entries)
+
+    def __consume(self, on_message: Callable[[Union[str, bytes]], None]):
+        # messages delivered before, but not acknowledged, are processed first
+        pending = True
+        while self.__listening:
+            try:
+                read = self.read_batch(on_message, pending=pending)
+            except Exception as ex:
+                logger.error(f'Error when reading stream {self.__receive}!, {ex}')
+                sleep(self.__block_milliseconds / 1000)
+                continue
+            pending = pending and read > 0
+
+    def __create_group(self):
+        try:
+            # group reads the stream from the beginning, so the messages sent before the first start are processed
+            self.__r.xgroup_create(self.__receive, self.__group, id='0', mkstream=True)
+        except ResponseError as ex:
+            if 'BUSYGROUP' not in str(ex):
+                raise
@@ -2,11 +2,17 @@ import json
 import sys
 from dataclasses import asdict
 from multiprocessing import Process
+from typing import List, Union
 
+from fides.evaluation.recommendation.incremental import IncrementalRecommendationTrustEvaluator
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
+from fides.messaging.codec import create_codec, JsonCodec
 from fides.messaging.message_handler import MessageHandler
 from fides.messaging.network_bridge import NetworkBridge
 from fides.model.configuration import load_configuration
 from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.trust_caching import CachingTrustDatabase
+from fides.persistence.trust_lazy import LazyEvaluationTrustDatabase
 from fides.protocols.alert import AlertProtocol
 from fides.protocols.initial_trusl import InitialTrustProtocol
 from fides.protocols.opinion import OpinionAggregator
@@ -50,33 +56,64 @@ class SlipsFidesModule(Module, Process):
         self.__intelligence: ThreatIntelligenceProtocol
         self.__alerts: AlertProtocol
         self.__slips_fides: RedisQueue
+        self.__network_fides: RedisSimplexQueue
+        # decorators of the trust database with pending work, ordered from the outer one
+        self.__buffered_dbs: List[Union[LazyEvaluationTrustDatabase, CachingTrustDatabase]] = []
 
     def __setup_trust_model(self):
         r = __database__.r
 
         # TODO: [S] launch network layer binary if necessary
 
-        # create database wrappers for Slips using Redis
-        trust_db = SlipsTrustDatabase(self.__trust_model_config, r)
-        ti_db = SlipsThreatIntelligenceDatabase(self.__trust_model_config, r)
-
         # create queues
         # TODO: [S] check if we need to use duplex or simplex queue for communication with network module
-        network_fides_queue = RedisSimplexQueue(r, send_channel='fides2network', received_channel='network2fides')
+        codec = create_codec(self.__trust_model_config.network_codec)
+        network_fides_queue = RedisSimplexQueue(
+            r, send_channel='fides2network', received_channel='network2fides',
+            binary=codec.version != JsonCodec.version,
+            batch_size=self.__trust_model_config.network_publish_batch_size,
+            batch_interval_seconds=self.__trust_model_config.network_publish_batch_interval_seconds
+        )
         slips_fides_queue = RedisSimplexQueue(r, send_channel='fides2slips', received_channel='slips2fides')
 
-        bridge = NetworkBridge(network_fides_queue)
+        bridge = NetworkBridge(network_fides_queue, codec,
+                               self.__trust_model_config.peers_reliability_window_seconds,
+                               self.__trust_model_config.peers_reliability_epsilon)
 
-        recommendations = RecommendationProtocol(self.__trust_model_config, trust_db, bridge)
-        trust = InitialTrustProtocol(trust_db, self.__trust_model_config, recommendations)
+        # create database wrappers for Slips using Redis
+        trust_db = SlipsTrustDatabase(self.__trust_model_config, r)
+        cache = self.__trust_model_config.trust_cache
+        if cache is not None:
+            trust_db = CachingTrustDatabase(trust_db, cache.max_size, cache.flush_interval_seconds,
+                                            cache.flush_batch_size)
+            self.__buffered_dbs.insert(0, trust_db)
+        flush_interval = self.__trust_model_config.service_trust_flush_interval_seconds
+        if flush_interval is not None:
+            trust_db = LazyEvaluationTrustDatabase(
+                trust_db, flush_interval,
+                on_flush=lambda m: bridge.send_peers_reliability({p.peer_id: p.service_trust for p in m.values()})
+            )
+            self.__buffered_dbs.insert(0, trust_db)
+        ti_db = SlipsThreatIntelligenceDatabase()
+
+        # running sums of the incremental evaluation are shared by all protocols
+        service_evaluator = IncrementalServiceTrustEvaluator() \
+            if self.__trust_model_config.incremental_service_trust else None
+        recommendation_evaluator = IncrementalRecommendationTrustEvaluator() \
+            if self.__trust_model_config.incremental_recommendation_trust else None
+
+        recommendations = RecommendationProtocol(self.__trust_model_config, trust_db, bridge, service_evaluator,
+                                                 recommendation_evaluator)
+        trust = InitialTrustProtocol(trust_db, self.__trust_model_config, recommendations, service_evaluator)
         peer_list = PeerListUpdateProtocol(trust_db, bridge, recommendations, trust)
         opinion = OpinionAggregator(self.__trust_model_config, ti_db, self.__trust_model_config.ti_aggregation_strategy)
 
         intelligence = ThreatIntelligenceProtocol(trust_db, ti_db, bridge, self.__trust_model_config, opinion, trust,
                                                   self.__slips_config.interaction_evaluation_strategy,
-                                                  self.__network_opinion_callback)
+                                                  self.__network_opinion_callback,
+                                                  service_evaluator)
         alert = AlertProtocol(trust_db, bridge, trust, self.__trust_model_config, opinion,
-                              self.__network_opinion_callback)
+                              self.__network_opinion_callback, service_evaluator)
 
         # TODO: [S+] add on_unknown and on_error handlers if necessary
         message_handler = MessageHandler(
@@ -87,7 +124,8 @@ class SlipsFidesModule(Module, Process):
             on_intelligence_request=intelligence.handle_intelligence_request,
             on_intelligence_response=intelligence.handle_intelligence_response,
             on_unknown=None,
-            on_error=None
+            on_error=None,
+            on_batch_recommendation_request=recommendations.handle_batch_recommendation_request
         )
 
         # bind local vars
@@ -95,10 +133,31 @@ class SlipsFidesModule(Module, Process):
         self.__intelligence = intelligence
         self.__alerts = alert
         self.__slips_fides = slips_fides_queue
+        self.__network_fides = network_fides_queue
 
         # and finally execute listener
         self.__bridge.listen(message_handler, block=False)
 
+    def __flush_trust_db(self):
+        """Writes all pending trust data, outer decorators first as they write to the inner ones."""
+        for db in self.__buffered_dbs:
+            db.flush()
+            if isinstance(db, CachingTrustDatabase):
+                statistics = db.statistics
+                logger.info(f'Trust cache hit rate: {statistics.hit_rate:.2%}, '
+                            f'{statistics.flushes} flushes, mean flush {statistics.flush_seconds_mean * 1000:.2f} ms, '
+                            f'max flush {statistics.flush_seconds_max * 1000:.2f} ms.')
+
+    def __flush_network_queue(self):
+        """Publishes messages buffered for the network layer."""
+        self.__network_fides.flush()
+        statistics = self.__network_fides.statistics
+        logger.info(f'Published {statistics.messages} messages in {statistics.batches} batches, '
+                    f'batch sizes {dict(sorted(statistics.batch_sizes.items()))}, '
+                    f'mean flush {statistics.flush_seconds_mean * 1000:.2f} ms, '
+                    f'max flush {statistics.flush_seconds_max * 1000:.2f} ms, '
+                    f'{statistics.failed_flushes} failed flushes, {statistics.dropped_messages} dropped messages.')
+
     def __network_opinion_callback(self, ti: SlipsThreatIntelligence):
         """This is executed every time when trust model was able to create an aggregated network opinion."""
         logger.info(f'Callback: Target: {ti.target}, Score: {ti.score}, Confidence: {ti.confidence}.')
@@ -116,6 +175,13 @@ class SlipsFidesModule(Module, Process):
         # main loop for handling data coming from Slips
         while True:
             try:
+                # recompute and write trust of the peers that were pending for the whole flush interval
+                for db in self.__buffered_dbs:
+                    db.flush_if_due()
+                # send peers reliability merged during the last window
+                self.__bridge.flush_peers_reliability_if_due()
+                self.__network_fides.flush_if_due()
+
                 message = self.__slips_fides.get_message(timeout_seconds=0.1)
                 # if there's no string data message we can continue in waiting
                 if not message \
@@ -124,6 +190,9 @@ class SlipsFidesModule(Module, Process):
                     continue
                 # handle case when the Slips decide to stop the process
                 if message['data'] == 'stop_process':
+                    self.__flush_trust_db()
+                    self.__bridge.flush_peers_reliability()
+                    self.__flush_network_queue()
                     # Confirm that the module is done processing
                     __database__.publish('finished_modules', self.name)
                     return True
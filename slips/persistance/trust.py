@@ -1,64 +1,220 @@
-from typing import List, Optional, Union
+import json
+from dataclasses import asdict
+from math import inf
+from typing import Collection, Dict, Iterable, List, Optional, Set, Tuple, Union
 
-from redis.client import Redis
+from redis.client import Redis, Pipeline
 
 from fides.messaging.model import PeerInfo
 from fides.model.aliases import PeerId, Target, OrganisationId
 from fides.model.configuration import TrustModelConfiguration
-from fides.model.peer_trust_data import PeerTrustData, TrustMatrix
+from fides.model.peer_trust_data import PeerTrustData, TrustMatrix, TrustMetric
 from fides.model.threat_intelligence import SlipsThreatIntelligence
 from fides.persistence.trust import TrustDatabase
+from fides.persistence.trust_codec import encode_peer_trust_data, decode_peer_trust_data, decode_peer_info
+from slips.redis_client import binary_client
 
 
-# because this will be implemented
-# noinspection DuplicatedCode
 class SlipsTrustDatabase(TrustDatabase):
-    """Trust database implementation that uses Slips redis as a storage."""
+    """Trust database implementation that uses Slips redis as a storage.
 
-    # TODO: [S] implement this
+    Each peer is stored as a single value encoded by fides.persistence.trust_codec,
+    bulk reads and writes cost a single round trip to the Redis regardless the number of peers.
+    Every trust metric is indexed in a sorted set and members of each organisation
+    are kept in a set, so the queries cost is proportional to the size of the result
+    and not to the size of the network.
+    """
+
+    KEY_PREFIX = 'fides'
+    """Prefix of all keys used by this database."""
 
     def __init__(self, configuration: TrustModelConfiguration, r: Redis):
         super().__init__(configuration)
-        self.__r = r
+        # peer data are binary
+        self.__r = binary_client(r)
+        self.__connected_peers_key = f'{self.KEY_PREFIX}:connected_peers'
 
     def store_connected_peers_list(self, current_peers: List[PeerInfo]):
         """Stores list of peers that are directly connected to the Slips."""
-
-        raise NotImplemented()
+        self.__r.set(self.__connected_peers_key, json.dumps([asdict(p) for p in current_peers]))
 
     def get_connected_peers(self) -> List[PeerInfo]:
         """Returns list of peers that are directly connected to the Slips."""
-        raise NotImplemented()
+        data = self.__r.get(self.__connected_peers_key)
+        return [PeerInfo(**p) for p in json.loads(data)] if data else []
+
+    def get_peers_info(self, peer_ids: List[PeerId]) -> List[PeerInfo]:
+        """Returns list of peer infos for given ids."""
+        return [decode_peer_info(data) for data in self.__get_encoded(peer_ids) if data]
 
     def get_peers_with_organisations(self, organisations: List[OrganisationId]) -> List[PeerInfo]:
         """Returns list of peers that have one of given organisations."""
-        raise NotImplemented()
+        if not organisations:
+            return []
+        peer_ids = self.__r.sunion([self.__organisation_key(o) for o in organisations])
+        return self.get_peers_info(sorted(self.__str(p) for p in peer_ids))
 
     def get_peers_with_geq_recommendation_trust(self, minimal_recommendation_trust: float) -> List[PeerInfo]:
         """Returns peers that have >= recommendation_trust then the minimal."""
-        raise NotImplemented()
+        return self.__get_peers_with_geq(TrustMetric.RECOMMENDATION_TRUST, minimal_recommendation_trust)
+
+    def get_peers_with_geq_service_trust(self, minimal_service_trust: float) -> List[PeerInfo]:
+        """Returns peers that have >= service_trust then the minimal."""
+        return self.__get_peers_with_geq(TrustMetric.SERVICE_TRUST, minimal_service_trust)
+
+    def get_top_peers_trust_data(self,
+                                 order_by: TrustMetric,
+                                 limit: int,
+                                 minimal_trust: Dict[TrustMetric, float],
+                                 exclude: Collection[PeerId] = ()) -> List[PeerTrustData]:
+        """Returns at most limit peers with the highest order_by metric, ordered from the highest one.
+
+        Only peers that have at least one of the metrics from minimal_trust >= its value are returned,
+        peers in exclude are skipped. Each peer is returned at most once.
+        """
+        if limit <= 0 or not minimal_trust:
+            return []
+        excluded = set(exclude)
+        order_by_minimum = minimal_trust.get(order_by, inf)
+        others = [(metric, minimum) for metric, minimum in minimal_trust.items() if metric != order_by]
+        # without other thresholds, peers below the order_by one can not be returned
+        lowest = '-inf' if others else order_by_minimum
+        page_size = limit + len(excluded)
+
+        top: List[Tuple[PeerId, float]] = []
+        offset = 0
+        while True:
+            # the index is walked from the highest value, so only the pages up to the top peers are read
+            page = self.__r.zrevrangebyscore(self.__index_key(order_by), '+inf', lowest,
+                                             start=offset, num=page_size, withscores=True)
+            offset += len(page)
+            candidates = [(self.__str(p), score) for p, score in page if self.__str(p) not in excluded]
+            qualified = self.__qualified(candidates, order_by_minimum, others)
+            top += [(peer_id, score) for peer_id, score in candidates if peer_id in qualified]
+            # peers with the same value as the last top one can still follow
+            if len(page) < page_size or (len(top) >= limit and page[-1][1] < top[limit - 1][1]):
+                break
+
+        # ties are ordered by peer id, redis orders them reversed in descending ranges
+        top_ids = [peer_id for peer_id, _ in sorted(top, key=lambda t: (-t[1], t[0]))[:limit]]
+        trust_matrix = self.get_peers_trust_data(top_ids)
+        return [trust_matrix[p] for p in top_ids if p in trust_matrix]
 
     def store_peer_trust_data(self, trust_data: PeerTrustData):
         """Stores trust data for given peer - overwrites any data if existed."""
-        raise NotImplemented()
+        self.store_peer_trust_matrix({trust_data.peer_id: trust_data})
 
     def store_peer_trust_matrix(self, trust_matrix: TrustMatrix):
-        """Stores trust matrix."""
-        for peer in trust_matrix.values():
-            self.store_peer_trust_data(peer)
+        """Stores trust matrix in a single transaction."""
+        if not trust_matrix:
+            return
+        keys = [self.__peer_key(peer_id) for peer_id in trust_matrix.keys()]
+
+        def store(pipe: Pipeline):
+            # organisations under which the peers are indexed now, the peers are watched, so when another
+            # writer changes them before the transaction is executed, redis-py retries the whole function
+            previous_peers = pipe.mget(keys)
+
+            pipe.multi()
+            pipe.mset({key: encode_peer_trust_data(peer) for key, peer in zip(keys, trust_matrix.values())})
+            # indexes are updated in the same transaction, so they are always consistent with the data
+            for metric in TrustMetric:
+                pipe.zadd(self.__index_key(metric), {peer.peer_id: metric.of(peer) for peer in trust_matrix.values()})
+            for peer, previous_peer in zip(trust_matrix.values(), previous_peers):
+                previous = set(decode_peer_info(previous_peer).organisations) if previous_peer else set()
+                for organisation in previous.difference(peer.organisations):
+                    pipe.srem(self.__organisation_key(organisation), peer.peer_id)
+                for organisation in set(peer.organisations).difference(previous):
+                    pipe.sadd(self.__organisation_key(organisation), peer.peer_id)
+
+        self.__r.transaction(store, *keys)
 
     def get_peer_trust_data(self, peer: Union[PeerId, PeerInfo]) -> Optional[PeerTrustData]:
         """Returns trust data for given peer ID, if no data are found, returns None."""
-        raise NotImplemented()
+        peer_id = peer.id if isinstance(peer, PeerInfo) else peer
+        return self.get_peers_trust_data([peer_id]).get(peer_id)
 
     def get_peers_trust_data(self, peer_ids: List[Union[PeerId, PeerInfo]]) -> TrustMatrix:
-        """Return trust data for each peer from peer_ids."""
-        return {peer_id: self.get_peer_trust_data(peer_id) for peer_id in peer_ids}
+        """Return trust data for each peer from peer_ids, loaded in a single round trip."""
+        peer_ids = list(dict.fromkeys(p.id if isinstance(p, PeerInfo) else p for p in peer_ids))
+        if not peer_ids:
+            return {}
+        configuration = self.get_model_configuration()
+        peers = [decode_peer_trust_data(data, configuration) for data in self.__get_encoded(peer_ids) if data]
+        return {peer.peer_id: peer for peer in peers}
 
     def cache_network_opinion(self, ti: SlipsThreatIntelligence):
         """Caches aggregated opinion on given target."""
-        raise NotImplemented()
-
-    def get_cached_network_opinion(self, target: Target) -> Optional[SlipsThreatIntelligence]:
-        """Returns cached network opinion. Checks cache time and returns None if data expired."""
-        raise NotImplemented()
+        configuration = self.get_model_configuration()
+        valid_seconds = configuration.network_opinion_cache_valid_seconds
+        if valid_seconds <= 0:
+            return
+        # redis expires the opinion after the stale window, so we don't need to check the cache time
+        # when reading it, remaining time to live tells whether the opinion is still valid
+        expire_seconds = valid_seconds + configuration.network_opinion_cache_stale_seconds
+        self.__r.set(self.__network_opinion_key(ti.target), json.dumps(asdict(ti)), px=int(expire_seconds * 1000))
+
+    def get_cached_network_opinion(self, target: Target, include_stale: bool = False) \
+            -> Optional[SlipsThreatIntelligence]:
+        """Returns cached network opinion. Checks cache time and returns None if data expired.
+
+        If include_stale is True, expired opinion in the stale window is returned as well, marked as stale.
+        """
+        key = self.__network_opinion_key(target)
+        data, remaining_milliseconds = self.__r.pipeline(transaction=False).get(key).pttl(key).execute()
+        if not data:
+            return None
+        stale = remaining_milliseconds <= self.get_model_configuration().network_opinion_cache_stale_seconds * 1000
+        if stale and not include_stale:
+            return None
+        ti = SlipsThreatIntelligence(**json.loads(data))
+        ti.stale = stale
+        return ti
+
+    def __qualified(self,
+                    candidates: List[Tuple[PeerId, float]],
+                    order_by_minimum: float,
+                    others: List[Tuple[TrustMetric, float]]) -> Set[PeerId]:
+        """Returns candidates that have order_by value or one of the other metrics >= its minimum.
+
+        Other metrics are read in a single round trip and only for the candidates below the order_by minimum.
+        """
+        qualified = {peer_id for peer_id, score in candidates if score >= order_by_minimum}
+        below = [peer_id for peer_id, score in candidates if score < order_by_minimum]
+        if not below or not others:
+            return qualified
+        pipe = self.__r.pipeline(transaction=False)
+        for metric, _ in others:
+            for peer_id in below:
+                pipe.zscore(self.__index_key(metric), peer_id)
+        values = iter(pipe.execute())
+        for metric, minimum in others:
+            for peer_id, value in zip(below, values):
+                if value is not None and value >= minimum:
+                    qualified.add(peer_id)
+        return qualified
+
+    def __get_peers_with_geq(self, metric: TrustMetric, minimal_value: float) -> List[PeerInfo]:
+        peer_ids = self.__r.zrevrangebyscore(self.__index_key(metric), '+inf', minimal_value)
+        return self.get_peers_info([self.__str(p) for p in peer_ids])
+
+    def __get_encoded(self, peer_ids: Iterable[PeerId]) -> List[Optional[bytes]]:
+        """Returns encoded data of all peers in a single round trip, None for the peers that do not exist."""
+        keys = [self.__peer_key(peer_id) for peer_id in peer_ids]
+        return self.__r.mget(keys) if keys else []
+
+    def __peer_key(self, peer_id: PeerId) -> str:
+        return f'{self.KEY_PREFIX}:peer:{peer_id}'
+
+    def __index_key(self, metric: TrustMetric) -> str:
+        return f'{self.KEY_PREFIX}:index:{metric.value}'
+
+    def __organisation_key(self, organisation: OrganisationId) -> str:
+        return f'{self.KEY_PREFIX}:organisation:{organisation}'
+
+    def __network_opinion_key(self, target: Target) -> str:
+        return f'{self.KEY_PREFIX}:network_opinion:{target}'
+
+    @staticmethod
+    def __str(value: bytes) -> str:
+        return value.decode()
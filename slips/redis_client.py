@@ -0,0 +1,10 @@
+from redis.client import Redis
+
+
+def binary_client(r: Redis) -> Redis:
+    """Returns client to the same Redis that does not decode the responses, for the binary data."""
+    pool = r.connection_pool
+    if not pool.connection_kwargs.get('decode_responses'):
+        return r
+    kwargs = {**pool.connection_kwargs, 'decode_responses': False}
+    return type(r)(connection_pool=type(pool)(connection_class=pool.connection_class, **kwargs))
@@ -0,0 +1,57 @@
+import json
+import timeit
+
+from dacite import from_dict
+
+from fides.messaging.decoders import decode_network_message, decode_peer_info, decode_threat_intelligence
+from fides.messaging.model import NetworkMessage, PeerIntelligenceResponse
+from fides.model.peer import PeerInfo
+from fides.model.threat_intelligence import ThreatIntelligence
+
+"""
+Compares throughput of the dacite and the compiled decoders on nl2tl_intelligence_response messages,
+measured from the received string to the list of PeerIntelligenceResponse, as done by the bridge and the handler.
+
+Run as: python -m tests.benchmarks.message_decoding
+"""
+
+
+def build_message(responses: int) -> str:
+    data = [{'sender': {'id': f'peer#{i}', 'organisations': ['organisation#1'], 'ip': f'10.0.{i // 256}.{i % 256}'},
+             'payload': {'target': 'target.com', 'intelligence': {'score': 0.5, 'confidence': 1}}}
+            for i in range(responses)]
+    return json.dumps({'type': 'nl2tl_intelligence_response', 'version': 1, 'data': data})
+
+
+def decode_dacite(message: str):
+    network_message = from_dict(data_class=NetworkMessage, data=json.loads(message))
+    return [PeerIntelligenceResponse(
+        sender=from_dict(data_class=PeerInfo, data=single['sender']),
+        intelligence=from_dict(data_class=ThreatIntelligence, data=single['payload']['intelligence']),
+        target=single['payload']['target']
+    ) for single in network_message.data]
+
+
+def decode_compiled(message: str):
+    network_message = decode_network_message(json.loads(message))
+    return [PeerIntelligenceResponse(
+        sender=decode_peer_info(single['sender']),
+        intelligence=decode_threat_intelligence(single['payload']['intelligence']),
+        target=single['payload']['target']
+    ) for single in network_message.data]
+
+
+def messages_per_second(decode, message: str, seconds: float = 1) -> float:
+    repeats, total = timeit.Timer(lambda: decode(message)).autorange()
+    repeats = max(1, int(repeats * seconds / total))
+    return repeats / timeit.timeit(lambda: decode(message), number=repeats)
+
+
+if __name__ == '__main__':
+    print('responses in message | dacite msg/s | compiled msg/s | speedup')
+    for size in [1, 10, 100, 1000]:
+        message = build_message(size)
+        assert decode_dacite(message) == decode_compiled(message)
+        dacite = messages_per_second(decode_dacite, message)
+        compiled = messages_per_second(decode_compiled, message)
+        print(f'{size:>20} | {dacite:12.0f} | {compiled:14.0f} | {compiled / dacite:6.1f}x')
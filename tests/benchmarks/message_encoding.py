@@ -0,0 +1,40 @@
+import json
+import timeit
+from dataclasses import asdict
+
+from fides.messaging.codec import JsonCodec, FastJsonCodec, MsgPackCodec
+from fides.messaging.model import NetworkMessage
+
+"""
+Compares encoding of tl2nl_peers_reliability messages by the original asdict + json.dumps
+with the message codecs, msgpack is measured only when it is installed.
+
+Run as: python -m tests.benchmarks.message_encoding
+"""
+
+
+def build_message(peers: int) -> NetworkMessage:
+    return NetworkMessage(type='tl2nl_peers_reliability', version=1,
+                          data=[{'peer_id': f'peer#{i}', 'reliability': i / peers} for i in range(peers)])
+
+
+def codecs():
+    yield 'asdict + json', lambda m: json.dumps(asdict(m))
+    yield 'json', JsonCodec().encode
+    yield 'fastJson', FastJsonCodec().encode
+    try:
+        yield 'msgpack', MsgPackCodec().encode
+    except ImportError:
+        pass
+
+
+if __name__ == '__main__':
+    repeats = 200
+    print(f'Repeats: {repeats}, times in microseconds')
+    for size in [10, 100, 1000]:
+        message = build_message(size)
+        results = []
+        for name, encode in codecs():
+            micros = timeit.timeit(lambda: encode(message), number=repeats) / repeats * 1_000_000
+            results.append(f'{name} {micros:8.1f} ({len(encode(message))} B)')
+        print(f'peers {size:>5}: ' + ' | '.join(results))
@@ -0,0 +1,65 @@
+import random
+import timeit
+from typing import Optional
+
+from fides.evaluation.recommendation.incremental import IncrementalRecommendationTrustEvaluator
+from fides.evaluation.recommendation.process import process_new_recommendations
+from fides.model.configuration import TrustModelConfiguration
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import TrustMatrix, trust_data_prototype
+from fides.model.recommendation import Recommendation
+from tests.load_config import find_config
+
+"""
+Compares full and incremental recommendation trust evaluation
+for recommendation rounds with given number of recommenders with full recommendation history.
+
+Run as: python -m tests.benchmarks.recommendation_incremental
+"""
+
+
+def build_recommenders(recommenders: int) -> TrustMatrix:
+    rnd = random.Random(recommenders)
+    matrix = {}
+    for i in range(recommenders):
+        peer = trust_data_prototype(PeerInfo(f'recommender#{i}', []))
+        peer.reputation = peer.recommendation_trust = rnd.random()
+        matrix[peer.peer_id] = peer
+    return matrix
+
+
+def run_rounds(config: TrustModelConfiguration,
+               matrix: TrustMatrix,
+               rounds: int,
+               evaluator: Optional[IncrementalRecommendationTrustEvaluator] = None) -> TrustMatrix:
+    rnd = random.Random(rounds)
+    subject = trust_data_prototype(PeerInfo('subject#1', []))
+    for _ in range(rounds):
+        recommendations = {peer_id: Recommendation(competence_belief=rnd.random(),
+                                                   integrity_belief=rnd.random(),
+                                                   service_history_size=rnd.randint(1, 100),
+                                                   recommendation=rnd.random(),
+                                                   initial_reputation_provided_by_count=rnd.randint(1, 100))
+                           for peer_id in matrix.keys()}
+        updated = process_new_recommendations(config, subject, matrix, recommendations, evaluator)
+        matrix = {peer_id: updated[peer_id] for peer_id in matrix.keys()}
+    return matrix
+
+
+if __name__ == '__main__':
+    configuration = find_config()
+    evaluator = IncrementalRecommendationTrustEvaluator()
+    history_size = configuration.recommendations.history_max_size
+    repeats = 20
+    print(f'History size: {history_size}, repeats: {repeats}')
+    for count in [10, 100]:
+        # fill the whole history, so every round evicts the oldest record
+        full_matrix = run_rounds(configuration, build_recommenders(count), history_size)
+        incremental_matrix = run_rounds(configuration, build_recommenders(count), history_size, evaluator)
+
+        # rounds continue from the previous ones, so the running sums match the histories
+        full_time = timeit.timeit(lambda: run_rounds(configuration, full_matrix, repeats), number=1) / repeats
+        incremental_time = timeit.timeit(lambda: run_rounds(configuration, incremental_matrix, repeats, evaluator),
+                                         number=1) / repeats
+        print(f'{count:>5} recommenders: full {full_time * 1000:8.2f} ms, '
+              f'incremental {incremental_time * 1000:8.2f} ms, speedup {full_time / incremental_time:5.1f}x')
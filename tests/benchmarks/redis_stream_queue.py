@@ -0,0 +1,41 @@
+import os
+import time
+
+from redis.client import Redis
+
+from slips.messaging.queue import RedisStreamQueue
+
+"""
+Measures throughput of RedisStreamQueue against running redis-server for different sizes of the read batch.
+Uses streams benchmark:out and benchmark:in that are deleted before each run.
+
+Run as: REDIS_URL=redis://localhost:6379/0 python -m tests.benchmarks.redis_stream_queue
+"""
+
+
+def measure(r: Redis, messages: int, read_count: int):
+    r.delete('benchmark:out', 'benchmark:in')
+    producer = RedisStreamQueue(r, 'benchmark:in', 'benchmark:out', max_length=messages * 2)
+    consumer = RedisStreamQueue(r, 'benchmark:out', 'benchmark:in', group='benchmark', read_count=read_count)
+
+    start = time.perf_counter()
+    for i in range(messages):
+        producer.send(f'{{"type": "nl2tl_intelligence_request", "version": 1, "data": {i}}}')
+    producer.send('stop_process')
+    sent = time.perf_counter()
+
+    received = []
+    consumer.listen(received.append, block=True)
+    done = time.perf_counter()
+    assert len(received) == messages
+    return messages / (sent - start), messages / (done - sent)
+
+
+if __name__ == '__main__':
+    redis = Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'), decode_responses=True)
+    count = 20_000
+    print(f'Messages: {count}, throughput in messages/s')
+    for size in [1, 10, 100, 1000]:
+        send, receive = measure(redis, count, size)
+        print(f'read count {size:>5}: send {send:10.0f} | receive {receive:10.0f}')
+    redis.delete('benchmark:out', 'benchmark:in')
@@ -0,0 +1,53 @@
+import random
+import timeit
+from typing import Dict, Tuple
+
+from fides.evaluation.service.interaction import Satisfaction, Weight
+from fides.evaluation.service.process import process_service_interaction, process_service_interactions
+from fides.model.aliases import PeerId
+from fides.model.configuration import TrustModelConfiguration
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import PeerTrustData, trust_data_prototype
+from tests.load_config import find_config
+
+"""
+Compares per-peer and vectorized batch service trust evaluation
+for a single intelligence response with given number of responders.
+
+Run as: python -m tests.benchmarks.service_batch
+"""
+
+
+def build_interactions(config: TrustModelConfiguration,
+                       responders: int) -> Dict[PeerId, Tuple[PeerTrustData, Satisfaction, Weight]]:
+    rnd = random.Random(responders)
+    data = {}
+    for i in range(responders):
+        peer = trust_data_prototype(PeerInfo(f'peer#{i}', []))
+        peer.reputation = rnd.random()
+        # fill the whole history
+        for _ in range(config.service_history_max_size):
+            peer = process_service_interaction(config, peer, rnd.random(), Weight.INTELLIGENCE_DATA_REPORT)
+        data[peer.peer_id] = (peer, rnd.random(), Weight.INTELLIGENCE_DATA_REPORT)
+    return data
+
+
+def per_peer(config: TrustModelConfiguration, data: Dict[PeerId, Tuple[PeerTrustData, Satisfaction, Weight]]):
+    return {peer_id: process_service_interaction(config, peer, satisfaction, weight)
+            for peer_id, (peer, satisfaction, weight) in data.items()}
+
+
+def batch(config: TrustModelConfiguration, data: Dict[PeerId, Tuple[PeerTrustData, Satisfaction, Weight]]):
+    return process_service_interactions(config, data)
+
+
+if __name__ == '__main__':
+    configuration = find_config()
+    repeats = 20
+    print(f'History size: {configuration.service_history_max_size}, repeats: {repeats}')
+    for count in [10, 100, 1000]:
+        interactions = build_interactions(configuration, count)
+        per_peer_time = timeit.timeit(lambda: per_peer(configuration, interactions), number=repeats) / repeats
+        batch_time = timeit.timeit(lambda: batch(configuration, interactions), number=repeats) / repeats
+        print(f'{count:>5} responders: per-peer {per_peer_time * 1000:8.2f} ms, '
+              f'batch {batch_time * 1000:8.2f} ms, speedup {per_peer_time / batch_time:5.1f}x')
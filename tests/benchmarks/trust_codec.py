@@ -0,0 +1,59 @@
+import json
+import random
+import timeit
+from dataclasses import asdict
+
+from dacite import from_dict
+
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import PeerTrustData, trust_data_prototype
+from fides.model.recommendation_history import RecommendationHistoryRecord
+from fides.model.service_history import ServiceHistoryRecord
+from fides.persistence.trust_codec import encode_peer_trust_data, decode_peer_trust_data, decode_peer_info
+from tests.load_config import find_config
+
+"""
+Compares size and encode/decode time of the binary trust data codec
+with the JSON and dacite serialization for peers with full histories.
+
+Run as: python -m tests.benchmarks.trust_codec
+"""
+
+
+def build_peer(service_history_size: int, recommendation_history_size: int) -> PeerTrustData:
+    rnd = random.Random(service_history_size)
+    peer = trust_data_prototype(PeerInfo('peer#1', ['organisation#1', 'organisation#2'], ip='192.168.0.1'))
+    peer.service_trust, peer.reputation, peer.recommendation_trust = rnd.random(), rnd.random(), rnd.random()
+    peer.competence_belief, peer.integrity_belief = rnd.random(), rnd.random()
+    peer.service_history = [ServiceHistoryRecord(rnd.random(), rnd.random(), 1_650_000_000 + i * rnd.random())
+                            for i in range(service_history_size)]
+    peer.recommendation_history = [RecommendationHistoryRecord(rnd.random(), rnd.random(), 1_650_000_000 + i)
+                                   for i in range(recommendation_history_size)]
+    return peer
+
+
+def measure(function, repeats: int) -> float:
+    return timeit.timeit(function, number=repeats) / repeats * 1_000_000
+
+
+if __name__ == '__main__':
+    configuration = find_config()
+    repeats = 2000
+    print(f'Repeats: {repeats}, times in microseconds')
+    for service_size, recommendation_size in [(0, 0), (10, 10), (configuration.service_history_max_size,
+                                                                 configuration.recommendations.history_max_size)]:
+        peer = build_peer(service_size, recommendation_size)
+        json_data = json.dumps(asdict(peer))
+        binary_data = encode_peer_trust_data(peer)
+        assert decode_peer_trust_data(binary_data, configuration) == peer
+
+        json_encode = measure(lambda: json.dumps(asdict(peer)), repeats)
+        json_decode = measure(lambda: from_dict(PeerTrustData, json.loads(json_data)), repeats)
+        binary_encode = measure(lambda: encode_peer_trust_data(peer), repeats)
+        binary_decode = measure(lambda: decode_peer_trust_data(binary_data, configuration), repeats)
+        binary_info = measure(lambda: decode_peer_info(binary_data), repeats)
+
+        print(f'histories {service_size:>3}/{recommendation_size:>3}: '
+              f'json {len(json_data):>6} B, encode {json_encode:8.1f}, decode {json_decode:8.1f} | '
+              f'binary {len(binary_data):>6} B, encode {binary_encode:6.1f}, decode {binary_decode:6.1f}, '
+              f'info only {binary_info:5.1f}')
@@ -0,0 +1,53 @@
+import os
+import random
+import tempfile
+import timeit
+
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import TrustMetric, trust_data_prototype
+from fides.persistence.trust_columns import MemoryMappedTrustColumns
+
+"""
+Measures startup and threshold queries of the memory-mapped trust columns
+and compares the query with a scan over the trust matrix with the same peers.
+
+Run as: python -m tests.benchmarks.trust_columns
+"""
+
+if __name__ == '__main__':
+    peers_count = 100_000
+    rnd = random.Random(42)
+    matrix = {}
+    for i in range(peers_count):
+        peer = trust_data_prototype(PeerInfo(f'12D3KooWPeer{i:040d}', []))
+        peer.service_trust, peer.recommendation_trust = rnd.random(), rnd.random()
+        matrix[peer.peer_id] = peer
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'columns')
+        columns = MemoryMappedTrustColumns(path, initial_capacity=peers_count)
+        store_time = timeit.timeit(lambda: columns.store(matrix.values()), number=1)
+        columns.flush()
+        print(f'{peers_count} peers, file {os.path.getsize(path) / peers_count:.0f} B per peer, '
+              f'first store {store_time * 1000:.0f} ms')
+
+        open_time = timeit.timeit(lambda: MemoryMappedTrustColumns(path, read_only=True), number=5) / 5
+        print(f'open with index build {open_time * 1000:8.2f} ms')
+
+        repeats = 20
+        for minimal in [0.5, 0.99]:
+            scan = timeit.timeit(lambda: [p.peer_id for p in matrix.values() if p.service_trust >= minimal],
+                                 number=repeats) / repeats
+            vectorized = timeit.timeit(lambda: columns.get_peers_with_geq(TrustMetric.SERVICE_TRUST, minimal),
+                                       number=repeats) / repeats
+            print(f'service trust >= {minimal}: matrix scan {scan * 1000:8.2f} ms, '
+                  f'columns {vectorized * 1000:8.2f} ms')
+
+        minimal_trust = {TrustMetric.SERVICE_TRUST: 0.5, TrustMetric.RECOMMENDATION_TRUST: 0.5}
+        scan = timeit.timeit(lambda: sorted((p for p in matrix.values() if p.service_trust >= 0.5
+                                             or p.recommendation_trust >= 0.5),
+                                            key=lambda p: (-p.service_trust, p.peer_id))[:100],
+                             number=repeats) / repeats
+        vectorized = timeit.timeit(lambda: columns.get_top_peers(TrustMetric.SERVICE_TRUST, 100, minimal_trust),
+                                   number=repeats) / repeats
+        print(f'top 100 peers: matrix scan {scan * 1000:8.2f} ms, columns {vectorized * 1000:8.2f} ms')
@@ -0,0 +1,53 @@
+import dataclasses
+import random
+
+from fides.evaluation.fading import compute_time_fading_factor
+from fides.evaluation.service.batch import compute_beliefs_batch
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
+from fides.evaluation.service.peer_update import update_service_data_for_peer
+from fides.model.configuration import FadingConfiguration
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype
+from fides.model.service_history import ServiceHistoryRecord, ServiceHistoryBuffer
+from tests.load_config import find_config
+
+
+def test_exponential_fading_halves_importance_after_half_life():
+    fading = FadingConfiguration(strategy='exponential', half_life_seconds=10)
+    history = [ServiceHistoryRecord(satisfaction=1, weight=1, timestamp=t) for t in [0, 10, 20]]
+
+    factors = compute_time_fading_factor(fading, history)
+
+    assert [round(f, 12) for f in factors] == [0.25, 0.5, 1]
+
+
+def test_no_fading_does_not_forget_anything():
+    history = [ServiceHistoryRecord(satisfaction=1, weight=1, timestamp=t) for t in [0, 1000, 10000]]
+
+    assert compute_time_fading_factor(FadingConfiguration(), history) == [1, 1, 1]
+
+
+def test_all_evaluations_match_with_exponential_fading():
+    config = dataclasses.replace(find_config(),
+                                 service_history_max_size=20,
+                                 service_fading=FadingConfiguration(strategy='exponential', half_life_seconds=30))
+    evaluator = IncrementalServiceTrustEvaluator()
+    peer = trust_data_prototype(PeerInfo('peer#1', []))
+    history = ServiceHistoryBuffer(capacity=config.service_history_max_size)
+
+    rnd = random.Random(1)
+    timestamp = 1_650_000_000
+    for _ in range(100):
+        timestamp += rnd.randint(0, 20)
+        record = ServiceHistoryRecord(satisfaction=rnd.random(), weight=rnd.random(), timestamp=timestamp)
+        evicted = history.append(record)
+
+        incremental = evaluator.update_service_data_for_peer(config, peer, history, [record],
+                                                             [evicted] if evicted else [])
+        full = update_service_data_for_peer(config, peer, history)
+        batch_cb, batch_ib = compute_beliefs_batch(config, [history])
+
+        assert abs(full.competence_belief - incremental.competence_belief) < IncrementalServiceTrustEvaluator.TOLERANCE
+        assert abs(full.integrity_belief - incremental.integrity_belief) < IncrementalServiceTrustEvaluator.TOLERANCE
+        assert abs(full.competence_belief - batch_cb[0]) < 1e-12
+        assert abs(full.integrity_belief - batch_ib[0]) < 1e-12
@@ -0,0 +1,72 @@
+import dataclasses
+import random
+
+from fides.evaluation.recommendation.incremental import IncrementalRecommendationTrustEvaluator
+from fides.evaluation.recommendation.peer_update import update_recommendation_data_for_peer
+from fides.evaluation.recommendation.process import process_new_recommendations
+from fides.model.configuration import FadingConfiguration
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype
+from fides.model.recommendation import Recommendation
+from fides.messaging.model import PeerRecommendationResponse
+from tests.load_config import find_config
+from tests.load_fides import get_fides_stream
+from tests.messaging.messages import serialize, nl2tl_recommendation_response
+
+
+def random_recommendation(rnd: random.Random) -> Recommendation:
+    return Recommendation(competence_belief=rnd.random(),
+                          integrity_belief=rnd.random(),
+                          service_history_size=rnd.randint(1, 100),
+                          recommendation=rnd.random(),
+                          initial_reputation_provided_by_count=rnd.randint(1, 100))
+
+
+def test_incremental_evaluation_matches_full_recomputation():
+    config = find_config()
+    config = dataclasses.replace(
+        config,
+        recommendations=dataclasses.replace(config.recommendations,
+                                            fading=FadingConfiguration('exponential', half_life_seconds=60))
+    )
+    evaluator = IncrementalRecommendationTrustEvaluator()
+
+    rnd = random.Random(42)
+    matrix = {}
+    for i in range(5):
+        peer = trust_data_prototype(PeerInfo(f'recommender#{i}', []))
+        peer.reputation = peer.recommendation_trust = rnd.random()
+        matrix[peer.peer_id] = peer
+    subject = trust_data_prototype(PeerInfo('subject#1', []))
+
+    # more rounds than history size, so the records are evicted as well
+    for _ in range(3 * config.recommendations.history_max_size):
+        recommendations = {peer_id: random_recommendation(rnd) for peer_id in matrix.keys()}
+        updated = process_new_recommendations(config, subject, matrix, recommendations, evaluator)
+        matrix = {peer_id: updated[peer_id] for peer_id in matrix.keys()}
+
+        for peer in matrix.values():
+            full = update_recommendation_data_for_peer(config, peer, list(peer.recommendation_history))
+            assert len(peer.recommendation_history) <= config.recommendations.history_max_size
+            assert abs(full.recommendation_trust - peer.recommendation_trust) \
+                   < IncrementalRecommendationTrustEvaluator.TOLERANCE
+
+
+class CountingEvaluator(IncrementalRecommendationTrustEvaluator):
+    updates = 0
+
+    def update_recommendation_data_for_peer(self, *args, **kwargs):
+        self.updates += 1
+        return super().update_recommendation_data_for_peer(*args, **kwargs)
+
+
+def test_protocol_uses_given_evaluator():
+    evaluator = CountingEvaluator()
+    f, _, _ = get_fides_stream(recommendation_trust_evaluator=evaluator)
+    sender, subject = PeerInfo('sender#1', []), PeerInfo('subject#1', [])
+    for peer in (sender, subject):
+        f.trust.determine_and_store_initial_trust(peer, get_recommendations=False)
+
+    response = PeerRecommendationResponse(sender, subject.id, random_recommendation(random.Random(42)))
+    f.queue.send_message(serialize(nl2tl_recommendation_response([response])))
+    assert evaluator.updates == 1
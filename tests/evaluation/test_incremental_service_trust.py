@@ -0,0 +1,48 @@
+import random
+
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
+from fides.evaluation.service.interaction import Weight
+from fides.evaluation.service.process import process_service_interaction
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype
+from tests.load_config import find_config
+from tests.load_fides import get_fides_stream
+from tests.messaging.messages import serialize, nl2tl_intelligence_request
+
+
+def test_incremental_evaluation_matches_full_recomputation():
+    config = find_config()
+    evaluator = IncrementalServiceTrustEvaluator()
+
+    rnd = random.Random(42)
+    full = trust_data_prototype(PeerInfo('peer#1', []))
+    full.reputation = 0.5
+    incremental = full
+    # more interactions than history size, so the records are evicted as well
+    for _ in range(3 * config.service_history_max_size):
+        satisfaction, weight = rnd.random(), rnd.choice(list(Weight))
+        full = process_service_interaction(config, full, satisfaction, weight)
+        incremental = process_service_interaction(config, incremental, satisfaction, weight, evaluator)
+
+        assert abs(full.service_trust - incremental.service_trust) < IncrementalServiceTrustEvaluator.TOLERANCE
+        assert abs(full.competence_belief - incremental.competence_belief) < IncrementalServiceTrustEvaluator.TOLERANCE
+        assert abs(full.integrity_belief - incremental.integrity_belief) < IncrementalServiceTrustEvaluator.TOLERANCE
+
+
+class CountingEvaluator(IncrementalServiceTrustEvaluator):
+    updates = 0
+
+    def update_service_data_for_peer(self, *args, **kwargs):
+        self.updates += 1
+        return super().update_service_data_for_peer(*args, **kwargs)
+
+
+def test_protocols_use_given_evaluator():
+    evaluator = CountingEvaluator()
+    f, _, _ = get_fides_stream(service_trust_evaluator=evaluator)
+
+    f.queue.send_message(
+        serialize(nl2tl_intelligence_request('123', 'example.com', PeerInfo(id='peer#1', organisations=[])))
+    )
+    # first encounter and the request
+    assert evaluator.updates == 2
@@ -0,0 +1,78 @@
+import copy
+import random
+
+from fides.evaluation.recommendation.peer_update import update_recommendation_data_for_peer
+from fides.evaluation.recommendation.process import process_new_recommendations, \
+    process_new_recommendations_for_subjects
+from fides.model.history_buffer import HistoryBuffer
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype
+from fides.model.recommendation import Recommendation
+from fides.model.recommendation_history import RecommendationHistoryBuffer
+from tests.load_config import find_config
+
+
+def test_multiple_subjects_match_single_subject_evaluation():
+    config = find_config()
+    rnd = random.Random(42)
+
+    matrix = {}
+    for i in range(10):
+        peer = trust_data_prototype(PeerInfo(f'recommender#{i}', []))
+        peer.reputation = peer.recommendation_trust = rnd.random()
+        matrix[peer.peer_id] = peer
+    subjects = {f'subject#{i}': trust_data_prototype(PeerInfo(f'subject#{i}', [])) for i in range(5)}
+    # every subject is recommended by a different subset of recommenders
+    recommendations = {
+        subject: {peer_id: Recommendation(competence_belief=rnd.random(),
+                                          integrity_belief=rnd.random(),
+                                          service_history_size=rnd.randint(0, 100),
+                                          recommendation=rnd.random(),
+                                          initial_reputation_provided_by_count=rnd.randint(0, 100))
+                  for peer_id in rnd.sample(list(matrix.keys()), rnd.randint(1, len(matrix)))}
+        for subject in subjects.keys()
+    }
+
+    batch = process_new_recommendations_for_subjects(config, subjects, copy.deepcopy(matrix), recommendations)
+
+    for subject, subject_recommendations in recommendations.items():
+        # estimates are computed from the same snapshot of recommenders' trust
+        single = process_new_recommendations(config, subjects[subject], copy.deepcopy(matrix), subject_recommendations)
+        assert abs(single[subject].reputation - batch[subject].reputation) < 1e-12
+        assert abs(single[subject].service_trust - batch[subject].service_trust) < 1e-12
+        assert batch[subject].initial_reputation_provided_by_count == len(subject_recommendations)
+
+    for peer_id in matrix.keys():
+        # one record per subject the peer recommended
+        expected_size = len([r for r in recommendations.values() if peer_id in r])
+        if expected_size == 0:
+            assert peer_id not in batch
+            continue
+        peer = batch[peer_id]
+        assert len(peer.recommendation_history) == expected_size
+        full = update_recommendation_data_for_peer(config, peer, list(peer.recommendation_history))
+        assert abs(full.recommendation_trust - peer.recommendation_trust) < 1e-12
+
+
+def test_history_of_recommender_is_copied_once(monkeypatch):
+    config = find_config()
+    recommender = trust_data_prototype(PeerInfo('recommender#1', []))
+    recommender.recommendation_history = RecommendationHistoryBuffer(config.recommendations.history_max_size)
+    subjects = {f'subject#{i}': trust_data_prototype(PeerInfo(f'subject#{i}', [])) for i in range(5)}
+    recommendation = Recommendation(competence_belief=0.5, integrity_belief=0.5, service_history_size=10,
+                                    recommendation=0.5, initial_reputation_provided_by_count=1)
+
+    copies = []
+    original_copy = HistoryBuffer.copy
+
+    def counting_copy(self):
+        copies.append(self)
+        return original_copy(self)
+
+    monkeypatch.setattr(HistoryBuffer, 'copy', counting_copy)
+    batch = process_new_recommendations_for_subjects(config, subjects, {recommender.peer_id: recommender},
+                                                     {subject: {recommender.peer_id: recommendation}
+                                                      for subject in subjects.keys()})
+    assert len(copies) == 1
+    assert len(batch[recommender.peer_id].recommendation_history) == len(subjects)
+    assert len(recommender.recommendation_history) == 0
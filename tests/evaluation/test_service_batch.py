@@ -0,0 +1,49 @@
+import random
+
+from fides.evaluation.service.interaction import Weight
+from fides.evaluation.service.process import process_service_interaction, process_service_interactions
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype
+from tests.load_config import find_config
+
+
+def build_interactions(config, seed: int):
+    rnd = random.Random(seed)
+    data = {}
+    for i in range(20):
+        peer = trust_data_prototype(PeerInfo(f'peer#{i}', []), has_fixed_trust=i == 0)
+        peer.reputation = rnd.random()
+        # histories with different sizes, including the ones that are full
+        for _ in range(rnd.randint(0, 2 * config.service_history_max_size)):
+            peer = process_service_interaction(config, peer, rnd.random(), rnd.choice(list(Weight)))
+        data[peer.peer_id] = (peer, rnd.random(), rnd.choice(list(Weight)))
+    return data
+
+
+def test_batch_evaluation_matches_per_peer_evaluation():
+    config = find_config()
+
+    interactions = build_interactions(config, 42)
+
+    per_peer = {peer_id: process_service_interaction(config, peer, satisfaction, weight)
+                for peer_id, (peer, satisfaction, weight) in interactions.items()}
+    batch = process_service_interactions(config, interactions)
+
+    assert per_peer.keys() == batch.keys()
+    for peer_id, expected in per_peer.items():
+        actual = batch[peer_id]
+        assert len(expected.service_history) == len(actual.service_history)
+        assert abs(expected.service_trust - actual.service_trust) < 1e-12
+        assert abs(expected.competence_belief - actual.competence_belief) < 1e-12
+        assert abs(expected.integrity_belief - actual.integrity_belief) < 1e-12
+
+
+def test_evaluation_does_not_modify_given_peer():
+    config = find_config()
+    peer, satisfaction, weight = build_interactions(config, 42)['peer#1']
+    history = list(peer.service_history)
+
+    updated = process_service_interaction(config, peer, satisfaction, weight)
+    process_service_interactions(config, {peer.peer_id: (peer, satisfaction, weight)})
+    assert list(peer.service_history) == history
+    assert len(updated.service_history) == min(len(history) + 1, config.service_history_max_size)
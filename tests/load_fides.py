@@ -4,6 +4,8 @@ from typing import Union, List, Dict
 
 from dacite import from_dict
 
+from fides.evaluation.recommendation.incremental import IncrementalRecommendationTrustEvaluator
+from fides.evaluation.service.incremental import IncrementalServiceTrustEvaluator
 from fides.evaluation.ti_aggregation import TIAggregation
 from fides.messaging.message_handler import MessageHandler
 from fides.messaging.model import NetworkMessage
@@ -11,7 +13,7 @@ from fides.messaging.network_bridge import NetworkBridge
 from fides.model.aliases import Target
 from fides.model.configuration import TrustModelConfiguration
 from fides.model.threat_intelligence import SlipsThreatIntelligence
-from fides.persistence.threat_intelligence_in_memory import InMemoryThreatIntelligenceDatabase
+from fides.persistence.threat_intelligence_prefix import PrefixThreatIntelligenceDatabase
 from fides.persistence.trust_in_memory import InMemoryTrustDatabase
 from fides.protocols.alert import AlertProtocol
 from fides.protocols.initial_trusl import InitialTrustProtocol
@@ -30,7 +32,7 @@ logger = Logger(__name__)
 class Fides:
     config: TrustModelConfiguration
     trust_db: InMemoryTrustDatabase
-    ti_db: InMemoryThreatIntelligenceDatabase
+    ti_db: PrefixThreatIntelligenceDatabase
     queue: TestQueue
     bridge: NetworkBridge
     recommendations: RecommendationProtocol
@@ -52,19 +54,27 @@ def get_fides(**kwargs) -> Fides:
     config = kwargs.get('config', find_config())
 
     trust_db = kwargs.get('trust_db', InMemoryTrustDatabase(config))
-    ti_db = kwargs.get('ti_db', InMemoryThreatIntelligenceDatabase())
+    ti_db = kwargs.get('ti_db', PrefixThreatIntelligenceDatabase())
 
     queue = kwargs.get('queue', TestQueue())
 
-    bridge = kwargs.get('bridge', NetworkBridge(queue))
+    bridge = kwargs.get('bridge', NetworkBridge(queue, kwargs.get('codec'),
+                                                config.peers_reliability_window_seconds,
+                                                config.peers_reliability_epsilon))
 
     def default_network_opinion_callback(ti: SlipsThreatIntelligence):
         logger.info(f'Callback: Target: {ti.target}, Score: {ti.score}, Confidence: {ti.confidence}')
 
     network_opinion_callback = kwargs.get('network_opinion_callback', default_network_opinion_callback)
 
-    recommendations = kwargs.get('recommendations', RecommendationProtocol(config, trust_db, bridge))
-    trust = kwargs.get('trust', InitialTrustProtocol(trust_db, config, recommendations))
+    service_evaluator = kwargs.get('service_trust_evaluator', IncrementalServiceTrustEvaluator()
+                                   if config.incremental_service_trust else None)
+    recommendation_evaluator = kwargs.get('recommendation_trust_evaluator', IncrementalRecommendationTrustEvaluator()
+                                          if config.incremental_recommendation_trust else None)
+
+    recommendations = kwargs.get('recommendations', RecommendationProtocol(config, trust_db, bridge, service_evaluator,
+                                                                           recommendation_evaluator))
+    trust = kwargs.get('trust', InitialTrustProtocol(trust_db, config, recommendations, service_evaluator))
     peer_list = kwargs.get('peer_list', PeerListUpdateProtocol(trust_db, bridge, recommendations, trust))
     ti_aggregation = kwargs.get('ti_aggregation', config.ti_aggregation_strategy)
     opinion = kwargs.get('opinion', OpinionAggregator(config, ti_db, ti_aggregation))
@@ -72,8 +82,10 @@ def get_fides(**kwargs) -> Fides:
     intelligence = kwargs.get('intelligence',
                               ThreatIntelligenceProtocol(trust_db, ti_db, bridge, config, opinion, trust,
                                                          ti_evaluation_strategy,
-                                                         network_opinion_callback))
-    alert = kwargs.get('alert', AlertProtocol(trust_db, bridge, trust, config, opinion, network_opinion_callback))
+                                                         network_opinion_callback,
+                                                         service_evaluator))
+    alert = kwargs.get('alert', AlertProtocol(trust_db, bridge, trust, config, opinion, network_opinion_callback,
+                                              service_evaluator))
 
     def default_on_unknown_message(message: NetworkMessage):
         logger.error('Unknown message received!', message)
@@ -96,7 +108,8 @@ def get_fides(**kwargs) -> Fides:
         on_intelligence_request=intelligence.handle_intelligence_request,
         on_intelligence_response=intelligence.handle_intelligence_response,
         on_unknown=on_unknown_message,
-        on_error=on_error
+        on_error=on_error,
+        on_batch_recommendation_request=recommendations.handle_batch_recommendation_request
     ))
     return Fides(
         config,
@@ -45,6 +45,22 @@ def nl2tl_recommendation_request(
     )
 
 
+def nl2tl_batch_recommendation_request(
+        request_id: str,
+        subjects: List[PeerId],
+        peer: PeerInfo
+) -> NetworkMessage:
+    return NetworkMessage(
+        version=1,
+        type='nl2tl_batch_recommendation_request',
+        data={
+            'request_id': request_id,
+            'sender': peer,
+            'payload': subjects
+        }
+    )
+
+
 def nl2tl_recommendation_response(
         responses: List[PeerRecommendationResponse]
 ) -> NetworkMessage:
@@ -0,0 +1,74 @@
+import dataclasses
+import json
+from dataclasses import asdict
+
+import pytest
+
+from fides.messaging.codec import JsonCodec, FastJsonCodec, MessageCodec, create_codec
+from fides.messaging.model import NetworkMessage
+from fides.model.peer import PeerInfo
+from fides.model.recommendation import Recommendation
+from tests.load_fides import get_fides
+from tests.messaging.messages import nl2tl_peers_list, serialize
+
+
+class BinaryJsonCodec(JsonCodec):
+    """Stands in for a binary codec, so the negotiation can be tested without msgpack."""
+
+    name = 'binaryJson'
+    version = 2
+
+    def encode(self, message: NetworkMessage):
+        return b'\x00' + super().encode(message).encode('utf-8')
+
+    def decode(self, data):
+        return super().decode(data[1:])
+
+
+def message() -> NetworkMessage:
+    recommendation = Recommendation(competence_belief=0.5, integrity_belief=0.25, service_history_size=3,
+                                    recommendation=1, initial_reputation_provided_by_count=2)
+    return NetworkMessage(type='tl2nl_recommendation_response', version=1,
+                          data={'request_id': '1', 'payload': {'subject': 'peer#1', 'recommendation': recommendation}})
+
+
+@pytest.mark.parametrize('codec', [JsonCodec(), FastJsonCodec()])
+def test_json_codecs_are_compatible_with_asdict(codec: MessageCodec):
+    encoded = codec.encode(message())
+    assert isinstance(encoded, str)
+    assert json.loads(encoded) == asdict(message())
+    assert codec.decode(serialize(message())) == asdict(message())
+
+
+def test_msgpack_codec_round_trip():
+    pytest.importorskip('msgpack')
+    codec = create_codec('msgpack')
+    encoded = codec.encode(dataclasses.replace(message(), version=codec.version))
+    assert isinstance(encoded, bytes)
+    assert codec.decode(encoded) == asdict(dataclasses.replace(message(), version=codec.version))
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        create_codec('xml')
+
+
+def test_bridge_switches_to_preferred_codec_when_network_uses_it():
+    f = get_fides(codec=BinaryJsonCodec())
+    queue, sent = f.queue, []
+    queue.on_send_called = sent.append
+    f.listen()
+
+    f.bridge.send_intelligence_request('target.com')
+    assert json.loads(sent[-1])['version'] == 1
+
+    peers = [PeerInfo(id='peer#1', organisations=[])]
+    # JSON messages are still accepted
+    queue.send_message(serialize(nl2tl_peers_list(peers)))
+    f.bridge.send_intelligence_request('target.com')
+    assert isinstance(sent[-1], str)
+
+    queue.send_message(BinaryJsonCodec().encode(dataclasses.replace(nl2tl_peers_list(peers), version=2)))
+    f.bridge.send_intelligence_request('target.com')
+    assert sent[-1][:1] == b'\x00'
+    assert BinaryJsonCodec().decode(sent[-1])['version'] == 2
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from dacite import from_dict
+from dacite.exceptions import MissingValueError, WrongTypeError
+
+from fides.messaging.decoders import decode_peer_info, decode_alert, decode_network_message, decode_recommendation
+from fides.model.alert import Alert
+from fides.model.peer import PeerInfo
+from fides.model.recommendation import Recommendation
+from tests.load_fides import get_fides_stream
+
+
+@pytest.mark.parametrize('data', [
+    {'id': 'peer#1', 'organisations': ['org#1'], 'ip': '1.2.3.4'},
+    {'id': 'peer#1', 'organisations': []},
+    {'id': 'peer#1', 'organisations': [], 'ip': None, 'unknown': 'ignored'},
+])
+def test_peer_info_matches_dacite(data):
+    assert decode_peer_info(data) == from_dict(data_class=PeerInfo, data=data)
+
+
+def test_nested_types_match_dacite():
+    recommendation = {'competence_belief': 1, 'integrity_belief': 0.5, 'service_history_size': 3,
+                      'recommendation': 0.25, 'initial_reputation_provided_by_count': 0}
+    alert = {'target': 'target.com', 'score': -1, 'confidence': 0.5}
+
+    assert decode_recommendation(recommendation) == from_dict(data_class=Recommendation, data=recommendation)
+    assert decode_alert(alert) == from_dict(data_class=Alert, data=alert)
+    message = decode_network_message({'type': 'nl2tl_alert', 'version': 1, 'data': {'any': ['data']}})
+    assert message.data == {'any': ['data']}
+
+
+@pytest.mark.parametrize('data, error, path', [
+    ({'organisations': []}, MissingValueError, 'id'),
+    ({'id': 1, 'organisations': []}, WrongTypeError, 'id'),
+    ({'id': 'peer#1', 'organisations': 'org#1'}, WrongTypeError, 'organisations'),
+    ({'id': 'peer#1', 'organisations': [1]}, WrongTypeError, 'organisations'),
+    ({'id': 'peer#1', 'organisations': [], 'ip': 1}, WrongTypeError, 'ip'),
+])
+def test_invalid_peer_info(data, error, path):
+    with pytest.raises(error) as e:
+        decode_peer_info(data)
+    assert e.value.field_path == path
+
+
+def test_bool_is_not_float():
+    with pytest.raises(WrongTypeError):
+        decode_alert({'target': 'target.com', 'score': True, 'confidence': 0.5})
+
+
+def test_invalid_message_is_routed_to_on_error():
+    errors = []
+    f, _, _ = get_fides_stream(on_error=lambda message, ex: errors.append(ex))
+    f.queue.send_message(json.dumps({'type': 'nl2tl_intelligence_request', 'version': 1,
+                                     'data': {'request_id': '1', 'sender': {'id': 'peer#1'}, 'payload': 'target'}}))
+    f.queue.send_message(json.dumps({'type': 'nl2tl_alert', 'version': '1', 'data': {}}))
+
+    assert [type(e) for e in errors] == [MissingValueError, WrongTypeError]
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+from redis.exceptions import ConnectionError
+
+fakeredis = pytest.importorskip('fakeredis')
+
+import slips.messaging.queue as redis_queue
+from slips.messaging.queue import RedisSimplexQueue
+from tests.persistence.test_trust_redis import RoundTripCountingRedis
+
+
+class Clock:
+
+    def __init__(self):
+        self.time = 1000.0
+
+    def __call__(self):
+        return self.time
+
+
+def received(subscriber) -> list:
+    messages = []
+    while (message := subscriber.get_message(timeout=0)) is not None:
+        if message['type'] == 'message':
+            messages.append(message['data'])
+    return messages
+
+
+@pytest.fixture
+def redis():
+    r = RoundTripCountingRedis(decode_responses=True)
+    subscriber = r.pubsub()
+    subscriber.subscribe('out')
+    received(subscriber)
+    return r, subscriber
+
+
+def test_messages_are_published_in_batches(redis):
+    r, subscriber = redis
+    queue = RedisSimplexQueue(r, 'out', 'in', batch_size=3, batch_interval_seconds=3600)
+    r.round_trips = 0
+
+    for i in range(7):
+        queue.send(f'message#{i}')
+    assert r.round_trips == 2
+    assert received(subscriber) == [f'message#{i}' for i in range(6)]
+
+    queue.flush()
+    assert received(subscriber) == ['message#6']
+    statistics = queue.statistics
+    assert statistics.batch_sizes == {3: 2, 1: 1}
+    assert (statistics.batches, statistics.messages) == (3, 7)
+
+
+def test_batch_is_published_when_interval_passes(redis, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(redis_queue, 'now', clock)
+    r, subscriber = redis
+    queue = RedisSimplexQueue(r, 'out', 'in', batch_size=100, batch_interval_seconds=0.5)
+
+    queue.send('message#1')
+    queue.flush_if_due()
+    assert received(subscriber) == []
+
+    clock.time += 0.5
+    queue.flush_if_due()
+    assert received(subscriber) == ['message#1']
+
+
+def test_messages_are_published_immediately_by_default(redis):
+    r, subscriber = redis
+    queue = RedisSimplexQueue(r, 'out', 'in')
+    queue.send('message#1')
+    assert received(subscriber) == ['message#1']
+
+
+def test_batch_stays_buffered_when_publishing_fails(redis, monkeypatch):
+    r, subscriber = redis
+    queue = RedisSimplexQueue(r, 'out', 'in', batch_size=2, batch_interval_seconds=3600)
+
+    def fail(*args, **kwargs):
+        raise ConnectionError()
+
+    with monkeypatch.context() as m:
+        m.setattr(r, 'pipeline', fail)
+        queue.send('message#1')
+        queue.send('message#2')
+    assert received(subscriber) == []
+    assert queue.statistics.failed_flushes == 1
+
+    queue.send('message#3')
+    assert received(subscriber) == ['message#1', 'message#2', 'message#3']
+    assert queue.statistics.batch_sizes == {3: 1}
+
+
+def test_oldest_messages_are_dropped_when_buffer_is_full(redis, monkeypatch):
+    r, subscriber = redis
+    queue = RedisSimplexQueue(r, 'out', 'in', batch_size=2, batch_interval_seconds=3600, max_buffered=4)
+
+    def fail(*args, **kwargs):
+        raise ConnectionError()
+
+    with monkeypatch.context() as m:
+        m.setattr(r, 'pipeline', fail)
+        for i in range(10):
+            queue.send(f'message#{i}')
+
+    queue.flush()
+    assert received(subscriber) == [f'message#{i}' for i in range(6, 10)]
+    assert queue.statistics.dropped_messages == 6
+
+
+def test_batch_is_published_by_timer(redis):
+    r, subscriber = redis
+    queue = RedisSimplexQueue(r, 'out', 'in', batch_size=100, batch_interval_seconds=0.01)
+
+    queue.send('message#1')
+    deadline = time.time() + 1
+    messages = []
+    while not messages and time.time() < deadline:
+        time.sleep(0.01)
+        messages = received(subscriber)
+    assert messages == ['message#1']
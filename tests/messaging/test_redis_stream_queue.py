@@ -0,0 +1,154 @@
+import pytest
+from redis.client import Pipeline
+from redis.exceptions import ConnectionError
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from slips.messaging.queue import RedisStreamQueue
+from tests.persistence.test_trust_redis import RoundTripCountingRedis
+
+
+@pytest.fixture
+def r():
+    return RoundTripCountingRedis(decode_responses=True)
+
+
+def send_to(r, stream: str, messages: list):
+    for message in messages:
+        r.xadd(stream, {RedisStreamQueue.FIELD: message})
+
+
+def test_messages_are_read_and_acknowledged_in_batches(r):
+    queue = RedisStreamQueue(r, 'out', 'in', read_count=10)
+    send_to(r, 'in', [f'message#{i}' for i in range(25)] + ['stop_process'])
+
+    received = []
+    r.round_trips = 0
+    queue.listen(received.append, block=True)
+
+    assert received == [f'message#{i}' for i in range(25)]
+    # group creation, pending read and three batches, each read and acknowledged
+    assert r.round_trips == 2 + 3 * 2
+    assert r.xpending('in', 'fides')['pending'] == 0
+    # only the last acknowledged entry stays in the stream
+    assert r.xlen('in') == 1
+
+
+def test_unacknowledged_messages_are_delivered_again(r):
+    send_to(r, 'in', ['message#1', 'message#2'])
+    r.xgroup_create('in', 'fides', id='0')
+    # consumer crashed after reading the messages
+    r.xreadgroup('fides', 'fides', {'in': '>'}, count=10)
+    send_to(r, 'in', ['message#3', 'stop_process'])
+
+    received = []
+    RedisStreamQueue(r, 'out', 'in').listen(received.append, block=True)
+    assert received == ['message#1', 'message#2', 'message#3']
+
+
+def redis_3_5_xtrim(self, name, maxlen, approximate=True):
+    """XTRIM of the Redis client pinned in conda.yml, it supports only maxlen."""
+    pieces = ['MAXLEN']
+    if approximate:
+        pieces.append('~')
+    pieces.append(maxlen)
+    return self.execute_command('XTRIM', name, *pieces)
+
+
+def test_received_stream_is_trimmed_by_length_on_old_redis(r, monkeypatch):
+    queue_command = Pipeline.pipeline_execute_command
+
+    def without_min_id(self, *args, **options):
+        if args[0] == 'XTRIM' and 'MINID' in args:
+            # Redis older than 6.2 replies with syntax error
+            args = ('XTRIM', args[1], 'MINID')
+        return queue_command(self, *args, **options)
+
+    monkeypatch.setattr(Pipeline, 'pipeline_execute_command', without_min_id)
+    monkeypatch.setattr(Pipeline, 'xtrim', redis_3_5_xtrim)
+    monkeypatch.setattr(type(r), 'xtrim', redis_3_5_xtrim)
+    r.xgroup_create('in', 'fides', id='0', mkstream=True)
+    queue = RedisStreamQueue(r, 'out', 'in', max_length=100, read_count=50)
+    for burst in range(10):
+        send_to(r, 'in', [f'message#{burst}#{i}' for i in range(50)])
+        assert queue.read_batch(lambda _: None) == 50
+
+    assert r.xpending('in', 'fides')['pending'] == 0
+    assert r.xlen('in') < 500
+
+
+def test_messages_after_stop_are_not_acknowledged(r):
+    send_to(r, 'in', ['message#1', 'stop_process', 'message#2'])
+    queue = RedisStreamQueue(r, 'out', 'in')
+
+    received = []
+    queue.listen(received.append, block=True)
+    assert received == ['message#1']
+    assert r.xpending('in', 'fides')['pending'] == 1
+
+    send_to(r, 'in', ['stop_process'])
+    queue.listen(received.append, block=True)
+    assert received == ['message#1', 'message#2']
+
+
+def test_read_error_does_not_stop_listening(r, monkeypatch):
+    send_to(r, 'in', ['message#1', 'stop_process'])
+    xreadgroup = r.xreadgroup
+    calls = []
+
+    def fail_once(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise ConnectionError()
+        return xreadgroup(*args, **kwargs)
+
+    monkeypatch.setattr(r, 'xreadgroup', fail_once)
+    received = []
+    RedisStreamQueue(r, 'out', 'in', block_milliseconds=1).listen(received.append, block=True)
+    assert received == ['message#1']
+
+
+def test_failing_batch_does_not_stop_listening(r, monkeypatch):
+    send_to(r, 'in', ['message#1', 'stop_process'])
+    xreadgroup = r.xreadgroup
+    calls = []
+
+    def fail_once(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise TypeError()
+        return xreadgroup(*args, **kwargs)
+
+    monkeypatch.setattr(r, 'xreadgroup', fail_once)
+    received = []
+    RedisStreamQueue(r, 'out', 'in', block_milliseconds=1).listen(received.append, block=True)
+    assert received == ['message#1']
+
+
+def test_failing_message_does_not_stop_listening(r):
+    send_to(r, 'in', ['fail', 'message#1', 'stop_process'])
+    received = []
+
+    def on_message(message):
+        if message == 'fail':
+            raise ValueError()
+        received.append(message)
+
+    RedisStreamQueue(r, 'out', 'in').listen(on_message, block=True)
+    assert received == ['message#1']
+
+
+def test_sent_stream_is_bounded(r):
+    queue = RedisStreamQueue(r, 'out', 'in', max_length=100)
+    for i in range(1000):
+        queue.send(f'message#{i}')
+
+    assert r.xlen('out') < 1000
+    assert r.xrevrange('out', count=1)[0][1] == {RedisStreamQueue.FIELD: 'message#999'}
+
+
+def test_listening_in_thread_can_be_stopped(r):
+    queue = RedisStreamQueue(r, 'out', 'in', block_milliseconds=10)
+    thread = queue.listen(lambda _: None)
+    queue.stop()
+    assert not thread.is_alive()
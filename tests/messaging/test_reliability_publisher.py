@@ -0,0 +1,81 @@
+import dataclasses
+
+import fides.messaging.reliability_publisher as reliability_publisher
+from fides.messaging.reliability_publisher import ReliabilityPublisher
+from fides.model.peer import PeerInfo
+from tests.load_config import find_config
+from tests.load_fides import get_fides_stream
+from tests.messaging.messages import serialize, nl2tl_intelligence_request
+
+
+class Clock:
+
+    def __init__(self):
+        self.time = 1000.0
+
+    def __call__(self):
+        return self.time
+
+
+def test_updates_are_merged_per_window(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(reliability_publisher, 'now', clock)
+    published = []
+    publisher = ReliabilityPublisher(published.append, window_seconds=10)
+
+    # the first update is published immediately
+    publisher.update({'peer#1': 0.1})
+    publisher.update({'peer#1': 0.2, 'peer#2': 0.5})
+    publisher.update({'peer#1': 0.3})
+    assert published == [{'peer#1': 0.1}]
+
+    clock.time += 5
+    publisher.flush_if_due()
+    assert len(published) == 1
+
+    clock.time += 5
+    publisher.flush_if_due()
+    assert published[-1] == {'peer#1': 0.3, 'peer#2': 0.5}
+    assert publisher.pending_peers == {}
+
+
+def test_small_changes_are_not_published():
+    published = []
+    publisher = ReliabilityPublisher(published.append, epsilon=0.01)
+    publisher.update({'peer#1': 0.5})
+    publisher.update({'peer#1': 0.505})
+    publisher.update({'peer#1': 0.509, 'peer#2': 0.5})
+    publisher.update({'peer#1': 0.51})
+
+    assert published == [{'peer#1': 0.5}, {'peer#2': 0.5}, {'peer#1': 0.51}]
+
+
+def test_update_reverted_within_window_is_dropped(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(reliability_publisher, 'now', clock)
+    published = []
+    publisher = ReliabilityPublisher(published.append, window_seconds=10, epsilon=0.01)
+    publisher.update({'peer#1': 0.5})
+    publisher.update({'peer#1': 0.9})
+    publisher.update({'peer#1': 0.5})
+
+    publisher.flush()
+    assert published == [{'peer#1': 0.5}]
+
+
+def test_bridge_sends_single_message_per_window():
+    config = dataclasses.replace(find_config(), peers_reliability_window_seconds=3600)
+    f, messages, _ = get_fides_stream(config=config)
+    senders = [PeerInfo(f'peer#{i}', []) for i in range(3)]
+    for sender in senders:
+        f.trust.determine_and_store_initial_trust(sender, get_recommendations=False)
+
+    for i, sender in enumerate(senders):
+        f.queue.send_message(serialize(nl2tl_intelligence_request(str(i), 'target.com', sender)))
+    reliability = [m for m in messages if m.type == 'tl2nl_peers_reliability']
+    assert len(reliability) == 1
+
+    f.bridge.flush_peers_reliability()
+    reliability = [m for m in messages if m.type == 'tl2nl_peers_reliability']
+    assert len(reliability) == 2
+    assert [r['peer_id'] for r in reliability[1].data] == ['peer#1', 'peer#2']
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from fides.model.configuration import load_configuration
+
+CONFIG_PATH = Path(__file__).parents[2] / 'fides.conf.yml'
+
+
+def load_with_fading(tmp_path, fading: dict):
+    data = yaml.safe_load(CONFIG_PATH.read_text())
+    data['trust']['service']['fading'] = fading
+    path = tmp_path / 'fides.conf.yml'
+    path.write_text(yaml.safe_dump(data))
+    return load_configuration(str(path))
+
+
+def test_exponential_fading_is_parsed(tmp_path):
+    config = load_with_fading(tmp_path, {'strategy': 'exponential', 'halfLifeSeconds': 10})
+    assert config.service_fading.decay_rate > 0
+
+
+@pytest.mark.parametrize('fading', [
+    {'strategy': 'exponential'},
+    {'strategy': 'exponential', 'halfLifeSeconds': 0},
+    {'strategy': 'exponencial', 'halfLifeSeconds': 10},
+])
+def test_invalid_fading_is_rejected(tmp_path, fading):
+    with pytest.raises(ValueError):
+        load_with_fading(tmp_path, fading)
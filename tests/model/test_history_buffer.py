@@ -0,0 +1,23 @@
+from fides.model.service_history import ServiceHistoryBuffer, ServiceHistoryRecord
+
+
+def test_buffer_evicts_oldest_records():
+    records = [ServiceHistoryRecord(satisfaction=i / 10, weight=1, timestamp=i) for i in range(5)]
+    buffer = ServiceHistoryBuffer(capacity=3, records=records[:3])
+
+    evicted = [buffer.append(r) for r in records[3:]]
+
+    assert evicted == records[:2]
+    assert len(buffer) == 3
+    assert buffer == records[2:]
+    assert buffer[-1] == records[-1]
+    assert list(buffer.columns()[2]) == [2, 3, 4]
+
+
+def test_buffer_keeps_only_latest_records_from_list():
+    records = [ServiceHistoryRecord(satisfaction=1, weight=i / 10, timestamp=i) for i in range(10)]
+
+    buffer = ServiceHistoryBuffer(capacity=4, records=records)
+
+    assert buffer == records[-4:]
+    assert buffer[1:3] == records[7:9]
@@ -0,0 +1,107 @@
+import dataclasses
+
+import fides.persistence.network_opinion_cache as network_opinion_cache
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.network_opinion_cache import NetworkOpinionCache
+from fides.persistence.trust_in_memory import InMemoryTrustDatabase
+from tests.load_config import find_config
+
+
+def opinion(target: str, score: float = 0.5) -> SlipsThreatIntelligence:
+    return SlipsThreatIntelligence(score=score, confidence=0.75, target=target, confidentiality=None)
+
+
+class Clock:
+
+    def __init__(self):
+        self.time = 1000.0
+
+    def __call__(self):
+        return self.time
+
+
+def test_least_recently_used_opinion_is_evicted():
+    cache = NetworkOpinionCache(max_size=2, ttl_seconds=3600)
+    cache.put(opinion('1.1.1.1'))
+    cache.put(opinion('2.2.2.2'))
+    assert cache.get('1.1.1.1') is not None
+
+    cache.put(opinion('3.3.3.3'))
+
+    assert len(cache) == 2
+    assert cache.get('2.2.2.2') is None
+    assert cache.get('1.1.1.1') is not None
+    assert cache.get('3.3.3.3') is not None
+    assert cache.statistics.evictions == 1
+
+
+def test_replaced_opinion_does_not_grow_cache():
+    cache = NetworkOpinionCache(max_size=2, ttl_seconds=3600)
+    cache.put(opinion('1.1.1.1', score=0.1))
+    cache.put(opinion('1.1.1.1', score=0.9))
+
+    assert len(cache) == 1
+    assert cache.get('1.1.1.1').score == 0.9
+
+
+def test_opinions_expire(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(network_opinion_cache, 'now', clock)
+    cache = NetworkOpinionCache(max_size=10, ttl_seconds=60)
+    cache.put(opinion('1.1.1.1'))
+    clock.time += 30
+    cache.put(opinion('2.2.2.2'))
+
+    clock.time += 30
+    assert cache.get('1.1.1.1') is None
+    assert cache.get('2.2.2.2') is not None
+    # refreshed opinion gets new time to live
+    cache.put(opinion('2.2.2.2'))
+    clock.time += 59
+    assert cache.get('2.2.2.2') is not None
+    clock.time += 1
+    assert cache.get('2.2.2.2') is None
+
+    assert len(cache) == 0
+    assert cache.statistics.expirations == 2
+
+
+def test_stale_opinions_are_returned_only_on_request(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(network_opinion_cache, 'now', clock)
+    cache = NetworkOpinionCache(max_size=10, ttl_seconds=60, stale_seconds=30)
+    cache.put(opinion('1.1.1.1'))
+
+    clock.time += 60
+    assert cache.get('1.1.1.1') is None
+    assert cache.get('1.1.1.1', include_stale=True).stale
+    clock.time += 30
+    assert cache.get('1.1.1.1', include_stale=True) is None
+
+    statistics = cache.statistics
+    assert (statistics.hits, statistics.stale_hits, statistics.misses) == (0, 1, 2)
+
+
+def test_statistics_count_hits_and_misses():
+    cache = NetworkOpinionCache(max_size=10, ttl_seconds=3600)
+    cache.put(opinion('1.1.1.1'))
+    cache.get('1.1.1.1')
+    cache.get('1.1.1.1')
+    cache.get('2.2.2.2')
+
+    statistics = cache.statistics
+    assert (statistics.hits, statistics.misses) == (2, 1)
+    # statistics are a snapshot
+    cache.get('2.2.2.2')
+    assert statistics.misses == 1
+
+
+def test_trust_database_uses_configured_cache():
+    configuration = dataclasses.replace(find_config(), network_opinion_cache_max_size=1)
+    db = InMemoryTrustDatabase(configuration)
+    db.cache_network_opinion(opinion('1.1.1.1'))
+    db.cache_network_opinion(opinion('2.2.2.2'))
+
+    assert db.get_cached_network_opinion('1.1.1.1') is None
+    assert db.get_cached_network_opinion('2.2.2.2') is not None
+    assert db.network_opinion_cache.statistics.evictions == 1
@@ -0,0 +1,62 @@
+import random
+from ipaddress import ip_address, ip_network
+
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.prefix_trie import PrefixTrie
+from fides.persistence.threat_intelligence_prefix import PrefixThreatIntelligenceDatabase
+
+
+def ti(target: str, score: float = 1.0) -> SlipsThreatIntelligence:
+    return SlipsThreatIntelligence(score=score, confidence=1.0, target=target)
+
+
+def test_most_specific_network_is_used():
+    db = PrefixThreatIntelligenceDatabase()
+    db.save_all([ti('10.0.0.0/8', score=0.1), ti('10.1.0.0/16', score=0.2), ti('10.1.2.3', score=0.3)])
+
+    assert db.get_for('10.1.2.3').score == 0.3
+    assert db.get_for('10.1.2.4').score == 0.2
+    assert db.get_for('10.2.0.1').score == 0.1
+    assert db.get_for('11.0.0.1') is None
+    assert db.get_for('10.1.2.4').target == '10.1.2.4'
+    assert len(db) == 3
+
+
+def test_ipv6_and_domains():
+    db = PrefixThreatIntelligenceDatabase()
+    db.save(ti('2001:db8::/32', score=-0.5))
+    db.save(ti('Example.com', score=0.7))
+    # ipv4 default route does not match ipv6 addresses
+    db.save(ti('0.0.0.0/0', score=0.0))
+
+    assert db.get_for('2001:db8:1::1').score == -0.5
+    assert db.get_for('2001:db9::1') is None
+    assert db.get_for('example.com').score == 0.7
+    assert db.get_for('www.example.com') is None
+    assert db.get_for('192.168.1.1').score == 0.0
+
+
+def test_returned_intelligence_is_a_copy():
+    db = PrefixThreatIntelligenceDatabase()
+    db.save(ti('10.0.0.0/8'))
+    db.get_for('10.0.0.1').confidentiality = 0.9
+    assert db.get_for('10.0.0.1').confidentiality is None
+
+
+def test_trie_matches_full_scan():
+    rnd = random.Random(42)
+    trie = PrefixTrie(32)
+    networks = {}
+    for i in range(2000):
+        length = rnd.choice([0, 8, 12, 16, 20, 24, 28, 31, 32])
+        network = ip_network((rnd.getrandbits(32), length), strict=False)
+        networks[network] = i
+        trie.insert(int(network.network_address), network.prefixlen, i)
+    assert len(trie) == len(networks)
+
+    for _ in range(2000):
+        # addresses close to the stored networks, so most of them match something
+        address = ip_address(min(int(rnd.choice(list(networks)).network_address) + rnd.getrandbits(10), 2 ** 32 - 1))
+        matching = [n for n in networks if address in n]
+        expected = networks[max(matching, key=lambda n: n.prefixlen)] if matching else None
+        assert trie.longest_match(int(address)) == expected
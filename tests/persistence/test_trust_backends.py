@@ -0,0 +1,183 @@
+import dataclasses
+import random
+
+import pytest
+
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import TrustMetric, trust_data_prototype
+from fides.model.recommendation_history import RecommendationHistoryRecord
+from fides.model.service_history import ServiceHistoryRecord
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.trust_caching import CachingTrustDatabase
+from fides.persistence.trust_columns import ColumnarTrustDatabase, MemoryMappedTrustColumns
+from fides.persistence.trust_in_memory import InMemoryTrustDatabase
+from fides.persistence.trust_sqlite import SqliteTrustDatabase
+from tests.load_config import find_config
+
+
+def in_memory_db(tmp_path):
+    return InMemoryTrustDatabase(find_config())
+
+
+def redis_db(tmp_path):
+    fakeredis = pytest.importorskip('fakeredis')
+    from slips.persistance.trust import SlipsTrustDatabase
+    return SlipsTrustDatabase(find_config(), fakeredis.FakeRedis(decode_responses=True))
+
+
+def caching_db(tmp_path):
+    # small cache, so the tests exercise the eviction and the flushes as well
+    return CachingTrustDatabase(in_memory_db(tmp_path), max_size=2, flush_interval_seconds=3600, flush_batch_size=2)
+
+
+def sqlite_db(tmp_path):
+    return SqliteTrustDatabase(find_config(), ':memory:')
+
+
+def columnar_db(tmp_path):
+    # small capacity, so the tests exercise growth of the file as well
+    columns = MemoryMappedTrustColumns(str(tmp_path / 'columns'), initial_capacity=2)
+    return ColumnarTrustDatabase(in_memory_db(tmp_path), columns)
+
+
+@pytest.fixture(params=[in_memory_db, redis_db, caching_db, sqlite_db, columnar_db],
+                ids=['in_memory', 'redis', 'caching', 'sqlite', 'columnar'])
+def db(request, tmp_path):
+    return request.param(tmp_path)
+
+
+def brute_force_top_peers(peers, order_by, limit, minimal_trust, exclude):
+    candidates = [p for p in peers.values()
+                  if p.peer_id not in exclude and any(m.of(p) >= v for m, v in minimal_trust.items())]
+    candidates.sort(key=lambda p: (-order_by.of(p), p.peer_id))
+    return [p.peer_id for p in candidates[:limit]]
+
+
+def peer_with(peer_id: str, service_trust: float = 0.0, recommendation_trust: float = 0.0, organisations=()):
+    return dataclasses.replace(trust_data_prototype(PeerInfo(peer_id, list(organisations), ip='192.168.0.1')),
+                               service_trust=service_trust,
+                               recommendation_trust=recommendation_trust)
+
+
+def test_peer_trust_data_round_trip(db):
+    peer = peer_with('peer#1', service_trust=0.7, recommendation_trust=0.3, organisations=['org#1'])
+    peer = dataclasses.replace(peer, reputation=0.25, competence_belief=0.5, integrity_belief=0.125,
+                               initial_reputation_provided_by_count=3)
+    peer.service_history = [ServiceHistoryRecord(0.5, 1.0, 10.0), ServiceHistoryRecord(1.0, 0.7, 11.5)]
+    peer.recommendation_history = [RecommendationHistoryRecord(0.25, 1.0, 12.0)]
+    db.store_peer_trust_data(peer)
+
+    loaded = db.get_peer_trust_data('peer#1')
+    assert loaded == peer
+    assert db.get_peer_trust_data(PeerInfo('peer#1', [])) == peer
+    assert db.get_peer_trust_data('unknown') is None
+
+
+def test_bulk_read_omits_unknown_peers(db):
+    db.store_peer_trust_matrix({p.peer_id: p for p in [peer_with('peer#1'), peer_with('peer#2')]})
+
+    matrix = db.get_peers_trust_data(['peer#1', PeerInfo('peer#2', []), 'unknown', 'peer#1'])
+    assert sorted(matrix) == ['peer#1', 'peer#2']
+    assert [p.id for p in db.get_peers_info(['peer#2', 'unknown'])] == ['peer#2']
+
+
+def test_store_overwrites_peer(db):
+    db.store_peer_trust_data(peer_with('peer#1', service_trust=0.9, organisations=['org#1']))
+    db.store_peer_trust_data(peer_with('peer#1', service_trust=0.1, organisations=['org#2']))
+
+    assert db.get_peer_trust_data('peer#1').service_trust == 0.1
+    assert db.get_peers_with_geq_service_trust(0.5) == []
+    assert db.get_peers_with_organisations(['org#1']) == []
+    assert [p.id for p in db.get_peers_with_organisations(['org#2'])] == ['peer#1']
+
+
+def test_geq_queries(db):
+    db.store_peer_trust_matrix({p.peer_id: p for p in [
+        peer_with('peer#1', service_trust=0.9, recommendation_trust=0.1),
+        peer_with('peer#2', service_trust=0.5, recommendation_trust=0.5),
+        peer_with('peer#3', service_trust=0.1, recommendation_trust=0.9),
+    ]})
+
+    assert sorted(p.id for p in db.get_peers_with_geq_service_trust(0.5)) == ['peer#1', 'peer#2']
+    assert sorted(p.id for p in db.get_peers_with_geq_recommendation_trust(0.5)) == ['peer#2', 'peer#3']
+    assert db.get_peers_with_geq_service_trust(0.95) == []
+
+
+def test_top_peers(db):
+    db.store_peer_trust_matrix({p.peer_id: p for p in [
+        peer_with('peer#1', service_trust=0.9, recommendation_trust=0.1),
+        peer_with('peer#2', service_trust=0.5, recommendation_trust=0.5),
+        peer_with('peer#3', service_trust=0.1, recommendation_trust=0.9),
+        peer_with('peer#4', service_trust=0.5, recommendation_trust=0.0),
+    ]})
+
+    top = db.get_top_peers_trust_data(TrustMetric.SERVICE_TRUST, 3,
+                                      {TrustMetric.SERVICE_TRUST: 0.5, TrustMetric.RECOMMENDATION_TRUST: 0.8},
+                                      exclude={'peer#1'})
+    assert [p.peer_id for p in top] == ['peer#2', 'peer#4', 'peer#3']
+
+
+def test_organisations(db):
+    db.store_peer_trust_matrix({p.peer_id: p for p in [
+        peer_with('peer#1', organisations=['org#1']),
+        peer_with('peer#2', organisations=['org#1', 'org#2']),
+        peer_with('peer#3', organisations=[]),
+    ]})
+
+    assert sorted(p.id for p in db.get_peers_with_organisations(['org#1'])) == ['peer#1', 'peer#2']
+    assert [p.id for p in db.get_peers_with_organisations(['org#2', 'org#3'])] == ['peer#2']
+    assert db.get_peers_with_organisations(['org#3']) == []
+
+
+def test_connected_peers(db):
+    assert db.get_connected_peers() == []
+    peers = [PeerInfo('peer#1', ['org#1'], ip='192.168.0.1'), PeerInfo('peer#2', [])]
+    db.store_connected_peers_list(peers)
+    assert db.get_connected_peers() == peers
+
+
+def test_network_opinion_cache(db):
+    assert db.get_cached_network_opinion('192.168.0.1') is None
+    ti = SlipsThreatIntelligence(score=0.5, confidence=0.75, target='192.168.0.1', confidentiality=0.1)
+    db.cache_network_opinion(ti)
+    assert db.get_cached_network_opinion('192.168.0.1') == ti
+
+
+def test_organisations_follow_peer_info_changes(db):
+    db.store_peer_trust_data(peer_with('peer#1', organisations=['org#1', 'org#2']))
+    db.store_peer_trust_data(peer_with('peer#2', organisations=['org#2']))
+    db.store_peer_trust_matrix({'peer#1': peer_with('peer#1', organisations=['org#2', 'org#3']),
+                                'peer#2': peer_with('peer#2', organisations=[])})
+
+    assert db.get_peers_with_organisations(['org#1']) == []
+    assert [p.id for p in db.get_peers_with_organisations(['org#2'])] == ['peer#1']
+    assert [p.id for p in db.get_peers_with_organisations(['org#1', 'org#3'])] == ['peer#1']
+    assert db.get_peers_with_organisations([]) == []
+
+
+def test_indexed_queries_match_full_scan(db):
+    rnd = random.Random(42)
+    peers = {}
+    for _ in range(200):
+        # matrices of few peers, so the peers are overwritten and the indexes have to move them,
+        # values are rounded so there are ties as well
+        matrix = {}
+        for _ in range(rnd.randint(1, 3)):
+            peer_id = f'peer#{rnd.randint(0, 50)}'
+            matrix[peer_id] = peer_with(peer_id, service_trust=round(rnd.random(), 1),
+                                        recommendation_trust=round(rnd.random(), 1))
+        peers.update(matrix)
+        db.store_peer_trust_matrix(matrix)
+
+        minimal = rnd.random()
+        assert sorted(p.id for p in db.get_peers_with_geq_service_trust(minimal)) == \
+               sorted(p.peer_id for p in peers.values() if p.service_trust >= minimal)
+
+        order_by = rnd.choice(list(TrustMetric))
+        minimal_trust = {m: rnd.random() for m in rnd.sample(list(TrustMetric), rnd.randint(1, 2))}
+        exclude = {f'peer#{rnd.randint(0, 50)}' for _ in range(5)}
+        limit = rnd.randint(0, 20)
+
+        expected = brute_force_top_peers(peers, order_by, limit, minimal_trust, exclude)
+        actual = db.get_top_peers_trust_data(order_by, limit, minimal_trust, exclude)
+        assert expected == [p.peer_id for p in actual]
@@ -0,0 +1,91 @@
+import dataclasses
+
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import TrustMatrix, trust_data_prototype
+from fides.persistence.trust_caching import CachingTrustDatabase
+from fides.persistence.trust_in_memory import InMemoryTrustDatabase
+from tests.load_config import find_config
+
+
+class RecordingTrustDatabase(InMemoryTrustDatabase):
+
+    def __init__(self):
+        super().__init__(find_config())
+        self.writes = []
+        self.reads = []
+
+    def store_peer_trust_matrix(self, trust_matrix: TrustMatrix):
+        self.writes.append(sorted(trust_matrix))
+        super().store_peer_trust_matrix(trust_matrix)
+
+    def get_peers_trust_data(self, peer_ids) -> TrustMatrix:
+        self.reads.append(list(peer_ids))
+        return super().get_peers_trust_data(peer_ids)
+
+
+def peer(peer_id: str, service_trust: float = 0.5):
+    return dataclasses.replace(trust_data_prototype(PeerInfo(peer_id, [])), service_trust=service_trust)
+
+
+def test_writes_are_flushed_in_batches():
+    delegate = RecordingTrustDatabase()
+    db = CachingTrustDatabase(delegate, max_size=10, flush_interval_seconds=3600, flush_batch_size=3)
+
+    db.store_peer_trust_data(peer('peer#1'))
+    db.store_peer_trust_data(peer('peer#2'))
+    db.store_peer_trust_data(peer('peer#1', service_trust=0.9))
+    assert delegate.writes == []
+    assert db.dirty_peers == ['peer#1', 'peer#2']
+    assert db.get_peer_trust_data('peer#1').service_trust == 0.9
+
+    db.store_peer_trust_data(peer('peer#3'))
+    assert delegate.writes == [['peer#1', 'peer#2', 'peer#3']]
+    assert delegate.get_peer_trust_data('peer#1').service_trust == 0.9
+    assert not db.dirty_peers
+
+    statistics = db.statistics
+    assert statistics.flushes == 1 and statistics.flushed_peers == 3
+    assert statistics.flush_seconds_max >= statistics.flush_seconds_mean > 0
+
+
+def test_reads_are_served_from_cache():
+    delegate = RecordingTrustDatabase()
+    delegate.store_peer_trust_matrix({p.peer_id: p for p in [peer('peer#1'), peer('peer#2'), peer('peer#3')]})
+    db = CachingTrustDatabase(delegate, max_size=2, flush_interval_seconds=3600, flush_batch_size=10)
+
+    assert sorted(db.get_peers_trust_data(['peer#1', 'peer#2', 'unknown'])) == ['peer#1', 'peer#2']
+    assert db.get_peer_trust_data('peer#1') is not None
+    assert db.get_peer_trust_data('peer#2') is not None
+    # only misses went to the delegate
+    assert delegate.reads == [['peer#1', 'peer#2', 'unknown']]
+    assert db.statistics.hit_rate == 2 / 5
+
+    # peer#3 evicts the least recently used peer#1
+    db.get_peer_trust_data('peer#3')
+    db.get_peer_trust_data('peer#1')
+    assert delegate.reads[1:] == [['peer#3'], ['peer#1']]
+
+
+def test_evicted_dirty_peer_is_flushed():
+    delegate = RecordingTrustDatabase()
+    db = CachingTrustDatabase(delegate, max_size=1, flush_interval_seconds=3600, flush_batch_size=10)
+
+    db.store_peer_trust_data(peer('peer#1'))
+    db.store_peer_trust_data(peer('peer#2'))
+
+    # eviction flushes all dirty peers in one batch
+    assert delegate.writes == [['peer#1', 'peer#2']]
+    assert not db.dirty_peers
+    assert db.get_peer_trust_data('peer#1') == peer('peer#1')
+
+
+def test_dirty_peers_are_flushed_when_interval_passes():
+    delegate = RecordingTrustDatabase()
+    db = CachingTrustDatabase(delegate, max_size=10, flush_interval_seconds=0, flush_batch_size=10)
+
+    db.store_peer_trust_data(peer('peer#1'))
+    assert delegate.writes == [['peer#1']]
+
+    db.flush_if_due()
+    db.flush()
+    assert len(delegate.writes) == 1
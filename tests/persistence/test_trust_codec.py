@@ -0,0 +1,41 @@
+import dataclasses
+
+import pytest
+
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype
+from fides.model.recommendation_history import RecommendationHistoryRecord
+from fides.model.service_history import ServiceHistoryBuffer, ServiceHistoryRecord
+from fides.persistence.trust_codec import encode_peer_trust_data, decode_peer_trust_data, decode_peer_info
+from tests.load_config import find_config
+
+
+def build_peer(info: PeerInfo):
+    peer = dataclasses.replace(trust_data_prototype(info, has_fixed_trust=True),
+                               service_trust=0.1, reputation=0.2, recommendation_trust=0.3,
+                               competence_belief=0.4, integrity_belief=0.5, initial_reputation_provided_by_count=6)
+    peer.service_history = ServiceHistoryBuffer(capacity=3, records=[ServiceHistoryRecord(i / 10, 1 - i / 10, i)
+                                                                     for i in range(5)])
+    peer.recommendation_history = [RecommendationHistoryRecord(0.25, 0.5, 1.5)]
+    return peer
+
+
+@pytest.mark.parametrize('info', [PeerInfo('peer#1', ['org#1', 'organizace#ž'], ip='192.168.0.1'),
+                                  PeerInfo('peer#2', [])])
+def test_round_trip(info):
+    config = find_config()
+    peer = build_peer(info)
+    data = encode_peer_trust_data(peer)
+
+    assert decode_peer_trust_data(data, config) == peer
+    assert decode_peer_info(data) == info
+
+    without_histories = decode_peer_trust_data(data, config, include_histories=False)
+    assert without_histories == dataclasses.replace(peer, service_history=[], recommendation_history=[])
+
+
+def test_unknown_version_is_rejected():
+    data = bytearray(encode_peer_trust_data(build_peer(PeerInfo('peer#1', []))))
+    data[0] = 255
+    with pytest.raises(ValueError):
+        decode_peer_info(bytes(data))
@@ -0,0 +1,55 @@
+import dataclasses
+
+import pytest
+
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import TrustMetric, trust_data_prototype
+from fides.persistence.trust_columns import MemoryMappedTrustColumns
+
+
+def peer(peer_id: str, service_trust: float, recommendation_trust: float = 0.0):
+    return dataclasses.replace(trust_data_prototype(PeerInfo(peer_id, [])), service_trust=service_trust,
+                               recommendation_trust=recommendation_trust, initial_reputation_provided_by_count=3)
+
+
+def test_reader_sees_writes_and_growth(tmp_path):
+    path = str(tmp_path / 'columns')
+    writer = MemoryMappedTrustColumns(path, initial_capacity=2)
+    writer.store([peer('peer#1', 0.9)])
+    reader = MemoryMappedTrustColumns(path, read_only=True)
+
+    # the file is replaced three times while the reader has it mapped
+    writer.store([peer(f'peer#{i}', i / 10) for i in range(2, 10)])
+    writer.store([peer('peer#1', 0.1)])
+
+    assert len(reader) == 9
+    assert reader.get_peers_with_geq(TrustMetric.SERVICE_TRUST, 0.7) == ['peer#9', 'peer#8', 'peer#7']
+    assert reader.column('initial_reputation_provided_by_count').tolist() == [3] * 9
+    assert reader.column('service_trust')[reader.row_of('peer#1')] == 0.1
+    with pytest.raises(ValueError):
+        reader.column('service_trust')[0] = 1
+
+
+def test_reopened_file_keeps_rows(tmp_path):
+    path = str(tmp_path / 'columns')
+    writer = MemoryMappedTrustColumns(path, initial_capacity=2)
+    writer.store([peer(f'peer#{i}', i / 10) for i in range(5)])
+    writer.flush()
+
+    reopened = MemoryMappedTrustColumns(path)
+    assert [reopened.row_of(f'peer#{i}') for i in range(5)] == list(range(5))
+    assert reopened.column('service_trust').tolist() == [i / 10 for i in range(5)]
+
+
+def test_invalid_input_is_rejected(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        MemoryMappedTrustColumns(str(tmp_path / 'missing'), read_only=True)
+
+    columns = MemoryMappedTrustColumns(str(tmp_path / 'columns'), peer_id_size=8)
+    with pytest.raises(ValueError):
+        columns.store([peer('too long peer id', 0.5)])
+
+    (tmp_path / 'other').write_bytes(b'\0' * 128)
+    with pytest.raises(ValueError):
+        MemoryMappedTrustColumns(str(tmp_path / 'other'))
+
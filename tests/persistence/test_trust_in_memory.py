@@ -0,0 +1,16 @@
+import dataclasses
+
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype
+from fides.persistence.trust_in_memory import InMemoryTrustDatabase
+from tests.load_config import find_config
+
+
+def test_geq_queries_use_current_values():
+    db = InMemoryTrustDatabase(find_config())
+    peer = trust_data_prototype(PeerInfo('peer#1', []))
+    db.store_peer_trust_data(dataclasses.replace(peer, service_trust=0.9, recommendation_trust=0.9))
+    db.store_peer_trust_data(dataclasses.replace(peer, service_trust=0.1, recommendation_trust=0.95))
+
+    assert db.get_peers_with_geq_service_trust(0.5) == []
+    assert [p.id for p in db.get_peers_with_geq_recommendation_trust(0.5)] == ['peer#1']
@@ -0,0 +1,104 @@
+import fides.persistence.trust_lazy as trust_lazy
+from fides.evaluation.service.interaction import SatisfactionLevels, Weight
+from fides.evaluation.service.process import evaluate_service_trust
+from fides.model.alert import Alert
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import PeerTrustData, trust_data_prototype
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from fides.persistence.trust_in_memory import InMemoryTrustDatabase
+from fides.persistence.trust_lazy import LazyEvaluationTrustDatabase
+from tests.load_config import find_config
+from tests.load_fides import get_fides_stream
+from tests.messaging.messages import serialize, nl2tl_alert, nl2tl_intelligence_request
+
+BURST_SIZE = 20
+
+
+def record_burst(trust_db, peer: PeerTrustData, satisfaction: float = SatisfactionLevels.Ok) -> PeerTrustData:
+    for _ in range(BURST_SIZE):
+        peer = trust_db.record_service_interactions({peer.peer_id: (peer, satisfaction, Weight.ALERT)})[peer.peer_id]
+    return peer
+
+
+def test_burst_of_interactions_is_recomputed_once(monkeypatch):
+    evaluations = []
+
+    def counting_evaluation(configuration, peers):
+        evaluations.append([p.peer_id for p in peers])
+        return evaluate_service_trust(configuration, peers)
+
+    evaluate_service_trust = trust_lazy.evaluate_service_trust
+    monkeypatch.setattr(trust_lazy, 'evaluate_service_trust', counting_evaluation)
+
+    config = find_config()
+    sender = trust_data_prototype(PeerInfo('sender#1', []))
+
+    eager_db = InMemoryTrustDatabase(config)
+    record_burst(eager_db, sender)
+    expected = eager_db.get_peer_trust_data(sender.peer_id)
+
+    flushed = []
+    lazy_db = LazyEvaluationTrustDatabase(InMemoryTrustDatabase(config), flush_interval_seconds=3600,
+                                          on_flush=flushed.append)
+    record_burst(lazy_db, sender)
+
+    # nothing was recomputed during the burst
+    assert not evaluations
+    assert lazy_db.dirty_peers == [sender.peer_id]
+
+    # reading service trust triggers single recomputation
+    actual = lazy_db.get_peer_trust_data(sender.peer_id)
+    assert evaluations == [[sender.peer_id]]
+    assert len(flushed) == 1 and list(flushed[0]) == [sender.peer_id]
+    assert not lazy_db.dirty_peers
+
+    assert len(expected.service_history) == len(actual.service_history) == BURST_SIZE
+    assert expected.service_trust == actual.service_trust
+    assert expected.competence_belief == actual.competence_belief
+    assert expected.integrity_belief == actual.integrity_belief
+
+    # clean peer is not recomputed again
+    lazy_db.get_peer_trust_data(sender.peer_id)
+    assert len(evaluations) == 1
+
+
+def test_sender_trust_is_recomputed_before_handling_its_message():
+    config = find_config()
+    delegate = InMemoryTrustDatabase(config)
+    lazy_db = LazyEvaluationTrustDatabase(delegate, flush_interval_seconds=3600)
+    f, messages, opinions = get_fides_stream(config=config, trust_db=lazy_db)
+    sender = PeerInfo('sender#1', [])
+    record_burst(lazy_db, f.trust.determine_and_store_initial_trust(sender, get_recommendations=False))
+    trusted = lazy_db.get_peer_trust_data(sender.id)
+
+    # trust of the sender collapses, but it is not recomputed yet
+    record_burst(lazy_db, trusted, satisfaction=0)
+    assert lazy_db.dirty_peers == [sender.id]
+
+    # data that were available for the sender before its trust collapsed are not shared
+    f.ti_db.save(SlipsThreatIntelligence(score=1, confidence=1, target='target.com',
+                                         confidentiality=trusted.service_trust))
+    f.queue.send_message(serialize(nl2tl_intelligence_request('request#1', 'target.com', sender)))
+    response = [m for m in messages if m.type == 'tl2nl_intelligence_response'][0]
+    assert response.data['payload']['intelligence'] == {'score': 0, 'confidence': 0}
+
+    # alert is weighted by the trust that includes pending interactions
+    pending = delegate.get_peer_trust_data(sender.id)
+    expected = evaluate_service_trust(config, [pending])[sender.id].service_trust
+    assert expected < trusted.service_trust
+    f.queue.send_message(serialize(nl2tl_alert(sender, Alert(target='alert.com', score=1, confidence=1))))
+    assert opinions['alert.com'].confidence == max(config.alert_trust_from_unknown, expected)
+
+
+def test_dirty_peers_are_flushed_when_interval_passes():
+    config = find_config()
+    flushed = []
+    lazy_db = LazyEvaluationTrustDatabase(InMemoryTrustDatabase(config), flush_interval_seconds=0,
+                                          on_flush=flushed.append)
+    sender = PeerInfo('sender#1', [])
+    record_burst(lazy_db, trust_data_prototype(sender))
+
+    # zero interval means that the peer is flushed right after each interaction
+    assert not lazy_db.dirty_peers
+    assert len(flushed) == BURST_SIZE
+    assert lazy_db.get_peer_trust_data(sender.id) == flushed[-1][sender.id]
@@ -0,0 +1,128 @@
+import dataclasses
+
+import pytest
+
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype, TrustMetric
+from fides.model.threat_intelligence import SlipsThreatIntelligence
+from tests.load_config import find_config
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from redis.client import Pipeline
+
+import slips.persistance.trust as trust_redis
+from slips.persistance.trust import SlipsTrustDatabase
+
+
+class RoundTripCountingRedis(fakeredis.FakeRedis):
+    """Counts requests sent to the redis, pipeline is a single request, commands of the watching pipeline
+    are executed immediately, so they are counted separately."""
+
+    round_trips = 0
+
+    def execute_command(self, *args, **options):
+        self.round_trips += 1
+        return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute, immediate_execute_command = pipe.execute, pipe.immediate_execute_command
+
+        def counting_execute(*args, **kwargs):
+            self.round_trips += 1
+            return execute(*args, **kwargs)
+
+        def counting_immediate_execute_command(*args, **kwargs):
+            self.round_trips += 1
+            return immediate_execute_command(*args, **kwargs)
+
+        pipe.execute = counting_execute
+        pipe.immediate_execute_command = counting_immediate_execute_command
+        return pipe
+
+
+def test_bulk_read_is_single_round_trip():
+    r = RoundTripCountingRedis()
+    db = SlipsTrustDatabase(find_config(), r)
+    peers = {f'peer#{i}': dataclasses.replace(trust_data_prototype(PeerInfo(f'peer#{i}', [])), service_trust=i / 200)
+             for i in range(200)}
+
+    # peers are watched and organisations they were indexed under are read before the transaction
+    db.store_peer_trust_matrix(peers)
+    assert r.round_trips == 3
+
+    r.round_trips = 0
+    matrix = db.get_peers_trust_data(list(peers))
+    assert r.round_trips == 1
+    assert matrix == peers
+
+
+def test_concurrent_store_does_not_leave_stale_organisation_membership(monkeypatch):
+    r = fakeredis.FakeRedis()
+    config = find_config()
+    db, other_writer = SlipsTrustDatabase(config, r), SlipsTrustDatabase(config, r)
+    db.store_peer_trust_data(trust_data_prototype(PeerInfo('peer#1', ['org#1'])))
+
+    decode = trust_redis.decode_peer_info
+    concurrent_writes = [trust_data_prototype(PeerInfo('peer#1', ['org#2']))]
+
+    def decode_with_concurrent_write(data):
+        # other writer changes the peer after its previous organisations were read
+        if concurrent_writes:
+            other_writer.store_peer_trust_data(concurrent_writes.pop())
+        return decode(data)
+
+    monkeypatch.setattr(trust_redis, 'decode_peer_info', decode_with_concurrent_write)
+    db.store_peer_trust_data(trust_data_prototype(PeerInfo('peer#1', ['org#3'])))
+
+    assert [p.id for p in db.get_peers_with_organisations(['org#1', 'org#2'])] == []
+    assert [p.id for p in db.get_peers_with_organisations(['org#3'])] == ['peer#1']
+
+
+def test_top_peers_read_only_the_top_of_the_index(monkeypatch):
+    r = RoundTripCountingRedis()
+    db = SlipsTrustDatabase(find_config(), r)
+    peers = {f'peer#{i}': dataclasses.replace(trust_data_prototype(PeerInfo(f'peer#{i}', [])),
+                                              service_trust=i / 1000, recommendation_trust=0.9)
+             for i in range(1000)}
+    db.store_peer_trust_matrix(peers)
+
+    read, scored = [], []
+    zrevrangebyscore, zscore = r.zrevrangebyscore, Pipeline.zscore
+
+    def counting_zrevrangebyscore(*args, **kwargs):
+        page = zrevrangebyscore(*args, **kwargs)
+        read.extend(page)
+        return page
+
+    def counting_zscore(pipe, *args):
+        scored.append(args)
+        return zscore(pipe, *args)
+
+    monkeypatch.setattr(r, 'zrevrangebyscore', counting_zrevrangebyscore)
+    monkeypatch.setattr(Pipeline, 'zscore', counting_zscore)
+
+    # all peers pass the threshold, but only the pages with the top ones are read
+    top = db.get_top_peers_trust_data(TrustMetric.SERVICE_TRUST, 5, {TrustMetric.RECOMMENDATION_TRUST: 0.5})
+    assert [p.peer_id for p in top] == [f'peer#{i}' for i in range(999, 994, -1)]
+    assert len(read) <= 10
+    assert len(scored) <= 10
+
+
+def test_stale_network_opinion_is_read_from_remaining_ttl():
+    r = RoundTripCountingRedis()
+    config = dataclasses.replace(find_config(), network_opinion_cache_valid_seconds=60,
+                                 network_opinion_cache_stale_seconds=30)
+    db = SlipsTrustDatabase(config, r)
+    db.cache_network_opinion(SlipsThreatIntelligence(score=0.5, confidence=0.5, target='1.1.1.1'))
+    assert 60_000 < r.pttl('fides:network_opinion:1.1.1.1') <= 90_000
+
+    r.round_trips = 0
+    assert not db.get_cached_network_opinion('1.1.1.1').stale
+    assert r.round_trips == 1
+
+    # the opinion is in the stale window
+    r.pexpire('fides:network_opinion:1.1.1.1', 10_000)
+    assert db.get_cached_network_opinion('1.1.1.1') is None
+    assert db.get_cached_network_opinion('1.1.1.1', include_stale=True).stale
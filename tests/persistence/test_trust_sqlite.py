@@ -0,0 +1,38 @@
+import dataclasses
+import sqlite3
+
+from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype
+from fides.persistence.trust_sqlite import SqliteTrustDatabase
+from tests.load_config import find_config
+
+
+def test_data_survive_restart(tmp_path):
+    path = str(tmp_path / 'trust.db')
+    peers = {f'peer#{i}': dataclasses.replace(trust_data_prototype(PeerInfo(f'peer#{i}', [f'org#{i % 3}'])),
+                                              service_trust=i / 1000)
+             for i in range(SqliteTrustDatabase.MAX_VARIABLES * 2 + 1)}
+    db = SqliteTrustDatabase(find_config(), path)
+    db.store_peer_trust_matrix(peers)
+    db.store_connected_peers_list([peers['peer#1'].info])
+    db.close()
+
+    db = SqliteTrustDatabase(find_config(), path)
+    assert db.get_peers_trust_data(list(peers)) == peers
+    assert db.get_connected_peers() == [peers['peer#1'].info]
+    assert len(db.get_peers_with_organisations(['org#0', 'org#1'])) == 2 * len(peers) // 3 + 1
+    assert sqlite3.connect(path).execute('PRAGMA journal_mode').fetchone() == ('wal',)
+
+
+def test_queries_use_indexes(tmp_path):
+    path = str(tmp_path / 'trust.db')
+    SqliteTrustDatabase(find_config(), path).close()
+    connection = sqlite3.connect(path)
+
+    def plan(sql: str) -> str:
+        return ' '.join(str(row[-1]) for row in connection.execute(f'EXPLAIN QUERY PLAN {sql}'))
+
+    assert 'peers_service_trust' in plan('SELECT peer_id FROM peers WHERE service_trust >= 0.5')
+    assert 'peers_recommendation_trust' in plan('SELECT peer_id FROM peers WHERE recommendation_trust >= 0.5')
+    assert 'USING' in plan("SELECT peer_id FROM peer_organisations WHERE organisation_id IN ('org#1')")
+
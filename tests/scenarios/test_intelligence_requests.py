@@ -0,0 +1,138 @@
+import dataclasses
+from unittest import TestCase
+
+from fides.messaging.model import PeerIntelligenceResponse
+from fides.model.peer import PeerInfo
+from fides.model.threat_intelligence import ThreatIntelligence, SlipsThreatIntelligence
+import fides.protocols.pending_requests as pending_requests
+from fides.protocols.pending_requests import PendingIntelligenceRequests
+from tests.load_config import find_config
+from tests.load_fides import get_fides_stream
+from tests.messaging.messages import serialize, nl2tl_intelligence_response
+
+
+class TestIntelligenceRequests(TestCase):
+
+    def test_concurrent_requests_are_collapsed(self):
+        f, messages, network_opinions = get_fides_stream()
+        sender = PeerInfo('sender#1', [])
+        f.trust.determine_and_store_initial_trust(sender, get_recommendations=False)
+
+        received = []
+        f.intelligence.request_data('target.com')
+        f.intelligence.request_data('target.com', callback=received.append)
+        f.intelligence.request_data('target.com', callback=received.append)
+
+        requests = [m for m in messages if m.type == 'tl2nl_intelligence_request']
+        self.assertEqual(1, len(requests))
+
+        response = PeerIntelligenceResponse(sender=sender, target='target.com',
+                                            intelligence=ThreatIntelligence(score=0.5, confidence=0.5))
+        f.queue.send_message(serialize(nl2tl_intelligence_response([response])))
+
+        # default callback and the additional one, each notified once
+        self.assertIn('target.com', network_opinions)
+        self.assertEqual(1, len(received))
+        self.assertEqual(network_opinions['target.com'], received[0])
+
+    def test_expired_request_is_sent_again(self):
+        config = dataclasses.replace(find_config(), intelligence_request_timeout_seconds=0)
+        f, messages, _ = get_fides_stream(config=config)
+
+        f.intelligence.request_data('target.com')
+        f.intelligence.request_data('target.com')
+
+        requests = [m for m in messages if m.type == 'tl2nl_intelligence_request']
+        self.assertEqual(2, len(requests))
+
+    def test_pending_requests_expire(self):
+        clock = [100.0]
+        original_now = pending_requests.now
+        pending_requests.now = lambda: clock[0]
+        try:
+            pending = PendingIntelligenceRequests(timeout_seconds=10)
+            self.assertTrue(pending.add_waiter('a', print))
+            clock[0] += 5
+            self.assertTrue(pending.add_waiter('b', print))
+            self.assertFalse(pending.add_waiter('a', repr))
+
+            clock[0] += 5
+            # request on 'a' expired, so its waiters are not notified
+            self.assertIsNone(pending.complete('a'))
+            self.assertListEqual([print], pending.complete('b'))
+            self.assertEqual(0, len(pending))
+
+            # expired refresh nobody waits for is remembered for another timeout
+            self.assertTrue(pending.add_waiter('c', None))
+            clock[0] += 15
+            self.assertListEqual([], pending.complete('c'))
+            self.assertTrue(pending.add_waiter('d', None))
+            clock[0] += 20
+            self.assertIsNone(pending.complete('d'))
+        finally:
+            pending_requests.now = original_now
+
+    def test_stale_opinion_is_returned_and_refreshed(self):
+        config = dataclasses.replace(find_config(),
+                                     network_opinion_cache_valid_seconds=0,
+                                     network_opinion_cache_stale_seconds=3600)
+        f, messages, network_opinions = get_fides_stream(config=config)
+        sender = PeerInfo('sender#1', [])
+        f.trust.determine_and_store_initial_trust(sender, get_recommendations=False)
+        cached = SlipsThreatIntelligence(score=0.1, confidence=0.5, target='target.com')
+        f.trust_db.cache_network_opinion(cached)
+
+        f.intelligence.request_data('target.com')
+        f.intelligence.request_data('target.com')
+
+        # stale opinion is returned immediately, but only one refresh is sent
+        self.assertTrue(network_opinions['target.com'].stale)
+        self.assertEqual(0.1, network_opinions['target.com'].score)
+        requests = [m for m in messages if m.type == 'tl2nl_intelligence_request']
+        self.assertEqual(1, len(requests))
+
+        del network_opinions['target.com']
+        response = PeerIntelligenceResponse(sender=sender, target='target.com',
+                                            intelligence=ThreatIntelligence(score=0.9, confidence=0.9))
+        f.queue.send_message(serialize(nl2tl_intelligence_response([response])))
+
+        # refresh only updates the cache
+        self.assertNotIn('target.com', network_opinions)
+        refreshed = f.trust_db.get_cached_network_opinion('target.com', include_stale=True)
+        self.assertNotEqual(0.1, refreshed.score)
+
+    def test_late_response_to_refresh_only_updates_cache(self):
+        config = dataclasses.replace(find_config(),
+                                     intelligence_request_timeout_seconds=10,
+                                     network_opinion_cache_valid_seconds=0,
+                                     network_opinion_cache_stale_seconds=3600)
+        f, messages, network_opinions = get_fides_stream(config=config)
+        sender = PeerInfo('sender#1', [])
+        f.trust.determine_and_store_initial_trust(sender, get_recommendations=False)
+        f.trust_db.cache_network_opinion(SlipsThreatIntelligence(score=0.1, confidence=0.5, target='target.com'))
+
+        clock = [100.0]
+        original_now = pending_requests.now
+        pending_requests.now = lambda: clock[0]
+        try:
+            f.intelligence.request_data('target.com')
+            del network_opinions['target.com']
+            # refresh expires before the response arrives
+            clock[0] += 15
+            response = PeerIntelligenceResponse(sender=sender, target='target.com',
+                                                intelligence=ThreatIntelligence(score=0.9, confidence=0.9))
+            f.queue.send_message(serialize(nl2tl_intelligence_response([response])))
+        finally:
+            pending_requests.now = original_now
+
+        self.assertNotIn('target.com', network_opinions)
+        refreshed = f.trust_db.get_cached_network_opinion('target.com', include_stale=True)
+        self.assertNotEqual(0.1, refreshed.score)
+
+    def test_stale_opinions_are_not_used_by_default(self):
+        f, messages, network_opinions = get_fides_stream()
+        f.trust_db.network_opinion_cache.put(SlipsThreatIntelligence(score=0.1, confidence=0.5, target='target.com'))
+        f.intelligence.request_data('target.com')
+
+        self.assertFalse(network_opinions['target.com'].stale)
+        self.assertEqual(0, len([m for m in messages if m.type == 'tl2nl_intelligence_request']))
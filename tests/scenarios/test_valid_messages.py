@@ -1,13 +1,17 @@
+import dataclasses
 from unittest import TestCase
 
 from fides.messaging.model import PeerRecommendationResponse, PeerIntelligenceResponse
 from fides.model.alert import Alert
 from fides.model.peer import PeerInfo
+from fides.model.peer_trust_data import trust_data_prototype
 from fides.model.recommendation import Recommendation
 from fides.model.threat_intelligence import ThreatIntelligence, SlipsThreatIntelligence
+from tests.load_config import find_config
 from tests.load_fides import get_fides_stream
 from tests.messaging.messages import serialize, nl2tl_intelligence_request, nl2tl_peers_list, \
-    nl2tl_recommendation_request, nl2tl_recommendation_response, nl2tl_alert, nl2tl_intelligence_response
+    nl2tl_recommendation_request, nl2tl_recommendation_response, nl2tl_alert, nl2tl_intelligence_response, \
+    nl2tl_batch_recommendation_request
 
 
 class TestValidMessages(TestCase):
@@ -34,6 +38,37 @@ class TestValidMessages(TestCase):
         self.assertEqual(1, len(messages))
         self.assertEquals('tl2nl_recommendation_response', messages[0].type)
 
+    def test_nl2tl_peers_list_batch_recommendation_request(self):
+        config = find_config()
+        config = dataclasses.replace(config,
+                                     recommendations=dataclasses.replace(config.recommendations, batch_requests=True))
+        f, messages, _ = get_fides_stream(config=config)
+        # peers that are trusted enough to be asked for recommendations
+        recommenders = [PeerInfo(id='recommender#1', organisations=[]), PeerInfo(id='recommender#2', organisations=[])]
+        for peer in recommenders:
+            trust = trust_data_prototype(peer)
+            trust.service_trust = trust.recommendation_trust = 0.9
+            f.trust_db.store_peer_trust_data(trust)
+
+        new_peers = [PeerInfo(id=f'peer#{i}', organisations=[]) for i in range(5)]
+        f.queue.send_message(serialize(nl2tl_peers_list(recommenders + new_peers)))
+
+        requests = [m for m in messages if m.type == 'tl2nl_batch_recommendation_request']
+        self.assertEqual(1, len(requests))
+        self.assertListEqual([p.id for p in new_peers], requests[0].data['payload'])
+        self.assertSetEqual({p.id for p in recommenders}, set(requests[0].data['receiver_ids']))
+        self.assertEqual(0, len([m for m in messages if m.type == 'tl2nl_recommendation_request']))
+
+    def test_nl2tl_batch_recommendation_request(self):
+        f, messages, _ = get_fides_stream()
+        request_id, subjects, peer = '1234', ['peer#1', 'peer#2'], PeerInfo('peer#asking', [])
+        f.queue.send_message(serialize(nl2tl_batch_recommendation_request(request_id, subjects, peer)))
+
+        self.assertEqual(1, len(messages))
+        self.assertEqual('tl2nl_batch_recommendation_response', messages[0].type)
+        self.assertEqual(request_id, messages[0].data['request_id'])
+        self.assertListEqual(subjects, [r['subject'] for r in messages[0].data['payload']])
+
     def test_nl2tl_recommendation_response(self):
         f, messages, _ = get_fides_stream()
         # create peer in DB because this peer is responding to our request,
@@ -54,9 +89,37 @@ class TestValidMessages(TestCase):
         ]
         f.queue.send_message(serialize(nl2tl_recommendation_response(responses)))
 
-        # updates for sender#1 and subject#1
-        self.assertEqual(2, len(messages))
-        self.assertEquals(2, len([m for m in messages if m.type == 'tl2nl_peers_reliability']))
+        # updates for sender#1 and subject#1 are dispatched together
+        self.assertEqual(1, len(messages))
+        self.assertEqual('tl2nl_peers_reliability', messages[0].type)
+        self.assertSetEqual({sender.id, subject.id}, {d['peer_id'] for d in messages[0].data})
+
+    def test_nl2tl_recommendation_response_multiple_subjects(self):
+        f, messages, _ = get_fides_stream()
+        senders = [PeerInfo('sender#1', []), PeerInfo('sender#2', [])]
+        subjects = [PeerInfo('subject#1', []), PeerInfo('subject#2', []), PeerInfo('subject#3', [])]
+        for peer in senders + subjects:
+            f.trust.determine_and_store_initial_trust(peer, get_recommendations=False)
+
+        responses = [PeerRecommendationResponse(
+            sender, subject.id, Recommendation(
+                competence_belief=0.5,
+                integrity_belief=0.1,
+                service_history_size=10,
+                recommendation=0.7,
+                initial_reputation_provided_by_count=1
+            )) for sender in senders for subject in subjects
+        ]
+        f.queue.send_message(serialize(nl2tl_recommendation_response(responses)))
+
+        # all subjects and senders are updated at once
+        self.assertEqual(1, len(messages))
+        self.assertEqual('tl2nl_peers_reliability', messages[0].type)
+        self.assertSetEqual({p.id for p in senders + subjects}, {d['peer_id'] for d in messages[0].data})
+        for sender in senders:
+            self.assertEqual(len(subjects), f.trust_db.get_peer_trust_data(sender.id).recommendation_history_size)
+        for subject in subjects:
+            self.assertEqual(len(senders), f.trust_db.get_peer_trust_data(subject.id).initial_reputation_provided_by_count)
 
     def test_nl2tl_alert(self):
         f, messages, _ = get_fides_stream()
@@ -80,6 +143,19 @@ class TestValidMessages(TestCase):
         self.assertEquals(1, len([m for m in messages if m.type == 'tl2nl_intelligence_response']))
         self.assertEquals(1, len([m for m in messages if m.type == 'tl2nl_peers_reliability']))
 
+    def test_nl2tl_intelligence_request_on_ip_is_answered_from_network_data(self):
+        f, messages, _ = get_fides_stream()
+        f.ti_db.save(SlipsThreatIntelligence(score=-1, confidence=1, target='10.0.0.0/8'))
+
+        f.queue.send_message(
+            serialize(nl2tl_intelligence_request('123', '10.1.2.3', PeerInfo(id='peer#1', organisations=[])))
+        )
+
+        response = [m for m in messages if m.type == 'tl2nl_intelligence_response'][0]
+        intelligence = response.data['payload']['intelligence']
+        self.assertEqual('10.1.2.3', intelligence['target'])
+        self.assertEqual(-1, intelligence['score'])
+
     def test_nl2tl_intelligence_response(self):
         f, messages, _ = get_fides_stream()
         # create peer in DB because this peer is responding to our request,